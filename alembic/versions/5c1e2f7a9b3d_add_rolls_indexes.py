@@ -0,0 +1,44 @@
+"""add rolls indexes
+
+Revision ID: 5c1e2f7a9b3d
+Revises: 282345896c6c
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e2f7a9b3d"
+down_revision: Union[str, None] = "282345896c6c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_rolls_added_at_id", "rolls", ["added_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_rolls_removed_at", "rolls", ["removed_at"], unique=False
+    )
+    op.create_index(
+        "ix_rolls_in_stock",
+        "rolls",
+        ["added_at"],
+        unique=False,
+        postgresql_where=sa.text("removed_at IS NULL"),
+        sqlite_where=sa.text("removed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rolls_in_stock", table_name="rolls")
+    op.drop_index("ix_rolls_removed_at", table_name="rolls")
+    op.drop_index("ix_rolls_added_at_id", table_name="rolls")
@@ -0,0 +1,84 @@
+"""add rolls daily stats
+
+Revision ID: 8d4b6a2c0e17
+Revises: 5c1e2f7a9b3d
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d4b6a2c0e17"
+down_revision: Union[str, None] = "5c1e2f7a9b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_ADDED = """
+INSERT INTO rolls_daily_stats (
+    day, added_count, length_sum, weight_sum,
+    min_length, max_length, min_weight, max_weight
+)
+SELECT
+    date(added_at), count(*), sum(length), sum(weight),
+    min(length), max(length), min(weight), max(weight)
+FROM rolls
+GROUP BY date(added_at)
+"""
+
+BACKFILL_REMOVED = """
+INSERT INTO rolls_daily_stats (
+    day, removed_count, min_storage_seconds, max_storage_seconds
+)
+SELECT
+    date(removed_at), count(*),
+    min(EXTRACT(EPOCH FROM removed_at - added_at)),
+    max(EXTRACT(EPOCH FROM removed_at - added_at))
+FROM rolls
+WHERE removed_at IS NOT NULL
+GROUP BY date(removed_at)
+ON CONFLICT (day) DO UPDATE SET
+    removed_count = excluded.removed_count,
+    min_storage_seconds = excluded.min_storage_seconds,
+    max_storage_seconds = excluded.max_storage_seconds
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rolls_daily_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "added_count", sa.Integer(), server_default="0", nullable=True
+        ),
+        sa.Column(
+            "removed_count", sa.Integer(), server_default="0", nullable=True
+        ),
+        sa.Column("length_sum", sa.Float(), server_default="0", nullable=True),
+        sa.Column("weight_sum", sa.Float(), server_default="0", nullable=True),
+        sa.Column("min_length", sa.Float(), nullable=True),
+        sa.Column("max_length", sa.Float(), nullable=True),
+        sa.Column("min_weight", sa.Float(), nullable=True),
+        sa.Column("max_weight", sa.Float(), nullable=True),
+        sa.Column("min_storage_seconds", sa.Float(), nullable=True),
+        sa.Column("max_storage_seconds", sa.Float(), nullable=True),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("day"),
+    )
+    # Начальное заполнение из существующих рулонов (только PostgreSQL;
+    # в остальных БД используйте RollupService.rebuild).
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(BACKFILL_ADDED)
+        op.execute(BACKFILL_REMOVED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rolls_daily_stats")
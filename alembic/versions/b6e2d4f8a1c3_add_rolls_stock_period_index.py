@@ -0,0 +1,35 @@
+"""add rolls stock period index
+
+Revision ID: b6e2d4f8a1c3
+Revises: 3f7a1c9e5b42
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e2d4f8a1c3"
+down_revision: Union[str, None] = "3f7a1c9e5b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_rolls_stock_period",
+        "rolls",
+        [sa.text("tsrange(least(added_at, removed_at), removed_at)")],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rolls_stock_period", table_name="rolls")
@@ -0,0 +1,72 @@
+"""add rolls daily sketches
+
+Revision ID: e4a9c7b1d053
+Revises: b6e2d4f8a1c3
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a9c7b1d053"
+down_revision: Union[str, None] = "b6e2d4f8a1c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Номер корзины скетча (см. app.services.sketch, точность 1%).
+BUCKET = """
+CASE WHEN {value} > 1e-6
+    THEN CAST(ceil(ln({value}) / ln(1.01 / 0.99)) AS INTEGER)
+    ELSE -1000000
+END
+"""
+
+BACKFILL = """
+INSERT INTO rolls_daily_sketches (day, metric, bucket, count)
+SELECT date({moment}), '{metric}', {bucket}, count(*)
+FROM rolls
+WHERE {moment} IS NOT NULL
+GROUP BY 1, 3
+"""
+
+SOURCES = (
+    ("length", "added_at", "length"),
+    ("weight", "added_at", "weight"),
+    ("storage", "removed_at", "EXTRACT(EPOCH FROM removed_at - added_at)"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rolls_daily_sketches",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("metric", sa.String(length=16), nullable=False),
+        sa.Column("bucket", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("day", "metric", "bucket"),
+    )
+    # Начальное заполнение из существующих рулонов (только PostgreSQL;
+    # в остальных БД используйте RollupService.rebuild).
+    if op.get_bind().dialect.name == "postgresql":
+        for metric, moment, value in SOURCES:
+            op.execute(
+                BACKFILL.format(
+                    moment=moment,
+                    metric=metric,
+                    bucket=BUCKET.format(value=value),
+                )
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rolls_daily_sketches")
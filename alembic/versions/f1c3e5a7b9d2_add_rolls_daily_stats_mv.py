@@ -0,0 +1,89 @@
+"""add rolls daily stats materialized view
+
+Revision ID: f1c3e5a7b9d2
+Revises: e4a9c7b1d053
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c3e5a7b9d2"
+down_revision: Union[str, None] = "e4a9c7b1d053"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Те же колонки, что и в rolls_daily_stats.
+CREATE_VIEW = """
+CREATE MATERIALIZED VIEW rolls_daily_stats_mv AS
+SELECT
+    day,
+    sum(added_count)::int AS added_count,
+    sum(removed_count)::int AS removed_count,
+    sum(length_sum) AS length_sum,
+    sum(weight_sum) AS weight_sum,
+    min(min_length) AS min_length,
+    max(max_length) AS max_length,
+    min(min_weight) AS min_weight,
+    max(max_weight) AS max_weight,
+    min(min_storage_seconds) AS min_storage_seconds,
+    max(max_storage_seconds) AS max_storage_seconds
+FROM (
+    SELECT
+        date(added_at) AS day,
+        count(*) AS added_count,
+        0 AS removed_count,
+        sum(length) AS length_sum,
+        sum(weight) AS weight_sum,
+        min(length) AS min_length,
+        max(length) AS max_length,
+        min(weight) AS min_weight,
+        max(weight) AS max_weight,
+        NULL::float AS min_storage_seconds,
+        NULL::float AS max_storage_seconds
+    FROM rolls
+    GROUP BY date(added_at)
+    UNION ALL
+    SELECT
+        date(removed_at),
+        0,
+        count(*),
+        0,
+        0,
+        NULL,
+        NULL,
+        NULL,
+        NULL,
+        min(EXTRACT(EPOCH FROM removed_at - added_at))::float,
+        max(EXTRACT(EPOCH FROM removed_at - added_at))::float
+    FROM rolls
+    WHERE removed_at IS NOT NULL
+    GROUP BY date(removed_at)
+) AS events
+GROUP BY day
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Материализованные представления есть только в PostgreSQL.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(CREATE_VIEW)
+    # Уникальный индекс нужен для REFRESH ... CONCURRENTLY.
+    op.execute(
+        "CREATE UNIQUE INDEX ux_rolls_daily_stats_mv_day "
+        "ON rolls_daily_stats_mv (day)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP MATERIALIZED VIEW rolls_daily_stats_mv")
@@ -1,6 +1,7 @@
 """Фильтры."""
 
 from datetime import date
+from datetime import datetime as dt
 from typing import Optional, Annotated
 from fastapi import Query
 
@@ -68,6 +69,13 @@ def get_filter_params(
             examples={"normal": {"value": "2024-06-30"}},
         ),
     ] = None,
+    present_at: Annotated[
+        Optional[dt],
+        Query(
+            description="Рулоны, находившиеся на складе в этот момент",
+            examples={"normal": {"value": "2024-06-15T12:00:00"}},
+        ),
+    ] = None,
 ) -> RollsFilter:
     """
     Зависимость для фильтрации рулонов.
@@ -84,4 +92,5 @@ def get_filter_params(
         added_before=added_before,
         removed_after=removed_after,
         removed_before=removed_before,
+        present_at=present_at,
     )
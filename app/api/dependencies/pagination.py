@@ -0,0 +1,53 @@
+"""Пагинация."""
+
+from typing import Annotated, Optional
+
+from fastapi import HTTPException, Query, status
+
+from app.core.config import setting_limit, settings
+from app.schemas.pagination import CursorError, KeysetPagination, OrderBy
+
+
+def get_pagination_params(
+    limit: Annotated[
+        Optional[int],
+        Query(
+            description="Размер страницы (по умолчанию ROLLS_PAGE_SIZE, "
+            "не больше ROLLS_MAX_PAGE_SIZE)",
+            ge=1,
+        ),
+        setting_limit("rolls_max_page_size"),
+    ] = None,
+    cursor: Annotated[
+        Optional[str],
+        Query(description="Курсор из next_cursor предыдущей страницы"),
+    ] = None,
+    order_by: Annotated[
+        OrderBy,
+        Query(description="Сортировка: id или added_at (затем id)"),
+    ] = "id",
+) -> KeysetPagination:
+    """
+    Зависимость для keyset-пагинации.
+
+    Возвращает:
+        KeysetPagination: Параметры страницы с разобранным курсором.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            cursor_order, after = KeysetPagination.decode_cursor(cursor)
+        except CursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+            )
+        if cursor_order != order_by:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Курсор получен для другой сортировки",
+            )
+    return KeysetPagination(
+        limit=limit or settings.rolls_page_size,
+        order_by=order_by,
+        after=after,
+    )
@@ -0,0 +1,34 @@
+"""Модуль API-роутов для проверок состояния приложения."""
+
+from fastapi import APIRouter, status
+
+from app.core.responses import JSONResponse
+from app.services.health import check_readiness
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live():
+    """Процесс жив и обрабатывает запросы (зависимости не проверяются)."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Готовность принимать трафик.
+
+    БД, реплики и Redis проверяются параллельно, каждая проверка
+    ограничена ``HEALTH_TIMEOUT`` секундами. При недоступности любой
+    зависимости возвращается 503.
+    """
+    is_ready, checks = await check_readiness()
+    return JSONResponse(
+        {"status": "ok" if is_ready else "unavailable", "checks": checks},
+        status_code=(
+            status.HTTP_200_OK
+            if is_ready
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
@@ -1,46 +1,290 @@
 """Модуль API-роутов для работы с рулонами металла."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from typing import Annotated, List, Optional
 from datetime import datetime as dt
 
-from app.core.db import get_async_session
+from app.core.cache import (
+    publish_invalidation,
+    rolls_cache,
+    rolls_invalidation,
+)
+from app.core.config import setting_limit, settings
+from app.core.responses import ORJSONResponse
+from app.core.db import (
+    get_async_session,
+    get_engine,
+    get_read_engine,
+    get_read_session,
+    is_sticky,
+)
 from app.models.rolls import Rolls
 
-from app.schemas.rolls import RollsCreate, RollsUpdate, RollsResponse
+from app.schemas.rolls import (
+    RollsAsOf,
+    RollsBatch,
+    RollsBulkResult,
+    RollsBulkSelector,
+    RollsBulkUpdate,
+    RollsCreate,
+    RollsPage,
+    RollsUpdate,
+    RollsResponse,
+)
 from app.schemas.filters import RollsFilter
+from app.schemas.pagination import KeysetPagination
 from app.crud.rolls import CRUDbase
 from app.api.dependencies.filters import get_filter_params
+from app.api.dependencies.pagination import get_pagination_params
+from app.services.export import ExportFormat, RollsExporter
+from app.services.rollup import RollupService
 from app.services.statistics import StatisticsService
 
 router = APIRouter()
 crud_rolls = CRUDbase[Rolls, RollsCreate, RollsUpdate](Rolls)
 
+ROLL_COLUMNS = tuple(RollsResponse.model_fields)
 
-@router.get(
-    "/", response_model=List[RollsResponse], response_model_exclude_none=True
-)
+
+def _roll_payload(row) -> dict:
+    """Строка выборки в JSON-объект без пустых полей."""
+    return {
+        key: value for key, value in row._mapping.items() if value is not None
+    }
+
+
+def _read_rolls_cache(request: Request) -> bool:
+    """
+    Можно ли отдать рулон из локального кэша.
+
+    Клиент, закреплённый за основной БД после записи, читает мимо кэша:
+    инвалидация до других воркеров доходит асинхронно.
+    """
+    return settings.local_cache_rolls and not is_sticky(request)
+
+
+def _fill_rolls_cache(session: AsyncSession) -> bool:
+    """Можно ли положить прочитанный рулон в кэш: только из основной БД."""
+    return settings.local_cache_rolls and session.bind is get_engine()
+
+
+def _etag(version: int) -> str:
+    """Значение ETag рулона по его версии."""
+    # SQLite может вернуть целые из UPDATE ... RETURNING как REAL.
+    return f'"{int(version)}"'
+
+
+def _if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """
+    Возвращает ожидаемую версию рулона из заголовка ``If-Match``.
+
+    ``*`` и отсутствие заголовка означают запись без проверки версии.
+    Нераспознанный тег не совпадает ни с одной версией.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip().removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Версия рулона не совпадает",
+        )
+    return int(tag)
+
+
+async def _write_conflict(roll_id: int, session: AsyncSession):
+    """
+    Причина, по которой условный UPDATE не затронул рулон.
+
+    Выполняется только при неудачной записи.
+
+    Returns:
+        - Row: Уже удалённый рулон (повторное удаление).
+    """
+    row = await crud_rolls.get_row(roll_id, ROLL_COLUMNS, session)
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Рулон не найден"
+        )
+    if row.removed_at is not None:
+        return row
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Версия рулона не совпадает",
+    )
+
+
+@router.get("/", response_model=RollsPage, response_class=ORJSONResponse)
 async def get_rolls(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     filters: Optional[RollsFilter] = Depends(get_filter_params),
-) -> List[RollsResponse]:
-    """Получить информацию о рулонах с применением фильтров."""
+    pagination: KeysetPagination = Depends(get_pagination_params),
+) -> ORJSONResponse:
+    """
+    Получить страницу рулонов с применением фильтров.
+
+    Следующая страница запрашивается с параметром ``cursor``,
+    равным ``next_cursor`` из ответа.
+
+    Строки выбираются колонками и сериализуются orjson напрямую, без
+    ORM-объектов и повторной валидации через response_model.
+    """
     if filters is None:
         filters = RollsFilter()
 
-    return await crud_rolls.filter(session, filters=filters)
+    rows, next_cursor = await crud_rolls.paginate(
+        session, filters=filters, pagination=pagination, columns=ROLL_COLUMNS
+    )
+    return ORJSONResponse(
+        {
+            "items": [_roll_payload(row) for row in rows],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_rolls(
+    export_format: ExportFormat = Query(
+        "ndjson", alias="format", description="Формат: ndjson или csv"
+    ),
+    filters: Optional[RollsFilter] = Depends(get_filter_params),
+    bind: AsyncEngine = Depends(get_read_engine),
+) -> StreamingResponse:
+    """
+    Выгрузить все рулоны, подходящие под фильтр, потоком.
+
+    Args:
+        - export_format (str): Формат выгрузки (ndjson или csv).
+        - filters (RollsFilter): Фильтры, как у списка рулонов.
+
+    Returns:
+        - StreamingResponse: Поток строк в выбранном формате.
+    """
+    if filters is None:
+        filters = RollsFilter()
+
+    exporter = RollsExporter(crud_rolls, export_format, bind)
+    return StreamingResponse(
+        exporter.iter_chunks(filters),
+        media_type=exporter.media_type,
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=rolls.{export_format}"
+            )
+        },
+    )
+
+
+@router.get("/as-of", response_model=RollsAsOf, response_class=ORJSONResponse)
+async def get_rolls_as_of(
+    ts: Annotated[dt, Query(description="Момент времени")],
+    items: Annotated[
+        bool, Query(description="Вернуть страницу рулонов")
+    ] = False,
+    pagination: KeysetPagination = Depends(get_pagination_params),
+    session: AsyncSession = Depends(get_read_session),
+) -> ORJSONResponse:
+    """
+    Рулоны, находившиеся на складе в момент ``ts``.
+
+    Условие ``added_at <= ts AND (removed_at IS NULL OR removed_at > ts)``
+    в PostgreSQL проверяется по GiST-индексу на интервале хранения.
+    Всегда возвращаются количество, суммарный вес и длина; с
+    ``items=true`` - ещё и страница рулонов (keyset-пагинация, как в
+    ``GET /rolls``).
+    """
+    filters = RollsFilter(present_at=ts)
+    totals = await crud_rolls.totals(session, filters)
+    payload = {"ts": ts, **totals._mapping}
+    if items:
+        rows, next_cursor = await crud_rolls.paginate(
+            session,
+            filters=filters,
+            pagination=pagination,
+            columns=ROLL_COLUMNS,
+        )
+        payload["items"] = [_roll_payload(row) for row in rows]
+        payload["next_cursor"] = next_cursor
+    return ORJSONResponse(payload)
+
+
+@router.get("/batch", response_model=RollsBatch, response_class=ORJSONResponse)
+async def get_rolls_batch(
+    ids: Annotated[
+        List[int],
+        Query(
+            min_length=1,
+            description="ID рулонов (параметр повторяется: ids=1&ids=2, "
+            "не больше ROLLS_BATCH_MAX_SIZE)",
+        ),
+        setting_limit("rolls_batch_max_size"),
+    ],
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+) -> ORJSONResponse:
+    """
+    Получить несколько рулонов по списку ID.
+
+    Рулоны из локального кэша берутся из него, остальные читаются одним
+    запросом. Порядок ответа совпадает с порядком ``ids`` (повторы
+    убираются), отсутствующие ID перечислены в ``missing``.
+
+    Args:
+        - ids (List[int]): ID рулонов.
+        - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+    Returns:
+        - RollsBatch: Найденные рулоны и отсутствующие ID.
+    """
+    ids = list(dict.fromkeys(ids))
+    found = {}
+    if _read_rolls_cache(request):
+        for roll_id in ids:
+            cached = rolls_cache.get(roll_id)
+            if cached is not None:
+                found[roll_id] = cached
+
+    rest = [roll_id for roll_id in ids if roll_id not in found]
+    if rest:
+        fill_cache = _fill_rolls_cache(session)
+        for row in await crud_rolls.get_many(rest, ROLL_COLUMNS, session):
+            payload = _roll_payload(row)
+            found[row.id] = payload
+            if fill_cache:
+                rolls_cache.set(row.id, payload)
+
+    return ORJSONResponse(
+        {
+            "items": [found[roll_id] for roll_id in ids if roll_id in found],
+            "missing": [roll_id for roll_id in ids if roll_id not in found],
+        }
+    )
 
 
 @router.get(
     "/{roll_id}",
     response_model=RollsResponse,
-    response_model_exclude_none=True,
+    response_class=ORJSONResponse,
 )
 async def get_roll_by_id(
     roll_id: int,
-    session: AsyncSession = Depends(get_async_session),
-) -> RollsResponse:
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+) -> ORJSONResponse:
     """
     Получить информацию о рулоне по его ID.
 
@@ -49,14 +293,24 @@ async def get_roll_by_id(
         - session (AsyncSession): Асинхронная сессия SQLAlchemy.
 
     Returns:
-        - List[RollsResponse]: Список рулонов, подходящих под фильтр.
+        - RollsResponse: Данные рулона.
     """
-    roll = await crud_rolls.get(roll_id, session)
-    if not roll:
+    if _read_rolls_cache(request):
+        cached = rolls_cache.get(roll_id)
+        if cached is not None:
+            return ORJSONResponse(
+                cached, headers={"ETag": _etag(cached["version"])}
+            )
+
+    row = await crud_rolls.get_row(roll_id, ROLL_COLUMNS, session)
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Рулон не найден"
         )
-    return roll
+    payload = _roll_payload(row)
+    if _fill_rolls_cache(session):
+        rolls_cache.set(roll_id, payload)
+    return ORJSONResponse(payload, headers={"ETag": _etag(row.version)})
 
 
 @router.post("/", response_model=RollsCreate, response_model_exclude_none=True)
@@ -73,9 +327,151 @@ async def create_rolls(
     Returns:
         - RollsResponse: Данные созданного рулона.
     """
+    db_roll = await crud_rolls.create(roll, session, commit=False)
+    await session.flush()
+    await RollupService(session).added([db_roll])
+    await session.commit()
     service = StatisticsService(session)
     await service.invalidate_cache()
-    return await crud_rolls.create(roll, session)
+    return db_roll
+
+
+@router.post(
+    "/bulk",
+    response_model=List[RollsResponse],
+    response_model_exclude_none=True,
+)
+async def create_rolls_bulk(
+    rolls: Annotated[
+        List[RollsCreate],
+        Body(min_length=1),
+        setting_limit("rolls_bulk_max_size"),
+    ],
+    session: AsyncSession = Depends(get_async_session),
+) -> List[Rolls]:
+    """
+    Создать несколько рулонов одной транзакцией.
+
+    Args:
+        - rolls (List[RollsCreate]): Данные рулонов.
+        - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+    Returns:
+        - List[RollsResponse]: Созданные рулоны в порядке запроса.
+    """
+    db_rolls = await crud_rolls.create_many(rolls, session, commit=False)
+    await RollupService(session).added(db_rolls)
+    await session.commit()
+    service = StatisticsService(session)
+    await service.invalidate_cache()
+    return db_rolls
+
+
+async def _bulk_result(
+    requested_ids: Optional[List[int]],
+    affected_ids: List[int],
+    session: AsyncSession,
+    check_removed: bool,
+) -> RollsBulkResult:
+    """Раскладывает незатронутые ID на отсутствующие и уже удалённые."""
+    if requested_ids is None:
+        return RollsBulkResult(ids=affected_ids)
+
+    affected = set(affected_ids)
+    rest = [roll_id for roll_id in requested_ids if roll_id not in affected]
+    existing = (
+        await crud_rolls.existing_ids(rest, session)
+        if rest and check_removed
+        else set()
+    )
+    return RollsBulkResult(
+        ids=affected_ids,
+        missing=[roll_id for roll_id in rest if roll_id not in existing],
+        already_removed=[roll_id for roll_id in rest if roll_id in existing],
+    )
+
+
+@router.post("/bulk-remove", response_model=RollsBulkResult)
+async def remove_rolls_bulk(
+    selector: RollsBulkSelector,
+    session: AsyncSession = Depends(get_async_session),
+) -> RollsBulkResult:
+    """
+    Удалить несколько рулонов (присвоить дату удаления) одним запросом.
+
+    Args:
+        - selector (RollsBulkSelector): Список ID или фильтр.
+        - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+    Returns:
+        - RollsBulkResult: Удалённые, отсутствующие и уже удалённые ID.
+    """
+    requested_ids = list(dict.fromkeys(selector.ids)) if selector.ids else None
+    removed = await crud_rolls.update_many(
+        {"removed_at": dt.utcnow()},
+        session,
+        ids=requested_ids,
+        filters=selector.filters,
+        only_active=True,
+        commit=False,
+    )
+    await RollupService(session).removed(removed)
+    await session.commit()
+    removed_ids = [int(roll.id) for roll in removed]
+    if removed_ids:
+        await publish_invalidation(rolls_invalidation(removed_ids))
+        service = StatisticsService(session)
+        await service.invalidate_cache()
+    return await _bulk_result(
+        requested_ids,
+        removed_ids,
+        session,
+        check_removed=True,
+    )
+
+
+@router.patch("/bulk", response_model=RollsBulkResult)
+async def update_rolls_bulk(
+    bulk_in: RollsBulkUpdate,
+    session: AsyncSession = Depends(get_async_session),
+) -> RollsBulkResult:
+    """
+    Обновить данные нескольких рулонов одним запросом.
+
+    Args:
+        - bulk_in (RollsBulkUpdate): Список ID или фильтр и новые данные.
+        - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+    Returns:
+        - RollsBulkResult: Обновлённые и отсутствующие ID.
+    """
+    values = bulk_in.values.model_dump(exclude_none=True)
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Не переданы поля для обновления",
+        )
+    requested_ids = list(dict.fromkeys(bulk_in.ids)) if bulk_in.ids else None
+    updated = await crud_rolls.update_many(
+        values,
+        session,
+        ids=requested_ids,
+        filters=bulk_in.filters,
+        commit=False,
+    )
+    await RollupService(session).changed(updated)
+    await session.commit()
+    updated_ids = [int(roll.id) for roll in updated]
+    if updated_ids:
+        await publish_invalidation(rolls_invalidation(updated_ids))
+        service = StatisticsService(session)
+        await service.invalidate_cache()
+    return await _bulk_result(
+        requested_ids,
+        updated_ids,
+        session,
+        check_removed=False,
+    )
 
 
 @router.patch(
@@ -84,27 +480,46 @@ async def create_rolls(
 async def update_roll(
     roll_id: int,
     roll_in: RollsUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     session: AsyncSession = Depends(get_async_session),
-) -> RollsResponse:
+) -> Row:
     """
     Обновить данные рулона.
 
+    Запись выполняется одним ``UPDATE ... RETURNING``. С заголовком
+    ``If-Match`` (ETag из ``GET /rolls/{roll_id}``) рулон обновляется,
+    только если его не изменили с момента чтения, иначе - 412. Пустое
+    тело ничего не записывает и возвращает текущий рулон.
+
     Args:
         - roll_id (int): ID рулона для обновления.
         - roll_in (RollsUpdate): Новые данные рулона.
+        - if_match (str | None): Ожидаемый ETag рулона.
         - session (AsyncSession): Асинхронная сессия SQLAlchemy.
 
     Returns:
         - RollsResponse: Обновлённые данные рулона.
     """
-    db_roll = await crud_rolls.get(roll_id, session)
-    if not db_roll:
+    version = _if_match_version(if_match)
+    values = roll_in.model_dump(exclude_unset=True)
+    row = await crud_rolls.update_by_id(
+        roll_id, values, session, version=version, commit=False
+    )
+    if not row:
+        await _write_conflict(roll_id, session)
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Рулон не найден"
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Версия рулона не совпадает",
         )
-    service = StatisticsService(session)
-    await service.invalidate_cache()
-    return await crud_rolls.update(db_roll, roll_in, session)
+    if values:
+        await RollupService(session).changed([row])
+        await session.commit()
+        await publish_invalidation(rolls_invalidation([roll_id]))
+        service = StatisticsService(session)
+        await service.invalidate_cache()
+    response.headers["ETag"] = _etag(row.version)
+    return row
 
 
 @router.delete(
@@ -113,26 +528,42 @@ async def update_roll(
     response_model_exclude_none=True,
 )
 async def delete_roll(
-    roll_id: int, session: AsyncSession = Depends(get_async_session)
-) -> RollsResponse:
+    roll_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_async_session),
+) -> Row:
     """
     Удалить рулон по ID (присвоить дату удаления).
 
+    Запись выполняется одним ``UPDATE ... RETURNING``. Повторное
+    удаление не меняет дату удаления. С заголовком ``If-Match`` рулон
+    удаляется, только если его версия совпадает, иначе - 412.
+
     Args:
         - roll_id (int): ID рулона для удаления.
+        - if_match (str | None): Ожидаемый ETag рулона.
         - session (AsyncSession): Асинхронная сессия SQLAlchemy.
 
     Returns:
         - RollsResponse: Данные удалённого рулона.
     """
-    db_roll = await crud_rolls.get(roll_id, session)
-    if not db_roll:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Рулон не найден"
-        )
-    db_roll.removed_at = dt.utcnow()
+    row = await crud_rolls.update_by_id(
+        roll_id,
+        {"removed_at": dt.utcnow()},
+        session,
+        version=_if_match_version(if_match),
+        only_active=True,
+        commit=False,
+    )
+    if not row:
+        row = await _write_conflict(roll_id, session)
+        response.headers["ETag"] = _etag(row.version)
+        return row
+    await RollupService(session).removed([row])
     await session.commit()
-    await session.refresh(db_roll)
+    await publish_invalidation(rolls_invalidation([roll_id]))
     service = StatisticsService(session)
     await service.invalidate_cache()
-    return db_roll
+    response.headers["ETag"] = _etag(row.version)
+    return row
@@ -1,16 +1,57 @@
 """Модуль API-роутов для работы с ."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import cast
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime as dt
 
-from app.services.statistics import StatisticsService
-from app.core.db import get_async_session
+from app.schemas.statistics import (
+    Language,
+    SeriesBucket,
+    StatisticsFormat,
+    StatisticsSeries,
+    StatisticsTotals,
+)
+from app.services.statistics import LABELS, StatisticsService
+from app.core.db import get_read_session
+from app.core.responses import ORJSONResponse
 
 router = APIRouter()
 
+DEFAULT_LANGUAGE: Language = "ru"
+SNAPSHOT_AGE_HEADER = "X-Snapshot-Age"
+
+
+def _accepted_language(accept_language: str | None) -> Language:
+    """Первый поддерживаемый язык из ``Accept-Language`` по весу ``q``."""
+    if not accept_language:
+        return DEFAULT_LANGUAGE
+    ranges = []
+    for item in accept_language.split(","):
+        tag, _, params = item.strip().partition(";")
+        weight = 1.0
+        if params.strip().startswith("q="):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                weight = 0.0
+        ranges.append((weight, tag.strip().split("-")[0].lower()))
+    for weight, language in sorted(ranges, key=lambda r: -r[0]):
+        if weight > 0 and language in LABELS:
+            return cast(Language, language)
+    return DEFAULT_LANGUAGE
 
-@router.get("/")
+
+@router.get(
+    "/",
+    responses={
+        200: {
+            "model": StatisticsTotals,
+            "description": "Числа при format=raw, иначе подписанные строки",
+        }
+    },
+)
 async def get_statistics(
     start_date: dt | None = Query(
         None, description="Начальная дата (опционально)"
@@ -18,13 +59,71 @@ async def get_statistics(
     end_date: dt | None = Query(
         None, description="Конечная дата (опционально)"
     ),
-    session: AsyncSession = Depends(get_async_session),
+    output_format: StatisticsFormat | None = Query(
+        None,
+        alias="format",
+        description="raw - числа и секунды, ru/en - подписанные строки "
+        "(по умолчанию язык из Accept-Language)",
+    ),
+    accept_language: str | None = Header(None),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """
+    Эндпоинт статистики.
+
+    Статистика считается и кэшируется один раз в числах; ``format=raw``
+    отдаёт её как есть, иначе значения форматируются на языке из
+    ``format`` или ``Accept-Language``. При чтении из материализованного
+    представления возраст снимка (секунды) передаётся в заголовке
+    ``X-Snapshot-Age``.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date должен быть меньше end_date",
+        )
+    service = StatisticsService(session)
+    stats = await service.get_statistics(start_date, end_date)
+    headers = {"Vary": "Accept-Language"}
+    age = await service.matview_age()
+    if age is not None:
+        headers[SNAPSHOT_AGE_HEADER] = str(int(age))
+    if output_format == "raw":
+        return ORJSONResponse(stats, headers=headers)
+    language = output_format or _accepted_language(accept_language)
+    headers["Content-Language"] = language
+    return ORJSONResponse(
+        StatisticsService.localize(stats, language), headers=headers
+    )
+
+
+@router.get("/series", response_model=StatisticsSeries)
+async def get_statistics_series(
+    bucket: SeriesBucket = Query("day", description="Длина интервала"),
+    start_date: dt | None = Query(
+        None, description="Начальная дата (опционально)"
+    ),
+    end_date: dt | None = Query(
+        None, description="Конечная дата (опционально)"
+    ),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    """Эндпоинт статистики."""
+    """
+    Ряд статистики по часам, дням или неделям за период.
+
+    Для каждого интервала: число добавленных и удалённых рулонов, вес на
+    складе на конец интервала, минимальный и максимальный срок хранения
+    списанных рулонов.
+    """
     if start_date and end_date and start_date > end_date:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="start_date должен быть меньше end_date",
         )
     service = StatisticsService(session)
-    return await service.get_statistics(start_date, end_date)
+    try:
+        return await service.get_series(bucket, start_date, end_date)
+    except (ValueError, OverflowError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
@@ -0,0 +1,18 @@
+"""Модуль API-роутов для служебной информации."""
+
+from fastapi import APIRouter
+
+from app.core.db import get_engine, get_replica_engines, pool_status
+
+router = APIRouter()
+
+
+@router.get("/pool")
+async def get_pool_status():
+    """Состояние пулов соединений с основной БД и репликами."""
+    return {
+        **pool_status(get_engine()),
+        "replicas": [
+            pool_status(replica) for replica in get_replica_engines()
+        ],
+    }
@@ -2,8 +2,10 @@
 
 from fastapi import APIRouter
 
+from .endpoints.health import router as health_router
 from .endpoints.rolls import router as rolls_router
 from .endpoints.statistics import router as statistics_router
+from .endpoints.system import router as system_router
 
 
 main_router = APIRouter()
@@ -13,3 +15,5 @@ main_router.include_router(rolls_router, prefix="/rolls", tags=["rolls"])
 main_router.include_router(
     statistics_router, prefix="/statistics", tags=["statistics"]
 )
+main_router.include_router(system_router, prefix="/system", tags=["system"])
+main_router.include_router(health_router, prefix="/health", tags=["health"])
@@ -1,4 +1,6 @@
 from app.core.db import Base  # noqa
 from app.models.rolls import Rolls  # noqa
+from app.models.rolls_daily_sketch import RollsDailySketch  # noqa
+from app.models.rolls_daily_stats import RollsDailyStats  # noqa
 
-__all__ = ["Base", "Rolls"]
+__all__ = ["Base", "Rolls", "RollsDailySketch", "RollsDailyStats"]
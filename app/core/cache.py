@@ -0,0 +1,156 @@
+"""Локальный (внутрипроцессный) кэш поверх Redis."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Ограниченный LRU-кэш с TTL.
+
+    Значения живут не дольше ``ttl`` секунд: это верхняя граница
+    рассинхронизации с Redis, если сообщение об инвалидации потеряно.
+    Без ``maxsize``/``ttl`` используются ``LOCAL_CACHE_SIZE`` и
+    ``LOCAL_CACHE_TTL`` (читаются при обращении, а не при импорте).
+    """
+
+    def __init__(
+        self, maxsize: Optional[int] = None, ttl: Optional[float] = None
+    ):
+        """Инициализация кэша."""
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        # Номер очистки: растёт при каждом clear().
+        self.epoch = 0
+
+    @property
+    def maxsize(self) -> int:
+        """Максимальное число записей."""
+        if self._maxsize is None:
+            return settings.local_cache_size
+        return self._maxsize
+
+    @property
+    def ttl(self) -> float:
+        """Время жизни записи, секунды."""
+        if self._ttl is None:
+            return settings.local_cache_ttl
+        return self._ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Значение по ключу или ``default``, если его нет или оно истекло."""
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(
+        self, key: Hashable, value: Any, epoch: Optional[int] = None
+    ) -> None:
+        """
+        Сохраняет значение, вытесняя самое старое при переполнении.
+
+        ``epoch`` - значение ``self.epoch`` до чтения ``value`` из
+        источника. Если кэш с тех пор очищался (пришла инвалидация),
+        значение могло устареть и не сохраняется.
+        """
+        if self.maxsize <= 0 or epoch not in (None, self.epoch):
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Удаляет значение."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._data.clear()
+        self.epoch += 1
+
+    def __len__(self) -> int:
+        """Количество записей (включая ещё не вычищенные истёкшие)."""
+        return len(self._data)
+
+
+statistics_cache = LRUCache()
+rolls_cache = LRUCache()
+
+
+def apply_invalidation(message: str) -> None:
+    """
+    Применяет сообщение об инвалидации к локальным кэшам.
+
+    Форматы: ``stats`` - вся статистика, ``rolls`` - все рулоны,
+    ``rolls:1,2,3`` - рулоны с указанными ID.
+    """
+    if message == "stats":
+        statistics_cache.clear()
+    elif message == "rolls":
+        rolls_cache.clear()
+    elif message.startswith("rolls:"):
+        for roll_id in message.removeprefix("rolls:").split(","):
+            if roll_id:
+                rolls_cache.delete(int(roll_id))
+
+
+async def publish_invalidation(message: str) -> None:
+    """Инвалидирует локальный кэш и рассылает сообщение другим воркерам."""
+    apply_invalidation(message)
+    try:
+        await get_redis().publish(INVALIDATION_CHANNEL, message)
+    except Exception as e:
+        logging.error(f"Ошибка при публикации инвалидации: {e}")
+
+
+def rolls_invalidation(ids: Optional[list[int]] = None) -> str:
+    """
+    Сообщение об инвалидации рулонов (все, если ``ids`` не заданы).
+
+    ID приводятся к ``int``: SQLite в ``RETURNING`` может вернуть их
+    как ``REAL``.
+    """
+    if ids is None or len(ids) > 100:
+        return "rolls"
+    return "rolls:" + ",".join(str(int(roll_id)) for roll_id in ids)
+
+
+async def listen_invalidations() -> None:
+    """
+    Фоновая задача: применяет инвалидации, опубликованные другими воркерами.
+
+    После потери соединения локальные кэши очищаются целиком, так как
+    часть сообщений могла быть пропущена.
+    """
+    while True:
+        try:
+            async with get_redis().pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        apply_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Подписка на инвалидации прервана: {e}")
+        statistics_cache.clear()
+        rolls_cache.clear()
+        await asyncio.sleep(1)
@@ -1,5 +1,9 @@
 """Конфигурация приложения."""
 
+from functools import lru_cache
+from typing import Literal
+
+from pydantic import AfterValidator
 from pydantic_settings import BaseSettings
 
 
@@ -18,11 +22,59 @@ class Settings(BaseSettings):
     postgres_host: str
     postgres_port: int
     database_url: str
+    database_replica_urls: list[str] = []
+    replica_sticky_seconds: int = 5
+
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout: int = 0
+    db_statement_cache_size: int = 100
+    db_pgbouncer: bool = False
 
     redis_host: str
     redis_port: int
     redis_db: int = 0
 
+    local_cache_size: int = 1024
+    local_cache_ttl: float = 5.0
+    local_cache_rolls: bool = True
+
+    rolls_page_size: int = 100
+    rolls_max_page_size: int = 1000
+    export_batch_size: int = 1000
+    rolls_bulk_max_size: int = 10000
+    rolls_batch_max_size: int = 1000
+
+    statistics_source: Literal["rolls", "rollup", "matview"] = "rollup"
+    statistics_matview_refresh_interval: int = 300
+    statistics_matview_max_staleness: int = 900
+    statistics_matview_refresh_timeout: int = 600
+    statistics_series_max_buckets: int = 2000
+    statistics_exact_percentile_days: int = 31
+    rollup_compaction_interval: int = 3600
+    rollup_compaction_days: int = 2
+
+    warmup_db_connections: int = 5
+    warmup_redis_connections: int = 5
+    warmup_timeout: float = 10
+    health_timeout: float = 1.0
+
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0
+    server_loop: Literal["auto", "uvloop", "asyncio"] = "auto"
+    server_http: Literal["auto", "httptools", "h11"] = "auto"
+    server_graceful_timeout: int = 30
+    server_keepalive_timeout: int = 5
+
+    profiling_enabled: bool = False
+    profiling_slow_query_ms: float = 100
+    profiling_token: str = ""
+    profiling_interval: float = 0.001
+
     debug: bool = True
     secret_key: str
 
@@ -33,4 +85,36 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
-settings = Settings()  # type: ignore
+@lru_cache
+def get_settings() -> Settings:
+    """Настройки из env (читаются при первом обращении)."""
+    return Settings()  # type: ignore
+
+
+class LazySettings:
+    """Прокси к ``get_settings()``: импорт модулей не читает env."""
+
+    def __getattr__(self, name: str):
+        """Атрибут настроек."""
+        return getattr(get_settings(), name)
+
+
+settings: Settings = LazySettings()  # type: ignore[assignment]
+
+
+def setting_limit(name: str) -> AfterValidator:
+    """
+    Валидатор: число или длина списка не больше настройки ``name``.
+
+    Граница читается при проверке запроса, а не при импорте модуля, как
+    было бы с ``le``/``max_length``.
+    """
+
+    def check(value):
+        limit = getattr(settings, name)
+        size = len(value) if isinstance(value, list) else value
+        if size is not None and size > limit:
+            raise ValueError(f"Значение больше {name.upper()}: {limit}")
+        return value
+
+    return AfterValidator(check)
@@ -1,12 +1,23 @@
 """Модуль для работы с базой данных через SQLAlchemy."""
 
-from sqlalchemy import Column, BigInteger
+import random
+import time
+from functools import lru_cache
+from uuid import uuid4
+
+# starlette, а не fastapi: модели и Alembic не тянут весь FastAPI.
+from starlette.requests import Request
+from starlette.responses import Response
+from sqlalchemy import Column, BigInteger, Integer
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import declarative_base, declared_attr
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
@@ -19,19 +30,212 @@ class PreBase:
         """Автоматически генерирует имя таблицы на основе имени класса."""
         return cls.__name__.lower()
 
-    id = Column(BigInteger, primary_key=True)
+    # В SQLite автоинкремент есть только у INTEGER PRIMARY KEY.
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
 
 
 Base = declarative_base(cls=PreBase)
 
-engine = create_async_engine(settings.database_url)
 
-AsyncSessionLocal = async_sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+class PoolMetrics:
+    """
+    Время получения соединений из пула.
+
+    Включает ожидание свободного соединения и открытие нового.
+    """
+
+    def __init__(self):
+        """Инициализация счётчиков."""
+        self.acquires = 0
+        self.acquire_seconds = 0.0
+        self.max_acquire_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Учитывает одно получение соединения."""
+        self.acquires += 1
+        self.acquire_seconds += seconds
+        self.max_acquire_seconds = max(self.max_acquire_seconds, seconds)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, замеряющий время получения соединения."""
+
+    def __init__(self, *args, **kwargs):
+        """Инициализация пула и его счётчиков."""
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.observe(time.perf_counter() - started)
+
+
+def _unique_statement_name() -> str:
+    """Имя подготовленного выражения, уникальное между соединениями."""
+    return f"__asyncpg_{uuid4()}__"
+
+
+def driver_options(timeout: int) -> dict:
+    """
+    Параметры подключения asyncpg (``connect_args``).
+
+    В режиме ``DB_PGBOUNCER`` (пулер в transaction mode) кэши
+    подготовленных выражений отключаются, имена выражений делаются
+    уникальными, а таймаут запроса задаётся на клиенте, так как
+    PgBouncer не пропускает параметры запуска сессии.
+
+    Args:
+        - timeout (int): Таймаут запроса, мс (0 - без ограничения).
+    """
+    connect_args: dict = {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+    if settings.db_pgbouncer:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_unique_statement_name,
+        )
+        if timeout:
+            connect_args["command_timeout"] = timeout / 1000
+    elif timeout:
+        connect_args["server_settings"] = {"statement_timeout": str(timeout)}
+    return connect_args
+
+
+def engine_options(database_url: str) -> dict:
+    """Параметры create_async_engine для пула и драйвера asyncpg."""
+    if make_url(database_url).get_backend_name() != "postgresql":
+        return {}
+
+    connect_args = driver_options(settings.db_statement_timeout)
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+def pool_status(engine) -> dict:
+    """Состояние пула соединений движка."""
+    pool = engine.pool
+    status: dict = {}
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(
+            acquires=pool.metrics.acquires,
+            acquire_seconds=round(pool.metrics.acquire_seconds, 6),
+            max_acquire_seconds=round(pool.metrics.max_acquire_seconds, 6),
+        )
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return status
+
+
+def create_engine(database_url: str) -> AsyncEngine:
+    """Движок с параметрами пула; при профилировании - с событиями SQL."""
+    db_engine = create_async_engine(
+        database_url, **engine_options(database_url)
+    )
+    if settings.profiling_enabled:
+        # Импорт здесь: модели и Alembic не тянут профилирование.
+        from app.core.profiling import instrument_engine
+
+        instrument_engine(db_engine)
+    return db_engine
+
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    """Движок основной БД (создаётся при первом обращении)."""
+    return create_engine(settings.database_url)
+
+
+@lru_cache
+def get_replica_engines() -> tuple[AsyncEngine, ...]:
+    """Движки реплик (создаются при первом обращении)."""
+    return tuple(create_engine(url) for url in settings.database_replica_urls)
+
+
+def get_all_engines() -> tuple[AsyncEngine, ...]:
+    """Основной движок и движки реплик."""
+    return (get_engine(), *get_replica_engines())
+
+
+@lru_cache
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Фабрика сессий основной БД."""
+    return async_sessionmaker(
+        get_engine(), class_=AsyncSession, expire_on_commit=False
+    )
+
+
+def new_session(**kwargs) -> AsyncSession:
+    """Новая сессия (``bind`` переопределяет движок)."""
+    return get_sessionmaker()(**kwargs)
+
+
+STICKY_COOKIE = "primary_until"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def mark_sticky(request: Request, response: Response) -> None:
+    """
+    Закрепляет клиента за основной БД после успешной записи.
+
+    Клиент получает cookie со временем окончания закрепления, и в
+    течение ``REPLICA_STICKY_SECONDS`` его чтения идут в основную БД,
+    чтобы он видел свои изменения, даже если реплика отстаёт.
+    """
+    if (
+        get_replica_engines()
+        and request.method not in READ_METHODS
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(time.time() + settings.replica_sticky_seconds),
+            max_age=settings.replica_sticky_seconds,
+            httponly=True,
+        )
+
+
+def is_sticky(request: Request) -> bool:
+    """Закреплён ли клиент за основной БД после недавней записи."""
+    try:
+        sticky_until = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    return sticky_until > time.time()
+
+
+def get_read_engine(request: Request) -> AsyncEngine:
+    """Движок для чтения: случайная реплика или основная БД."""
+    replica_engines = get_replica_engines()
+    if not replica_engines or is_sticky(request):
+        return get_engine()
+    return random.choice(replica_engines)
 
 
 async def get_async_session():
     """Генератор для получения асинхронной сессии базы данных."""
-    async with AsyncSessionLocal() as async_session:
+    async with new_session() as async_session:
+        yield async_session
+
+
+async def get_read_session(request: Request):
+    """Генератор сессии только для чтения (реплика, если настроена)."""
+    async with new_session(bind=get_read_engine(request)) as async_session:
         yield async_session
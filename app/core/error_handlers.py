@@ -29,7 +29,18 @@ async def redis_exception_handler(
 async def not_found_handler(
     request: Request, exc: HTTPException
 ) -> JSONResponse:
-    """Обработчик ошибок 404."""
+    """
+    Обработчик ошибок HTTPException.
+
+    Ответ 404 заменяется общим сообщением, остальные коды (400, 412 и т.д.)
+    возвращаются клиенту как есть.
+    """
+    if exc.status_code != status.HTTP_404_NOT_FOUND:
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail},
+            headers=exc.headers,
+        )
     return JSONResponse(
         status_code=status.HTTP_404_NOT_FOUND,
         content={"detail": "Ресурс не найден"},
@@ -0,0 +1,310 @@
+"""
+Профилирование запросов: тайминги SQL, Redis и сериализации.
+
+Включается ``PROFILING_ENABLED``. Для каждого запроса собираются число и
+время SQL-запросов (события движков SQLAlchemy), команд Redis и
+рендеринга ответа; они отдаются заголовком ``Server-Timing`` и
+накапливаются в гистограммах ``/metrics`` (формат Prometheus).
+Оставшееся время (``app``) - код эндпоинта, гидрация ORM и валидация
+pydantic.
+
+Запрос с заголовком ``X-Profile: <PROFILING_TOKEN>`` выполняется под
+сэмплирующим профилировщиком pyinstrument, и вместо ответа
+возвращается HTML-отчёт.
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Iterable, Optional, Sequence
+
+from fastapi.responses import HTMLResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PROFILE_HEADER = "x-profile"
+SLOW_PARAMS_LIMIT = 1000
+
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Гистограмма с метками в текстовом формате Prometheus."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ):
+        """Инициализация пустой гистограммы."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Метки -> [счётчики корзин..., сумма, количество].
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Добавляет наблюдение в серию с метками ``labels``."""
+        series = self._series.get(labels)
+        if series is None:
+            series = [0] * len(self.buckets) + [0.0, 0]
+            self._series[labels] = series
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> Iterable[str]:
+        """Строки гистограммы для ``/metrics``."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self._series.items()):
+            pairs = [
+                f'{name}="{value}"'
+                for name, value in zip(self.labelnames, labels)
+            ]
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = ",".join([*pairs, f'le="{bound}"'])
+                yield f"{self.name}_bucket{{{le}}} {cumulative}"
+            le = ",".join([*pairs, 'le="+Inf"'])
+            yield f"{self.name}_bucket{{{le}}} {series[-1]}"
+            suffix = f"{{{','.join(pairs)}}}" if pairs else ""
+            yield f"{self.name}_sum{suffix} {series[-2]}"
+            yield f"{self.name}_count{suffix} {series[-1]}"
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса.",
+    ("method", "route", "status"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Число SQL-запросов на HTTP-запрос.",
+    ("route",),
+    COUNT_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Время выполнения SQL-запроса."
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Время выполнения команды Redis.",
+    ("command",),
+)
+RENDER_DURATION = Histogram(
+    "response_render_duration_seconds", "Время сериализации тела ответа."
+)
+METRICS = (
+    REQUEST_DURATION,
+    REQUEST_DB_QUERIES,
+    DB_QUERY_DURATION,
+    REDIS_COMMAND_DURATION,
+    RENDER_DURATION,
+)
+
+
+class RequestTimings:
+    """Тайминги одного запроса."""
+
+    __slots__ = (
+        "db_count",
+        "db_seconds",
+        "redis_count",
+        "redis_seconds",
+        "render_seconds",
+    )
+
+    def __init__(self):
+        """Инициализация нулевых таймингов."""
+        self.db_count = 0
+        self.db_seconds = 0.0
+        self.redis_count = 0
+        self.redis_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def server_timing(self, total: float) -> str:
+        """Значение заголовка ``Server-Timing`` (длительности в мс)."""
+        app = total - self.db_seconds - self.redis_seconds
+        app -= self.render_seconds
+        return ", ".join(
+            [
+                f'db;dur={self.db_seconds * 1000:.2f};desc="'
+                f'{self.db_count} queries"',
+                f'redis;dur={self.redis_seconds * 1000:.2f};desc="'
+                f'{self.redis_count} commands"',
+                f"render;dur={self.render_seconds * 1000:.2f}",
+                f"app;dur={max(app, 0) * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def record_db(seconds: float) -> None:
+    """Учитывает SQL-запрос текущего HTTP-запроса."""
+    timings = _timings.get()
+    if timings is None:
+        return
+    timings.db_count += 1
+    timings.db_seconds += seconds
+    DB_QUERY_DURATION.observe(seconds)
+
+
+def record_redis(command: str, seconds: float) -> None:
+    """Учитывает команду Redis текущего HTTP-запроса."""
+    timings = _timings.get()
+    if timings is None:
+        return
+    timings.redis_count += 1
+    timings.redis_seconds += seconds
+    REDIS_COMMAND_DURATION.observe(seconds, command)
+
+
+def record_render(seconds: float) -> None:
+    """Учитывает сериализацию ответа текущего HTTP-запроса."""
+    timings = _timings.get()
+    if timings is None:
+        return
+    timings.render_seconds += seconds
+    RENDER_DURATION.observe(seconds)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Подписывает движок на события выполнения запросов.
+
+    Запросы дольше ``PROFILING_SLOW_QUERY_MS`` пишутся в лог вместе с
+    параметрами.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, params, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, params, context, many):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        record_db(elapsed)
+        if elapsed * 1000 >= settings.profiling_slow_query_ms:
+            logging.warning(
+                f"Медленный запрос ({elapsed * 1000:.1f} мс): {statement}; "
+                f"параметры: {repr(params)[:SLOW_PARAMS_LIMIT]}"
+            )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection and context.connection.info.get(
+            "query_started"
+        )
+        if started:
+            started.pop()
+
+
+def render_metrics() -> str:
+    """Все гистограммы в текстовом формате Prometheus."""
+    lines = [line for metric in METRICS for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+class ProfilingMiddleware:
+    """ASGI-middleware с таймингами запроса и профилем по заголовку."""
+
+    def __init__(self, app: ASGIApp):
+        """Инициализация middleware."""
+        self.app = app
+
+    @staticmethod
+    def _profile_requested(scope: Scope) -> bool:
+        """Запрошен ли профиль (заголовок совпадает с токеном)."""
+        token = settings.profiling_token
+        return (
+            bool(token) and Headers(scope=scope).get(PROFILE_HEADER) == token
+        )
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send):
+        """Выполняет запрос под pyinstrument и отдаёт HTML-отчёт."""
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logging.warning("pyinstrument не установлен, профиль не снят")
+            return await self.app(scope, receive, send)
+
+        async def discard(message: Message) -> None:
+            pass
+
+        profiler = Profiler(
+            interval=settings.profiling_interval, async_mode="enabled"
+        )
+        with profiler:
+            await self.app(scope, receive, discard)
+        await HTMLResponse(profiler.output_html())(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Обработка запроса."""
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timings(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    timings.server_timing(time.perf_counter() - started),
+                )
+            await send(message)
+
+        try:
+            if self._profile_requested(scope):
+                await self._profile(scope, receive, send)
+                status = 200
+            else:
+                await self.app(scope, receive, send_with_timings)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "<unmatched>")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                path,
+                str(status),
+            )
+            REQUEST_DB_QUERIES.observe(timings.db_count, path)
+            _timings.reset(token)
@@ -1,11 +1,57 @@
 """Модуль для работы с базой данных через SQLAlchemy."""
 
+import time
+from functools import lru_cache
+
 import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline
+
 from app.core.config import settings
+from app.core.profiling import record_redis
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline, учитывающий время выполнения в профилировании."""
+
+    async def execute(self, raise_on_error: bool = True):
+        """Выполняет накопленные команды."""
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            record_redis("PIPELINE", time.perf_counter() - started)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """Клиент Redis, учитывающий время команд в профилировании."""
+
+    async def execute_command(self, *args, **options):
+        """Выполняет команду."""
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_redis(str(args[0]).upper(), time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        """Pipeline с тем же учётом времени."""
+        return InstrumentedPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint,
+        )
+
 
-redis = aioredis.Redis(
-    host=settings.redis_host,
-    port=settings.redis_port,
-    db=settings.redis_db,
-    decode_responses=True,
-)
+@lru_cache
+def get_redis() -> aioredis.Redis:
+    """Клиент Redis (создаётся при первом обращении)."""
+    redis_class = (
+        InstrumentedRedis if settings.profiling_enabled else aioredis.Redis
+    )
+    return redis_class(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        decode_responses=True,
+    )
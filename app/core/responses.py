@@ -0,0 +1,27 @@
+"""Классы JSON-ответов с замером времени сериализации."""
+
+import time
+
+from fastapi import responses
+
+from app.core.profiling import record_render
+
+
+class TimedRenderMixin:
+    """Учитывает время ``render`` в таймингах текущего запроса."""
+
+    def render(self, content) -> bytes:
+        """Сериализует тело ответа."""
+        started = time.perf_counter()
+        try:
+            return super().render(content)  # type: ignore[misc]
+        finally:
+            record_render(time.perf_counter() - started)
+
+
+class JSONResponse(TimedRenderMixin, responses.JSONResponse):
+    """JSON-ответ (стандартный json)."""
+
+
+class ORJSONResponse(TimedRenderMixin, responses.ORJSONResponse):
+    """JSON-ответ (orjson)."""
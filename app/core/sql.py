@@ -0,0 +1,170 @@
+"""SQL-конструкции, различающиеся между PostgreSQL и SQLite."""
+
+from typing import Sequence
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Float,
+    Table,
+    any_,
+    bindparam,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class storage_seconds(FunctionElement):
+    """
+    Разница двух меток времени в секундах: ``storage_seconds(end, start)``.
+
+    В PostgreSQL это ``EXTRACT(EPOCH FROM end - start)``, в SQLite
+    (метки хранятся строками) считается через ``julianday``.
+    """
+
+    type = Float()
+    inherit_cache = True
+    name = "storage_seconds"
+
+
+@compiles(storage_seconds)
+def _storage_seconds_default(element, compiler, **kw):
+    end, start = list(element.clauses)
+    return "EXTRACT(EPOCH FROM %s - %s)" % (
+        compiler.process(end, **kw),
+        compiler.process(start, **kw),
+    )
+
+
+@compiles(storage_seconds, "sqlite")
+def _storage_seconds_sqlite(element, compiler, **kw):
+    end, start = list(element.clauses)
+    return "(julianday(%s) - julianday(%s)) * 86400.0" % (
+        compiler.process(end, **kw),
+        compiler.process(start, **kw),
+    )
+
+
+class in_stock_at(FunctionElement):
+    """
+    Метка входит в период хранения: ``in_stock_at(added, removed, ts)``.
+
+    Период - полуинтервал ``[added, removed)``, ``removed IS NULL`` -
+    рулон ещё на складе. В PostgreSQL это ``tsrange(least(added,
+    removed), removed) @> ts``, что использует GiST-индекс
+    ``ix_rolls_stock_period`` по тому же выражению. ``least`` (NULL
+    игнорируется) делает период рулона с ``removed < added`` пустым,
+    а не ошибкой построения диапазона. В SQLite - сравнения с обоими
+    концами, они дают тот же результат.
+    """
+
+    type = Boolean()
+    inherit_cache = True
+    name = "in_stock_at"
+
+
+@compiles(in_stock_at)
+def _in_stock_at_default(element, compiler, **kw):
+    added, removed, ts = (
+        compiler.process(clause, **kw) for clause in element.clauses
+    )
+    return "tsrange(least(%s, %s), %s) @> %s" % (added, removed, removed, ts)
+
+
+@compiles(in_stock_at, "sqlite")
+def _in_stock_at_sqlite(element, compiler, **kw):
+    added, removed, ts = (
+        compiler.process(clause, **kw) for clause in element.clauses
+    )
+    return "(%s <= %s AND (%s IS NULL OR %s > %s))" % (
+        added,
+        ts,
+        removed,
+        removed,
+        ts,
+    )
+
+
+# Усечение метки времени в SQLite (метки хранятся строками).
+SQLITE_TRUNC = {
+    "hour": "strftime('%%Y-%%m-%%d %%H:00:00', %s)",
+    "day": "datetime(%s, 'start of day')",
+    "week": "datetime(%s, 'start of day', 'weekday 0', '-6 days')",
+}
+
+
+class date_trunc(FunctionElement):
+    """
+    Начало часа, дня или недели (с понедельника), содержащих метку.
+
+    ``date_trunc(unit, column)``: в PostgreSQL это встроенная
+    ``date_trunc``, в SQLite - ``datetime``/``strftime`` с модификаторами.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+    name = "date_trunc"
+
+    def __init__(self, unit: str, column):
+        """Единица ``unit`` подставляется в текст запроса литералом."""
+        if unit not in SQLITE_TRUNC:
+            raise ValueError(f"Неизвестная единица усечения: {unit}")
+        super().__init__(literal_column(f"'{unit}'"), column)
+
+
+@compiles(date_trunc)
+def _date_trunc_default(element, compiler, **kw):
+    unit, column = list(element.clauses)
+    return "date_trunc(%s, %s)" % (
+        compiler.process(unit, **kw),
+        compiler.process(column, **kw),
+    )
+
+
+@compiles(date_trunc, "sqlite")
+def _date_trunc_sqlite(element, compiler, **kw):
+    unit, column = list(element.clauses)
+    template = SQLITE_TRUNC[unit.name.strip("'")]
+    return template % compiler.process(column, **kw)
+
+
+def upsert(session: AsyncSession, table: Table):
+    """
+    Возвращает INSERT с поддержкой ``on_conflict_do_update``.
+
+    Args:
+        - session (AsyncSession): Сессия, по движку которой выбирается
+          диалект.
+        - table (Table): Таблица для вставки.
+    """
+    if session.bind.dialect.name == "sqlite":
+        return sqlite_insert(table)
+    return pg_insert(table)
+
+
+def in_values(session: AsyncSession, column, values: Sequence):
+    """
+    Условие «значение колонки входит в ``values``».
+
+    В PostgreSQL это ``column = ANY(:values)`` с одним параметром-массивом:
+    текст запроса не зависит от числа значений, поэтому подготовленное
+    выражение переиспользуется. В SQLite - обычный ``IN``.
+
+    Args:
+        - session (AsyncSession): Сессия, по движку которой выбирается
+          диалект.
+        - column: Колонка.
+        - values (Sequence): Значения.
+    """
+    if session.bind.dialect.name == "sqlite":
+        return column.in_(values)
+    return column == any_(
+        bindparam(
+            "values", list(values), type_=ARRAY(column.type), unique=True
+        )
+    )
@@ -1,13 +1,22 @@
 """CRUD, для модели Rolls."""
 
-from typing import Generic, Optional, Type, TypeVar
-from fastapi.encoders import jsonable_encoder
+from typing import (
+    AsyncIterator,
+    Generic,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import Row, func, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.filters import RollsFilter
+from app.schemas.pagination import KeysetPagination
 
 from app.core.db import Base
+from app.core.sql import in_stock_at, in_values
 
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -47,6 +56,53 @@ class CRUDbase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         return db_obj.scalars().first()
 
+    async def get_row(
+        self, obj_id: int, columns: Sequence[str], session: AsyncSession
+    ) -> Optional[Row]:
+        """
+        Получает колонки объекта по ID без создания ORM-объекта.
+
+        Args:
+            - obj_id (int): ID объекта.
+            - columns (Sequence[str]): Имена выбираемых колонок.
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            - Optional[Row]: Строка с колонками или None.
+        """
+        result = await session.execute(
+            select(*(getattr(self.model, name) for name in columns)).where(
+                self.model.id == obj_id
+            )
+        )
+        return result.first()
+
+    async def get_many(
+        self, ids: Sequence[int], columns: Sequence[str], session: AsyncSession
+    ) -> list[Row]:
+        """
+        Получает колонки объектов по списку ID одним запросом.
+
+        Args:
+            - ids (Sequence[int]): ID объектов.
+            - columns (Sequence[str]): Имена выбираемых колонок (должны
+              включать ``id``).
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            - list[Row]: Найденные строки в порядке ``ids`` (без
+              отсутствующих и повторов).
+        """
+        result = await session.execute(
+            select(*(getattr(self.model, name) for name in columns)).where(
+                in_values(session, self.model.id, ids)
+            )
+        )
+        rows = {row.id: row for row in result}
+        return [
+            rows[obj_id] for obj_id in dict.fromkeys(ids) if obj_id in rows
+        ]
+
     async def create(
         self,
         obj_in: CreateSchemaType,
@@ -75,6 +131,40 @@ class CRUDbase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         return db_obj
 
+    async def create_many(
+        self,
+        objs_in: Sequence[CreateSchemaType],
+        session: AsyncSession,
+        commit: bool = True,
+    ) -> list[ModelType]:
+        """
+        Создаёт несколько объектов одним запросом.
+
+        Строки вставляются пакетным ``INSERT ... VALUES (...), (...)
+        RETURNING`` в одной транзакции, без отдельного ``refresh`` для
+        каждого объекта.
+
+        Args:
+            - objs_in (Sequence[CreateSchemaType]): Данные для создания.
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            - commit (bool): Нужно ли коммитить изменения.
+
+        Returns:
+            - list[ModelType]: Созданные объекты в порядке входных данных.
+        """
+        result = await session.scalars(
+            insert(self.model).returning(
+                self.model, sort_by_parameter_order=True
+            ),
+            [obj_in.model_dump() for obj_in in objs_in],
+        )
+        db_objs = list(result.all())
+
+        if commit:
+            await session.commit()
+
+        return db_objs
+
     async def update(
         self,
         db_obj,
@@ -94,12 +184,14 @@ class CRUDbase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             - ModelType: Обновленный объект.
         """
-        obj_data = jsonable_encoder(db_obj)
+        columns = self.model.__table__.columns.keys()
         update_data = obj_in.model_dump(exclude_unset=True)
 
         for field in update_data:
-            if field in obj_data:
+            if field in columns:
                 setattr(db_obj, field, update_data[field])
+        if update_data and "version" in columns:
+            db_obj.version += 1
 
         if commit:
             await session.commit()
@@ -107,6 +199,134 @@ class CRUDbase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         return db_obj
 
+    def _bump_version(self, values: dict) -> dict:
+        """Добавляет к значениям UPDATE увеличение ``version``."""
+        if "version" not in self.model.__table__.columns:
+            return values
+        return {**values, "version": self.model.version + 1}
+
+    async def update_by_id(
+        self,
+        obj_id: int,
+        values: dict,
+        session: AsyncSession,
+        version: Optional[int] = None,
+        only_active: bool = False,
+        commit: bool = True,
+    ) -> Optional[Row]:
+        """
+        Обновляет объект по ID одним ``UPDATE ... RETURNING``.
+
+        Если задана ``version``, строка обновляется только при совпадении
+        версии (оптимистичная блокировка): параллельная правка между
+        чтением и записью не затирается, а приводит к ``None``.
+
+        Args:
+            - obj_id (int): ID объекта.
+            - values (dict): Новые значения полей.
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            - version (int | None): Ожидаемая версия объекта.
+            - only_active (bool): Не трогать объект с ``removed_at``.
+            - commit (bool): Нужно ли коммитить изменения.
+
+        Returns:
+            - Row | None: Обновлённая строка или None, если объект не
+              найден, уже удалён (``only_active``) или версия не совпала.
+              Без ``values`` запись не выполняется (версия не растёт), а
+              возвращается текущая строка при тех же условиях.
+        """
+        conditions = [self.model.id == obj_id]
+        if version is not None:
+            conditions.append(self.model.version == version)
+        if only_active:
+            conditions.append(self.model.removed_at.is_(None))
+
+        if not values:
+            result = await session.execute(
+                select(*self.model.__table__.columns).where(*conditions)
+            )
+            return result.first()
+
+        result = await session.execute(
+            update(self.model)
+            .where(*conditions)
+            .values(**self._bump_version(values))
+            .returning(*self.model.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.first()
+
+        if commit:
+            await session.commit()
+
+        return updated
+
+    async def update_many(
+        self,
+        values: dict,
+        session: AsyncSession,
+        ids: Optional[Sequence[int]] = None,
+        filters: Optional[RollsFilter] = None,
+        only_active: bool = False,
+        commit: bool = True,
+    ) -> list[Row]:
+        """
+        Обновляет объекты по списку ID или фильтру одним UPDATE.
+
+        Args:
+            - values (dict): Новые значения полей.
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            - ids (Sequence[int] | None): ID объектов.
+            - filters (RollsFilter | None): Фильтр, если ID не заданы.
+            - only_active (bool): Не трогать объекты с ``removed_at``.
+            - commit (bool): Нужно ли коммитить изменения.
+
+        Returns:
+            - list[Row]: Обновлённые строки.
+
+        Raises:
+            - ValueError: Не заданы ни ``ids``, ни ``filters``.
+        """
+        stmt = update(self.model).values(**self._bump_version(values))
+        if ids is not None:
+            stmt = stmt.where(self.model.id.in_(ids))
+        elif filters is not None:
+            stmt = self._apply_filters(stmt, filters)
+        else:
+            raise ValueError("Нужно указать ids или filters")
+        if only_active:
+            stmt = stmt.where(self.model.removed_at.is_(None))
+
+        result = await session.execute(
+            stmt.returning(*self.model.__table__.columns).execution_options(
+                synchronize_session=False
+            )
+        )
+        updated = list(result.all())
+
+        if commit:
+            await session.commit()
+
+        return updated
+
+    async def existing_ids(
+        self, ids: Sequence[int], session: AsyncSession
+    ) -> set[int]:
+        """
+        Возвращает те ID из переданных, которые есть в базе данных.
+
+        Args:
+            - ids (Sequence[int]): Проверяемые ID.
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            - set[int]: Существующие ID.
+        """
+        result = await session.scalars(
+            select(self.model.id).where(self.model.id.in_(ids))
+        )
+        return set(result.all())
+
     async def remove(self, db_obj, session: AsyncSession) -> ModelType:
         """
         Удаляет объект из базы данных.
@@ -123,21 +343,17 @@ class CRUDbase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         return db_obj
 
-    async def filter(
-        self, session: AsyncSession, filters: RollsFilter
-    ) -> list[ModelType]:
+    def _apply_filters(self, query, filters: RollsFilter):
         """
-        Фильтрует объекты по переданным параметрам.
+        Добавляет к запросу условия из фильтра.
 
         Args:
-            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            - query (Select): Запрос SQLAlchemy.
             - filters (RollsFilter): Объект фильтров.
 
         Returns:
-            - list[ModelType]: Найденные объекты.
+            - Select: Запрос с условиями WHERE.
         """
-        query = select(self.model)
-
         if filters.min_length is not None:
             query = query.where(self.model.length >= filters.min_length)
         if filters.max_length is not None:
@@ -160,5 +376,134 @@ class CRUDbase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 self.model.removed_at <= filters.removed_before
             )
 
+        if filters.present_at is not None:
+            query = query.where(
+                in_stock_at(
+                    self.model.added_at,
+                    self.model.removed_at,
+                    filters.present_at,
+                )
+            )
+
+        return query
+
+    async def totals(self, session: AsyncSession, filters: RollsFilter) -> Row:
+        """
+        Количество, суммарный вес и длина отфильтрованных объектов.
+
+        Args:
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            - filters (RollsFilter): Объект фильтров.
+
+        Returns:
+            - Row: ``count``, ``total_weight``, ``total_length``.
+        """
+        query = self._apply_filters(
+            select(
+                func.count(self.model.id).label("count"),
+                func.coalesce(func.sum(self.model.weight), 0).label(
+                    "total_weight"
+                ),
+                func.coalesce(func.sum(self.model.length), 0).label(
+                    "total_length"
+                ),
+            ),
+            filters,
+        )
         result = await session.execute(query)
-        return result.scalars().all()
+        return result.one()
+
+    async def filter(
+        self, session: AsyncSession, filters: RollsFilter
+    ) -> list[ModelType]:
+        """
+        Фильтрует объекты по переданным параметрам.
+
+        Args:
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            - filters (RollsFilter): Объект фильтров.
+
+        Returns:
+            - list[ModelType]: Найденные объекты.
+        """
+        query = self._apply_filters(select(self.model), filters)
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+    async def paginate(
+        self,
+        session: AsyncSession,
+        filters: RollsFilter,
+        pagination: KeysetPagination,
+        columns: Sequence[str],
+    ) -> Tuple[list[Row], Optional[str]]:
+        """
+        Возвращает одну страницу отфильтрованных строк.
+
+        Страница читается по ключу сортировки после курсора, поэтому
+        стоимость запроса не зависит от номера страницы и размера таблицы.
+        Выбираются только колонки, без создания ORM-объектов.
+
+        Args:
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            - filters (RollsFilter): Объект фильтров.
+            - pagination (KeysetPagination): Параметры страницы.
+            - columns (Sequence[str]): Имена выбираемых колонок (должны
+              включать ключ сортировки).
+
+        Returns:
+            - Tuple[list[Row], Optional[str]]: Строки страницы и курсор
+              следующей страницы (None, если она последняя).
+        """
+        key: tuple
+        if pagination.order_by == "added_at":
+            key = (self.model.added_at, self.model.id)
+        else:
+            key = (self.model.id,)
+
+        query = self._apply_filters(
+            select(*(getattr(self.model, name) for name in columns)), filters
+        )
+        if pagination.after is not None:
+            query = query.where(tuple_(*key) > tuple_(*pagination.after))
+        query = query.order_by(*key).limit(pagination.limit + 1)
+
+        result = await session.execute(query)
+        items = list(result.all())
+        if len(items) <= pagination.limit:
+            return items, None
+        items = items[: pagination.limit]
+        return items, pagination.encode_cursor(items[-1])
+
+    async def stream(
+        self,
+        session: AsyncSession,
+        filters: RollsFilter,
+        columns: Sequence[str],
+        batch_size: int,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Потоково читает отфильтрованные строки пачками.
+
+        Используется серверный курсор (``AsyncSession.stream``) с
+        ``yield_per``, строки возвращаются кортежами колонок без создания
+        ORM-объектов, поэтому расход памяти ограничен размером пачки.
+
+        Args:
+            - session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            - filters (RollsFilter): Объект фильтров.
+            - columns (Sequence[str]): Имена выбираемых колонок.
+            - batch_size (int): Количество строк в пачке.
+
+        Yields:
+            - Sequence[Row]: Очередная пачка строк.
+        """
+        query = self._apply_filters(
+            select(*(getattr(self.model, name) for name in columns)),
+            filters,
+        ).order_by(self.model.id)
+        result = await session.stream(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
@@ -1,6 +1,11 @@
 """Основное приложение FastAPI."""
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.error_handlers import (
@@ -9,13 +14,79 @@ from app.core.error_handlers import (
     not_found_handler,
 )
 from app.api.routers import main_router
+from app.core.cache import listen_invalidations
 from app.core.config import settings
+from app.core.db import get_all_engines, mark_sticky
+from app.core.redis import get_redis
+from app.core.profiling import ProfilingMiddleware, render_metrics
+from app.core.responses import JSONResponse
+from app.services.health import warm_up
+from app.services.matview import run_matview_refresh
+from app.services.rollup import run_compaction
 from redis.exceptions import ConnectionError as RedisConnectionError
 
-app = FastAPI(title=settings.title, description=settings.description)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запуск и остановка фоновых задач приложения.
+
+    При старте соединения с БД и Redis открываются заранее, а частые
+    запросы прогреваются. При остановке (после завершения текущих
+    запросов) соединения пулов закрываются.
+    """
+    await warm_up()
+    tasks = [asyncio.create_task(listen_invalidations())]
+    if (
+        settings.statistics_source == "rollup"
+        and settings.rollup_compaction_interval > 0
+    ):
+        tasks.append(asyncio.create_task(run_compaction()))
+    if (
+        settings.statistics_source == "matview"
+        and settings.statistics_matview_refresh_interval > 0
+    ):
+        tasks.append(asyncio.create_task(run_matview_refresh()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    for db_engine in get_all_engines():
+        await db_engine.dispose()
+    # aclose() есть в redis 5, но не в заглушках types-redis.
+    await get_redis().aclose()  # type: ignore[attr-defined]
+
+
+app = FastAPI(
+    title=settings.title,
+    description=settings.description,
+    lifespan=lifespan,
+    default_response_class=JSONResponse,
+)
 
 app.include_router(main_router)
 
+
+@app.middleware("http")
+async def replica_stickiness(request: Request, call_next):
+    """Read-your-writes: после записи клиент читает из основной БД."""
+    response = await call_next(request)
+    mark_sticky(request, response)
+    return response
+
+
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Гистограммы профилирования в формате Prometheus."""
+        return PlainTextResponse(
+            render_metrics(), media_type="text/plain; version=0.0.4"
+        )
+
+
 app.add_exception_handler(SQLAlchemyError, db_exception_handler)
 app.add_exception_handler(RedisConnectionError, redis_exception_handler)
 app.add_exception_handler(HTTPException, not_found_handler)
@@ -2,7 +2,7 @@
 
 from datetime import datetime as dt
 
-from sqlalchemy import Column, DateTime, Float
+from sqlalchemy import Column, DateTime, Float, Index, Integer, func
 
 from app.core.db import Base
 
@@ -17,12 +17,34 @@ class Rolls(Base):
         weight (float): Вес рулона (в килограммах).
         added_at (datetime): Дата и время добавления рулона на склад.
         removed_at (datetime): Дата и время удаления рулона с склада.
+        version (int): Версия записи, растёт при каждом изменении
+            (оптимистичная блокировка, ETag).
     """
 
     length = Column(Float, default=0, nullable=False)
     weight = Column(Float, default=0, nullable=False)
     added_at = Column(DateTime, default=dt.utcnow, nullable=False)
     removed_at = Column(DateTime)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+
+    __table_args__ = (
+        # Диапазоны по added_at и keyset-пагинация по (added_at, id).
+        Index("ix_rolls_added_at_id", "added_at", "id"),
+        Index("ix_rolls_removed_at", "removed_at"),
+        # Рулоны на складе: малая доля таблицы, самые частые запросы.
+        Index(
+            "ix_rolls_in_stock",
+            "added_at",
+            postgresql_where=removed_at.is_(None),
+            sqlite_where=removed_at.is_(None),
+        ),
+        # Рулоны на складе в момент T (см. app.core.sql.in_stock_at).
+        Index(
+            "ix_rolls_stock_period",
+            func.tsrange(func.least(added_at, removed_at), removed_at),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     def __repr__(self):
         """
@@ -0,0 +1,38 @@
+"""Модель дневных скетчей квантилей по рулонам."""
+
+from sqlalchemy import Column, Date, Integer, String, UniqueConstraint
+
+from app.core.db import Base
+
+
+class RollsDailySketch(Base):
+    """
+    Счётчик одной корзины дневного скетча квантилей.
+
+    Скетч метрики за день - все строки с этими ``day`` и ``metric``
+    (см. ``app.services.sketch``). Метрики ``length`` и ``weight``
+    относятся к рулонам, добавленным в этот день, ``storage`` (срок
+    хранения в секундах) - к рулонам, удалённым в этот день.
+
+    Атрибуты:
+        day (date): День.
+        metric (str): Метрика: ``length``, ``weight`` или ``storage``.
+        bucket (int): Номер корзины.
+        count (int): Количество значений в корзине.
+    """
+
+    __tablename__ = "rolls_daily_sketches"
+
+    day = Column(Date, nullable=False)
+    metric = Column(String(16), nullable=False)
+    bucket = Column(Integer, nullable=False)
+    count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    __table_args__ = (UniqueConstraint("day", "metric", "bucket"),)
+
+    def __repr__(self):
+        """Представление объекта в строковом виде для удобства отладки."""
+        return (
+            f"<RollsDailySketch(day={self.day}, metric={self.metric},"
+            f"bucket={self.bucket}, count={self.count})>"
+        )
@@ -0,0 +1,55 @@
+"""Модель дневных агрегатов по рулонам."""
+
+from sqlalchemy import Column, Date, Float, Integer, MetaData
+
+from app.core.db import Base
+
+
+class RollsDailyStats(Base):
+    """
+    Дневной срез статистики по рулонам (rollup).
+
+    Статистика за период собирается из строк этой таблицы, а не из всех
+    рулонов. Агрегаты по длине и весу относятся к рулонам, добавленным
+    в этот день, агрегаты по сроку хранения - к рулонам, удалённым в этот
+    день.
+
+    Атрибуты:
+        day (date): День.
+        added_count (int): Количество добавленных рулонов.
+        removed_count (int): Количество удалённых рулонов.
+        length_sum (float): Суммарная длина добавленных рулонов.
+        weight_sum (float): Суммарный вес добавленных рулонов.
+        min_length, max_length (float): Крайние длины добавленных рулонов.
+        min_weight, max_weight (float): Крайние веса добавленных рулонов.
+        min_storage_seconds, max_storage_seconds (float): Крайние сроки
+            хранения удалённых рулонов (в секундах).
+    """
+
+    __tablename__ = "rolls_daily_stats"
+
+    day = Column(Date, nullable=False, unique=True)
+    added_count = Column(Integer, default=0, server_default="0")
+    removed_count = Column(Integer, default=0, server_default="0")
+    length_sum = Column(Float, default=0, server_default="0")
+    weight_sum = Column(Float, default=0, server_default="0")
+    min_length = Column(Float)
+    max_length = Column(Float)
+    min_weight = Column(Float)
+    max_weight = Column(Float)
+    min_storage_seconds = Column(Float)
+    max_storage_seconds = Column(Float)
+
+    def __repr__(self):
+        """Представление объекта в строковом виде для удобства отладки."""
+        return (
+            f"<RollsDailyStats(day={self.day}, added={self.added_count},"
+            f"removed={self.removed_count})>"
+        )
+
+
+# Материализованное представление с теми же агрегатами по дням (только
+# PostgreSQL). Создаётся миграцией и не входит в Base.metadata.
+rolls_daily_stats_mv = RollsDailyStats.__table__.to_metadata(
+    MetaData(), name="rolls_daily_stats_mv"
+)
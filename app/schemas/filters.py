@@ -1,6 +1,7 @@
 """Схема для фильтрации рулонов."""
 
 from datetime import date
+from datetime import datetime as dt
 from typing import Optional
 from pydantic_filters import BaseFilter
 
@@ -20,6 +21,8 @@ class RollsFilter(BaseFilter):
     removed_after: Optional[date] = None
     removed_before: Optional[date] = None
 
+    present_at: Optional[dt] = None
+
     model_config = {
         "orm_mode": True,
     }
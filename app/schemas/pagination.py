@@ -0,0 +1,69 @@
+"""
+Схема keyset-пагинации.
+
+Курсор кодирует значения ключа сортировки последней выданной записи,
+поэтому следующая страница читается условием ``WHERE key > cursor``
+по индексу, без OFFSET и без подсчёта всех строк.
+"""
+
+import base64
+import json
+from datetime import datetime as dt
+from typing import Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+OrderBy = Literal["id", "added_at"]
+
+
+class CursorError(ValueError):
+    """Некорректный курсор пагинации."""
+
+
+class KeysetPagination(BaseModel):
+    """
+    Параметры keyset-пагинации.
+
+    Атрибуты:
+        limit (int): Размер страницы.
+        order_by (str): Ключ сортировки: ``id`` или ``added_at, id``.
+        after (tuple | None): Ключ последней записи предыдущей страницы.
+    """
+
+    limit: int = Field(..., ge=1)
+    order_by: OrderBy = "id"
+    after: Optional[Tuple] = None
+
+    def encode_cursor(self, obj) -> str:
+        """Формирует курсор, указывающий на запись ``obj``."""
+        if self.order_by == "added_at":
+            payload = [self.order_by, obj.added_at.isoformat(), obj.id]
+        else:
+            payload = [self.order_by, obj.id]
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[OrderBy, Tuple]:
+        """
+        Разбирает курсор.
+
+        Returns:
+            - Tuple[OrderBy, Tuple]: Ключ сортировки и значения ключа.
+
+        Raises:
+            - CursorError: Если курсор повреждён.
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            order_by, *values = json.loads(raw)
+            if order_by == "id" and len(values) == 1:
+                return "id", (int(values[0]),)
+            if order_by == "added_at" and len(values) == 2:
+                return "added_at", (
+                    dt.fromisoformat(values[0]),
+                    int(values[1]),
+                )
+        except (ValueError, TypeError):
+            pass
+        raise CursorError("Некорректный курсор")
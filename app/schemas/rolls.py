@@ -7,9 +7,12 @@
 """
 
 from datetime import datetime as dt
-from typing import Optional
+from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from app.core.config import setting_limit
+from app.schemas.filters import RollsFilter
 
 
 class RollsBase(BaseModel):
@@ -71,6 +74,9 @@ class RollsResponse(RollsBase):
     removed_at: Optional[dt] = Field(
         None, description="Дата удаления рулонна со склада"
     )
+    version: int = Field(
+        1, description="Версия рулона (ETag для заголовка If-Match)"
+    )
 
     class Config:
         """Пример данных schema_extra."""
@@ -82,5 +88,113 @@ class RollsResponse(RollsBase):
                 "weight": 100.0,
                 "added_at": "2024-01-01T12:00:00Z",
                 "removed_at": None,
+                "version": 1,
             }
         }
+
+
+class RollsPage(BaseModel):
+    """
+    Страница списка рулонов.
+
+    ``next_cursor`` передаётся в параметр ``cursor`` следующего запроса;
+    ``None`` означает, что страниц больше нет.
+    """
+
+    items: List[RollsResponse] = Field(..., description="Рулоны страницы")
+    next_cursor: Optional[str] = Field(
+        None, description="Курсор следующей страницы"
+    )
+
+
+class RollsBulkSelector(BaseModel):
+    """
+    Выбор рулонов для пакетной операции.
+
+    Задаётся ровно одно из полей: список ID или фильтр. Пустой фильтр
+    запрещён, чтобы случайно не затронуть весь склад.
+    """
+
+    ids: Annotated[
+        Optional[List[int]], setting_limit("rolls_bulk_max_size")
+    ] = Field(
+        None,
+        min_length=1,
+        description="ID рулонов (не больше ROLLS_BULK_MAX_SIZE)",
+    )
+    filters: Optional[RollsFilter] = Field(None, description="Фильтр рулонов")
+
+    @model_validator(mode="after")
+    def check_selector(self):
+        """Проверяет, что задан ровно один способ выбора."""
+        if (self.ids is None) == (self.filters is None):
+            raise ValueError("Нужно указать либо ids, либо filters")
+        if self.filters is not None and not self.filters.model_dump(
+            exclude_none=True
+        ):
+            raise ValueError("Фильтр должен содержать хотя бы одно условие")
+        return self
+
+    class Config:
+        """Пример данных schema_extra."""
+
+        schema_extra = {"example": {"ids": [1, 2, 3]}}
+
+
+class RollsBulkUpdate(RollsBulkSelector):
+    """Схема пакетного обновления: выбор рулонов и новые значения."""
+
+    values: RollsUpdate = Field(..., description="Новые данные рулонов")
+
+    class Config:
+        """Пример данных schema_extra."""
+
+        schema_extra = {
+            "example": {"ids": [1, 2, 3], "values": {"weight": 120.0}}
+        }
+
+
+class RollsAsOf(BaseModel):
+    """
+    Рулоны на складе в момент ``ts``.
+
+    ``items`` и ``next_cursor`` заполняются, только если запрошен список.
+    """
+
+    ts: dt = Field(..., description="Момент времени")
+    count: int = Field(..., description="Количество рулонов на складе")
+    total_weight: float = Field(..., description="Суммарный вес рулонов")
+    total_length: float = Field(..., description="Суммарная длина рулонов")
+    items: Optional[List[RollsResponse]] = Field(
+        None, description="Рулоны страницы"
+    )
+    next_cursor: Optional[str] = Field(
+        None, description="Курсор следующей страницы"
+    )
+
+
+class RollsBatch(BaseModel):
+    """Рулоны, запрошенные списком ID."""
+
+    items: List[RollsResponse] = Field(
+        ..., description="Найденные рулоны в порядке запроса"
+    )
+    missing: List[int] = Field(
+        default_factory=list, description="ID, которых нет в базе"
+    )
+
+
+class RollsBulkResult(BaseModel):
+    """
+    Результат пакетной операции.
+
+    ``missing`` и ``already_removed`` заполняются только при выборе по ID.
+    """
+
+    ids: List[int] = Field(..., description="ID изменённых рулонов")
+    missing: List[int] = Field(
+        default_factory=list, description="ID, которых нет на складе"
+    )
+    already_removed: List[int] = Field(
+        default_factory=list, description="ID уже удалённых рулонов"
+    )
@@ -0,0 +1,78 @@
+"""Схемы статистики по рулонам."""
+
+from datetime import date
+from datetime import datetime as dt
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+SeriesBucket = Literal["hour", "day", "week"]
+Language = Literal["ru", "en"]
+StatisticsFormat = Literal["raw", "ru", "en"]
+
+
+class StatisticsTotals(BaseModel):
+    """
+    Статистика за период в числах.
+
+    Длина и вес - по рулонам, добавленным за период, сроки хранения (в
+    секундах) - по рулонам, удалённым за период. ``None`` - нет данных.
+    """
+
+    added_count: int = Field(..., description="Добавлено рулонов")
+    removed_count: int = Field(..., description="Удалено рулонов")
+    avg_length: Optional[float] = Field(None, description="Средняя длина")
+    avg_weight: Optional[float] = Field(None, description="Средний вес")
+    min_length: Optional[float] = Field(None, description="Мин. длина")
+    max_length: Optional[float] = Field(None, description="Макс. длина")
+    min_weight: Optional[float] = Field(None, description="Мин. вес")
+    max_weight: Optional[float] = Field(None, description="Макс. вес")
+    total_weight: Optional[float] = Field(None, description="Общий вес")
+    min_storage_seconds: Optional[float] = Field(
+        None, description="Мин. срок хранения, с"
+    )
+    max_storage_seconds: Optional[float] = Field(
+        None, description="Макс. срок хранения, с"
+    )
+    median_length: Optional[float] = Field(None, description="Медиана длины")
+    p90_length: Optional[float] = Field(
+        None, description="90-й процентиль длины"
+    )
+    median_weight: Optional[float] = Field(None, description="Медиана веса")
+    p90_weight: Optional[float] = Field(
+        None, description="90-й процентиль веса"
+    )
+    median_storage_seconds: Optional[float] = Field(
+        None, description="Медиана срока хранения, с"
+    )
+    p90_storage_seconds: Optional[float] = Field(
+        None, description="90-й процентиль срока хранения, с"
+    )
+
+
+class StatisticsBucket(BaseModel):
+    """Статистика за один интервал ряда."""
+
+    start: dt = Field(..., description="Начало интервала")
+    added_count: int = Field(..., description="Добавлено рулонов")
+    removed_count: int = Field(..., description="Удалено рулонов")
+    weight_in_stock: float = Field(
+        ..., description="Вес рулонов на складе на конец интервала"
+    )
+    min_storage_seconds: Optional[float] = Field(
+        None, description="Минимальный срок хранения списанных рулонов, с"
+    )
+    max_storage_seconds: Optional[float] = Field(
+        None, description="Максимальный срок хранения списанных рулонов, с"
+    )
+
+
+class StatisticsSeries(BaseModel):
+    """Ряд статистики по интервалам за период."""
+
+    bucket: SeriesBucket = Field(..., description="Длина интервала")
+    start_date: date = Field(..., description="Начало периода")
+    end_date: date = Field(..., description="Конец периода")
+    items: List[StatisticsBucket] = Field(
+        ..., description="Интервалы по возрастанию начала"
+    )
@@ -0,0 +1,47 @@
+"""
+Запуск приложения в production-режиме.
+
+Несколько процессов uvicorn (``SERVER_WORKERS``, 0 - по числу ядер),
+цикл событий uvloop и парсер httptools (если установлены), без
+``--reload``. По SIGTERM воркеры перестают принимать соединения, ждут
+завершения текущих запросов до ``SERVER_GRACEFUL_TIMEOUT`` секунд и
+закрывают пулы БД и Redis в lifespan. Миграции выполняются отдельно
+(``alembic upgrade head``) до запуска.
+
+Запуск::
+
+    python -m app.server
+"""
+
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def worker_count() -> int:
+    """Число воркеров: из настроек или по числу ядер."""
+    if settings.server_workers > 0:
+        return settings.server_workers
+    return os.cpu_count() or 1
+
+
+def main() -> None:
+    """Запуск uvicorn с настройками ``SERVER_*``."""
+    uvicorn.run(
+        "app.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=worker_count(),
+        loop=settings.server_loop,
+        http=settings.server_http,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        timeout_keep_alive=settings.server_keepalive_timeout,
+        proxy_headers=True,
+        access_log=settings.debug,
+    )
+
+
+if __name__ == "__main__":
+    main()
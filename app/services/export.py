@@ -0,0 +1,108 @@
+"""Потоковая выгрузка рулонов в NDJSON и CSV."""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Literal, Sequence
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.db import new_session
+from app.crud.rolls import CRUDbase
+from app.schemas.filters import RollsFilter
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_COLUMNS = ("id", "length", "weight", "added_at", "removed_at")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class RollsExporter:
+    """
+    Выгрузка рулонов без буферизации всей выборки.
+
+    Строки читаются пачками через серверный курсор и сразу кодируются,
+    поэтому в памяти одновременно находится не больше одной пачки.
+    """
+
+    def __init__(
+        self,
+        crud: CRUDbase,
+        export_format: ExportFormat,
+        bind: AsyncEngine,
+    ):
+        """Инициализация выгрузки."""
+        self.crud = crud
+        self.format = export_format
+        self.bind = bind
+
+    @property
+    def media_type(self) -> str:
+        """MIME-тип ответа."""
+        return MEDIA_TYPES[self.format]
+
+    @staticmethod
+    def _encode_value(value):
+        """Приводит значение колонки к JSON/CSV-представлению."""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def _encode_ndjson(self, rows: Sequence[Row]) -> str:
+        """Кодирует пачку строк в NDJSON."""
+        return "".join(
+            json.dumps(
+                {
+                    name: self._encode_value(value)
+                    for name, value in zip(EXPORT_COLUMNS, row)
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+            for row in rows
+        )
+
+    def _encode_csv(self, rows: Sequence[Row]) -> str:
+        """Кодирует пачку строк в CSV."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            [self._encode_value(value) for value in row] for row in rows
+        )
+        return buffer.getvalue()
+
+    async def iter_chunks(self, filters: RollsFilter) -> AsyncIterator[str]:
+        """
+        Генерирует части ответа.
+
+        Сессия открывается внутри генератора: ответ отдаётся уже после
+        выхода из зависимостей эндпоинта, и их сессия к этому моменту
+        закрыта.
+
+        Args:
+            - filters (RollsFilter): Объект фильтров.
+
+        Yields:
+            - str: Закодированная пачка строк.
+        """
+        if self.format == "csv":
+            yield ",".join(EXPORT_COLUMNS) + "\r\n"
+        encode = (
+            self._encode_csv if self.format == "csv" else self._encode_ndjson
+        )
+
+        async with new_session(bind=self.bind) as session:
+            async for rows in self.crud.stream(
+                session,
+                filters=filters,
+                columns=EXPORT_COLUMNS,
+                batch_size=settings.export_batch_size,
+            ):
+                yield encode(rows)
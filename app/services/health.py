@@ -0,0 +1,148 @@
+"""Прогрев соединений и проверки готовности приложения."""
+
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+from typing import Awaitable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.db import get_all_engines, get_engine, get_replica_engines
+from app.core.redis import get_redis
+from app.crud.rolls import CRUDbase
+from app.models.rolls import Rolls
+from app.schemas.filters import RollsFilter
+from app.schemas.pagination import KeysetPagination
+from app.schemas.rolls import RollsCreate, RollsResponse, RollsUpdate
+from app.services.statistics import StatisticsService
+
+ROLL_COLUMNS = tuple(RollsResponse.model_fields)
+
+
+async def run_hot_statements(session: AsyncSession) -> None:
+    """
+    Выполняет самые частые запросы.
+
+    SQLAlchemy кэширует их компиляцию, а asyncpg готовит выражения на
+    соединении, поэтому первые запросы после старта не платят за это.
+    """
+    crud = CRUDbase[Rolls, RollsCreate, RollsUpdate](Rolls)
+    await crud.get_row(0, ROLL_COLUMNS, session)
+    await crud.paginate(
+        session,
+        RollsFilter(),
+        KeysetPagination(limit=settings.rolls_page_size),
+        ROLL_COLUMNS,
+    )
+    today = date.today()
+    await StatisticsService(session).aggregate(
+        today - timedelta(days=7), today
+    )
+
+
+async def warm_up_engine(db_engine: AsyncEngine, connections: int) -> int:
+    """
+    Открывает до ``connections`` соединений пула и прогревает их.
+
+    Соединения удерживаются одновременно, чтобы пул открыл каждое, и
+    возвращаются в пул. Их число ограничено размером пула: лишние
+    соединения сверх него закрылись бы при возврате.
+
+    Returns:
+        - int: Число прогретых соединений.
+    """
+    pool = db_engine.pool
+    if isinstance(pool, QueuePool):
+        connections = min(connections, pool.size())
+    if connections <= 0:
+        return 0
+    barrier = asyncio.Barrier(connections)
+
+    async def warm_one() -> None:
+        async with AsyncSession(db_engine) as session:
+            await run_hot_statements(session)
+            await barrier.wait()
+
+    # Ошибка одного соединения отменяет остальные, ждущие на барьере.
+    async with asyncio.TaskGroup() as group:
+        for _ in range(connections):
+            group.create_task(warm_one())
+    return connections
+
+
+async def warm_up_redis(connections: int) -> int:
+    """Открывает ``connections`` соединений с Redis и возвращает их в пул."""
+    pool = get_redis().connection_pool
+    opened = [await pool.get_connection("PING") for _ in range(connections)]
+    for connection in opened:
+        await pool.release(connection)
+    return len(opened)
+
+
+async def warm_up() -> None:
+    """
+    Прогрев при старте приложения.
+
+    Ошибки и превышение ``WARMUP_TIMEOUT`` только логируются: готовность
+    отдельно проверяет ``/health/ready``.
+    """
+    started = time.perf_counter()
+    jobs = [
+        warm_up_engine(db_engine, settings.warmup_db_connections)
+        for db_engine in get_all_engines()
+    ]
+    jobs.append(warm_up_redis(settings.warmup_redis_connections))
+    try:
+        async with asyncio.timeout(settings.warmup_timeout):
+            results = await asyncio.gather(*jobs, return_exceptions=True)
+    except TimeoutError:
+        logging.error("Прогрев соединений не завершён за WARMUP_TIMEOUT")
+        return
+    for result in results:
+        if isinstance(result, Exception):
+            logging.error(f"Ошибка прогрева соединений: {result!r}")
+    logging.info(
+        f"Прогрев: БД {results[:-1]}, Redis {results[-1]} "
+        f"за {time.perf_counter() - started:.2f} с"
+    )
+
+
+async def _check_db(db_engine: AsyncEngine) -> None:
+    """Проверка соединения с БД."""
+    async with db_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _timed_check(check: Awaitable) -> dict:
+    """Результат проверки с ограничением ``HEALTH_TIMEOUT``."""
+    started = time.perf_counter()
+    result: dict
+    try:
+        async with asyncio.timeout(settings.health_timeout):
+            await check
+    except Exception as e:
+        result = {"status": "error", "error": repr(e)}
+    else:
+        result = {"status": "ok"}
+    result["ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+async def check_readiness() -> tuple[bool, dict]:
+    """
+    Параллельно проверяет БД, реплики и Redis.
+
+    Returns:
+        - tuple[bool, dict]: Готово ли приложение и результаты проверок.
+    """
+    checks = {"db": _check_db(get_engine()), "redis": get_redis().ping()}
+    for index, replica in enumerate(get_replica_engines()):
+        checks[f"replica_{index}"] = _check_db(replica)
+    results = await asyncio.gather(*map(_timed_check, checks.values()))
+    report = dict(zip(checks, results))
+    ready = all(result["status"] == "ok" for result in results)
+    return ready, report
@@ -0,0 +1,108 @@
+"""Обновление материализованного представления статистики."""
+
+import asyncio
+import contextlib
+import logging
+from datetime import datetime
+
+from redis.exceptions import LockError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.db import driver_options, get_engine, new_session
+from app.core.redis import get_redis
+from app.models.rolls_daily_stats import rolls_daily_stats_mv
+from app.services.statistics import MATVIEW_REFRESHED_KEY, StatisticsService
+
+REFRESH_LOCK_KEY = "stats:mv:lock"
+# Запас блокировки сверх таймаута обновления.
+REFRESH_LOCK_MARGIN = 60
+
+
+async def refresh_matview() -> None:
+    """
+    Обновляет rolls_daily_stats_mv без блокировки чтения.
+
+    ``REFRESH MATERIALIZED VIEW CONCURRENTLY`` (нужен уникальный индекс
+    по ``day``) выполняется на отдельном соединении вне пула с таймаутом
+    ``STATISTICS_MATVIEW_REFRESH_TIMEOUT`` вместо ``DB_STATEMENT_TIMEOUT``:
+    за PgBouncer таймаут asyncpg действует на клиенте, и ``SET LOCAL``
+    на сервере его не снимает. После обновления запоминается время
+    снимка и сбрасывается кэш статистики.
+    """
+    timeout = settings.statistics_matview_refresh_timeout * 1000
+    refresh_engine = create_async_engine(
+        settings.database_url,
+        poolclass=NullPool,
+        connect_args=driver_options(timeout),
+    )
+    refreshed_at = datetime.now().timestamp()
+    try:
+        async with refresh_engine.begin() as conn:
+            await conn.execute(
+                text(f"SET LOCAL statement_timeout = {timeout}")
+            )
+            await conn.execute(
+                text(
+                    "REFRESH MATERIALIZED VIEW CONCURRENTLY "
+                    f"{rolls_daily_stats_mv.name}"
+                )
+            )
+    finally:
+        await refresh_engine.dispose()
+    await get_redis().set(MATVIEW_REFRESHED_KEY, refreshed_at)
+    async with new_session() as session:
+        await StatisticsService(session).invalidate_cache()
+
+
+async def refresh_if_due() -> bool:
+    """
+    Обновляет представление, если снимок старше интервала обновления.
+
+    Между воркерами обновление защищено блокировкой Redis: остальные
+    воркеры пропускают этот цикл.
+
+    Returns:
+        - bool: Было ли выполнено обновление.
+    """
+    age = await StatisticsService.snapshot_age()
+    if age is not None and age < settings.statistics_matview_refresh_interval:
+        return False
+    lock = get_redis().lock(
+        REFRESH_LOCK_KEY,
+        timeout=settings.statistics_matview_refresh_timeout
+        + REFRESH_LOCK_MARGIN,
+        blocking=False,
+    )
+    if not await lock.acquire():
+        return False
+    try:
+        await refresh_matview()
+        return True
+    finally:
+        with contextlib.suppress(LockError):
+            await lock.release()
+
+
+async def run_matview_refresh() -> None:
+    """
+    Фоновая задача: периодически обновляет rolls_daily_stats_mv.
+
+    Период задаётся ``STATISTICS_MATVIEW_REFRESH_INTERVAL`` (секунды,
+    0 - не запускать). Первое обновление - сразу при старте, если снимок
+    устарел. Работает только с PostgreSQL.
+    """
+    if get_engine().dialect.name != "postgresql":
+        logging.warning(
+            "Материализованное представление статистики есть только "
+            "в PostgreSQL, обновление не запущено"
+        )
+        return
+    while True:
+        try:
+            await refresh_if_due()
+        except Exception as e:
+            logging.error(f"Ошибка при обновлении rolls_daily_stats_mv: {e}")
+        await asyncio.sleep(settings.statistics_matview_refresh_interval)
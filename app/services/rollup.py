@@ -0,0 +1,308 @@
+"""Поддержка дневных агрегатов rolls_daily_stats."""
+
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Sequence
+
+from sqlalchemy import and_, case, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import new_session
+from app.core.sql import storage_seconds, upsert
+from app.models.rolls import Rolls
+from app.models.rolls_daily_sketch import RollsDailySketch
+from app.models.rolls_daily_stats import RollsDailyStats
+from app.services.sketch import bucket_column, bucket_index
+
+ADDED_FIELDS = (
+    "added_count",
+    "length_sum",
+    "weight_sum",
+    "min_length",
+    "max_length",
+    "min_weight",
+    "max_weight",
+)
+REMOVED_FIELDS = (
+    "removed_count",
+    "min_storage_seconds",
+    "max_storage_seconds",
+)
+
+
+def _least(current, new):
+    """Минимум двух значений, где NULL означает отсутствие данных."""
+    return case(
+        (current.is_(None), new),
+        (new < current, new),
+        else_=current,
+    )
+
+
+def _greatest(current, new):
+    """Максимум двух значений, где NULL означает отсутствие данных."""
+    return case(
+        (current.is_(None), new),
+        (new > current, new),
+        else_=current,
+    )
+
+
+class RollupService:
+    """
+    Инкрементальное обновление дневных агрегатов.
+
+    Добавление и удаление рулонов обновляют строку своего дня через
+    upsert в той же транзакции. Изменение длины или веса может сдвинуть
+    минимум или максимум вниз, поэтому затронутые дни пересчитываются
+    целиком из rolls. Фоновая задача периодически пересчитывает последние
+    дни, исправляя возможные расхождения.
+
+    Агрегаты и скетчи читаются только при ``STATISTICS_SOURCE=rollup``,
+    при других источниках записи их не обновляют.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """Инициализация сервиса агрегатов."""
+        self.db = session
+
+    @staticmethod
+    def enabled() -> bool:
+        """Ведутся ли агрегаты при записи."""
+        return settings.statistics_source == "rollup"
+
+    async def _merge(self, rows: list[dict], fields: Sequence[str]):
+        """Добавляет дневные значения к существующим строкам."""
+        if not rows:
+            return
+        table = RollsDailyStats.__table__
+        stmt = upsert(self.db, table).values(rows)
+        merge = {}
+        for field in fields:
+            current, new = table.c[field], stmt.excluded[field]
+            if field.startswith("min_"):
+                merge[field] = _least(current, new)
+            elif field.startswith("max_"):
+                merge[field] = _greatest(current, new)
+            else:
+                merge[field] = current + new
+        await self.db.execute(
+            stmt.on_conflict_do_update(index_elements=["day"], set_=merge)
+        )
+
+    async def _merge_sketches(self, counts: Counter) -> None:
+        """Добавляет счётчики ``(day, metric, bucket)`` к скетчам."""
+        if not counts:
+            return
+        table = RollsDailySketch.__table__
+        stmt = upsert(self.db, table).values(
+            [
+                {"day": day, "metric": metric, "bucket": bucket, "count": n}
+                for (day, metric, bucket), n in counts.items()
+            ]
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["day", "metric", "bucket"],
+                set_={"count": table.c.count + stmt.excluded["count"]},
+            )
+        )
+
+    async def added(self, rolls: Iterable) -> None:
+        """
+        Учитывает добавленные рулоны.
+
+        Args:
+            - rolls (Iterable): Объекты с ``length``, ``weight``,
+              ``added_at``.
+        """
+        if not self.enabled():
+            return
+        days: dict = defaultdict(list)
+        sketches: Counter = Counter()
+        for roll in rolls:
+            day = roll.added_at.date()
+            days[day].append(roll)
+            sketches[day, "length", bucket_index(roll.length)] += 1
+            sketches[day, "weight", bucket_index(roll.weight)] += 1
+        await self._merge(
+            [
+                {
+                    "day": day,
+                    "added_count": len(items),
+                    "length_sum": sum(r.length for r in items),
+                    "weight_sum": sum(r.weight for r in items),
+                    "min_length": min(r.length for r in items),
+                    "max_length": max(r.length for r in items),
+                    "min_weight": min(r.weight for r in items),
+                    "max_weight": max(r.weight for r in items),
+                }
+                for day, items in days.items()
+            ],
+            ADDED_FIELDS,
+        )
+        await self._merge_sketches(sketches)
+
+    async def removed(self, rolls: Iterable) -> None:
+        """
+        Учитывает удалённые рулоны.
+
+        Args:
+            - rolls (Iterable): Объекты с ``added_at`` и ``removed_at``.
+        """
+        if not self.enabled():
+            return
+        days: dict = defaultdict(list)
+        sketches: Counter = Counter()
+        for roll in rolls:
+            day = roll.removed_at.date()
+            seconds = (roll.removed_at - roll.added_at).total_seconds()
+            days[day].append(seconds)
+            sketches[day, "storage", bucket_index(seconds)] += 1
+        await self._merge(
+            [
+                {
+                    "day": day,
+                    "removed_count": len(seconds),
+                    "min_storage_seconds": min(seconds),
+                    "max_storage_seconds": max(seconds),
+                }
+                for day, seconds in days.items()
+            ],
+            REMOVED_FIELDS,
+        )
+        await self._merge_sketches(sketches)
+
+    async def changed(self, rolls: Iterable) -> None:
+        """
+        Пересчитывает дни, в которые были добавлены изменённые рулоны.
+
+        Пересчитываются только эти дни: соседние дни объединяются в один
+        диапазон, промежутки между ними не трогаются.
+
+        Args:
+            - rolls (Iterable): Объекты с ``added_at``.
+        """
+        if not self.enabled():
+            return
+        days = sorted({roll.added_at.date() for roll in rolls})
+        if not days:
+            return
+        await self.db.flush()
+        start = end = days[0]
+        for day in days[1:]:
+            if day != end + timedelta(days=1):
+                await self.rebuild(start, end)
+                start = day
+            end = day
+        await self.rebuild(start, end)
+
+    async def rebuild(self, start: date, end: date) -> None:
+        """
+        Пересчитывает агрегаты за дни ``start..end`` из таблицы rolls.
+
+        Args:
+            - start (date): Первый день.
+            - end (date): Последний день (включительно).
+        """
+        table = RollsDailyStats.__table__
+        lower = datetime.combine(start, time.min)
+        upper = datetime.combine(end + timedelta(days=1), time.min)
+
+        await self.db.execute(
+            delete(table).where(table.c.day.between(start, end))
+        )
+
+        added_day = func.date(Rolls.added_at)
+        await self.db.execute(
+            insert(table).from_select(
+                ["day", *ADDED_FIELDS],
+                select(
+                    added_day,
+                    func.count(),
+                    func.sum(Rolls.length),
+                    func.sum(Rolls.weight),
+                    func.min(Rolls.length),
+                    func.max(Rolls.length),
+                    func.min(Rolls.weight),
+                    func.max(Rolls.weight),
+                )
+                .where(Rolls.added_at >= lower, Rolls.added_at < upper)
+                .group_by(added_day),
+            )
+        )
+
+        removed_day = func.date(Rolls.removed_at)
+        storage = storage_seconds(Rolls.removed_at, Rolls.added_at)
+        stmt = upsert(self.db, table).from_select(
+            ["day", *REMOVED_FIELDS],
+            select(
+                removed_day, func.count(), func.min(storage), func.max(storage)
+            )
+            .where(Rolls.removed_at >= lower, Rolls.removed_at < upper)
+            .group_by(removed_day),
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["day"],
+                set_={field: stmt.excluded[field] for field in REMOVED_FIELDS},
+            )
+        )
+        await self._rebuild_sketches(start, end)
+
+    async def _rebuild_sketches(self, start: date, end: date) -> None:
+        """Пересчитывает скетчи квантилей за дни ``start..end``."""
+        table = RollsDailySketch.__table__
+        lower = datetime.combine(start, time.min)
+        upper = datetime.combine(end + timedelta(days=1), time.min)
+
+        await self.db.execute(
+            delete(table).where(table.c.day.between(start, end))
+        )
+
+        added = and_(Rolls.added_at >= lower, Rolls.added_at < upper)
+        removed = and_(Rolls.removed_at >= lower, Rolls.removed_at < upper)
+        sources = (
+            ("length", Rolls.added_at, Rolls.length, added),
+            ("weight", Rolls.added_at, Rolls.weight, added),
+            (
+                "storage",
+                Rolls.removed_at,
+                storage_seconds(Rolls.removed_at, Rolls.added_at),
+                removed,
+            ),
+        )
+        for metric, moment, value, where in sources:
+            day, bucket = func.date(moment), bucket_column(value)
+            await self.db.execute(
+                insert(table).from_select(
+                    ["day", "metric", "bucket", "count"],
+                    select(day, literal(metric), bucket, func.count())
+                    .where(where)
+                    .group_by(day, bucket),
+                )
+            )
+
+
+async def run_compaction() -> None:
+    """
+    Фоновая задача: периодически пересчитывает последние дни.
+
+    Интервал и глубина задаются ``ROLLUP_COMPACTION_INTERVAL`` (секунды,
+    0 - не запускать) и ``ROLLUP_COMPACTION_DAYS``.
+    """
+    while True:
+        await asyncio.sleep(settings.rollup_compaction_interval)
+        today = date.today()
+        try:
+            async with new_session() as session:
+                await RollupService(session).rebuild(
+                    today - timedelta(days=settings.rollup_compaction_days),
+                    today,
+                )
+                await session.commit()
+        except Exception as e:
+            logging.error(f"Ошибка при пересчёте агрегатов: {e}")
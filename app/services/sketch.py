@@ -0,0 +1,77 @@
+"""
+Объединяемый скетч квантилей (в духе DDSketch).
+
+Положительное значение ``x`` попадает в корзину ``ceil(log_γ x)``, где
+``γ = (1 + α) / (1 - α)``. Оценка корзины ``2γ^i / (γ + 1)`` отличается
+от любого попавшего в неё значения не больше чем на ``α`` относительно,
+поэтому квантили по скетчу точны до ``α``. Скетч - это счётчики по
+корзинам: скетчи разных дней объединяются сложением счётчиков (в SQL -
+``SUM(count) ... GROUP BY bucket``), без повторного чтения рулонов.
+"""
+
+import math
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import Integer, case, cast, func
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+# Значения не больше MIN_VALUE (нулевые сроки, вес 0) - одна корзина.
+MIN_VALUE = 1e-6
+ZERO_BUCKET = -1_000_000
+
+
+def bucket_index(value: float) -> int:
+    """Номер корзины для значения."""
+    if value <= MIN_VALUE:
+        return ZERO_BUCKET
+    return math.ceil(math.log(value) / LOG_GAMMA)
+
+
+def bucket_column(column):
+    """SQL-выражение номера корзины (``ln`` есть в PostgreSQL и SQLite)."""
+    return case(
+        (
+            column > MIN_VALUE,
+            cast(func.ceil(func.ln(column) / LOG_GAMMA), Integer),
+        ),
+        else_=ZERO_BUCKET,
+    )
+
+
+def bucket_value(index: int) -> float:
+    """Оценка значений корзины."""
+    if index == ZERO_BUCKET:
+        return 0.0
+    return 2 * GAMMA**index / (GAMMA + 1)
+
+
+def quantiles(
+    buckets: Iterable[Tuple[int, int]], qs: Iterable[float]
+) -> list[Optional[float]]:
+    """
+    Квантили ``qs`` по счётчикам корзин.
+
+    Args:
+        - buckets (Iterable[Tuple[int, int]]): Пары (корзина, количество)
+          в порядке возрастания корзины.
+        - qs (Iterable[float]): Квантили от 0 до 1.
+
+    Returns:
+        - list[float | None]: Оценки квантилей, None для пустого скетча.
+    """
+    buckets = [(index, count) for index, count in buckets if count]
+    total = sum(count for _, count in buckets)
+    if not total:
+        return [None for _ in qs]
+    result: list[Optional[float]] = []
+    for q in qs:
+        rank = q * (total - 1)
+        seen = 0
+        for index, count in buckets:
+            seen += count
+            if seen > rank:
+                result.append(bucket_value(index))
+                break
+    return result
@@ -2,132 +2,789 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, case
-from datetime import date, timedelta
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Integer,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    union_all,
+)
+from datetime import date, datetime, time, timedelta
+from redis.exceptions import LockError
+import asyncio
+import contextlib
 import json
 import logging
-from typing import Optional
+import math
+from typing import Awaitable, Callable, Optional
 
 from app.models.rolls import Rolls
-from app.core.redis import redis
+from app.models.rolls_daily_sketch import RollsDailySketch
+from app.models.rolls_daily_stats import RollsDailyStats, rolls_daily_stats_mv
+from app.core.cache import (
+    INVALIDATION_CHANNEL,
+    apply_invalidation,
+    statistics_cache,
+)
+from app.core.config import settings
+from app.core.db import new_session
+from app.core.redis import get_redis
+from app.core.sql import date_trunc, storage_seconds
+from app.schemas.statistics import (
+    Language,
+    SeriesBucket,
+    StatisticsTotals,
+)
+from app.services.sketch import bucket_column, quantiles
+
+CACHE_GENERATION_KEY = "stats:gen"
+MATVIEW_REFRESHED_KEY = "stats:mv:refreshed_at"
+CACHE_TTL = 600
+STALE_TTL = 86400
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+# Квантили в статистике: имя -> значение.
+PERCENTILES = {"median": 0.5, "p90": 0.9}
+# Метрика скетча -> суффикс поля статистики.
+PERCENTILE_METRICS = {
+    "length": "length",
+    "weight": "weight",
+    "storage": "storage_seconds",
+}
+NO_DATA = {"ru": "Нет данных", "en": "No data"}
+TIME_UNITS = {
+    "ru": ("д.", "ч.", "мин.", "сек."),
+    "en": ("d", "h", "min", "s"),
+}
+# Поле StatisticsTotals -> подпись в локализованном ответе.
+LABELS = {
+    "ru": {
+        "added_count": "Добавлено",
+        "removed_count": "Удалено",
+        "avg_length": "Средняя длина",
+        "avg_weight": "Средний вес",
+        "min_length": "Минимальная длина",
+        "max_length": "Максимальная длина",
+        "min_weight": "Минимальный вес",
+        "max_weight": "Максимальный вес",
+        "total_weight": "Общий вес",
+        "min_storage_seconds": "Минимальный промежуток хранения",
+        "max_storage_seconds": "Максимальный промежуток хранения",
+        "median_length": "Медианная длина",
+        "p90_length": "90-й процентиль длины",
+        "median_weight": "Медианный вес",
+        "p90_weight": "90-й процентиль веса",
+        "median_storage_seconds": "Медианный промежуток хранения",
+        "p90_storage_seconds": "90-й процентиль промежутка хранения",
+    },
+    "en": {
+        "added_count": "Added",
+        "removed_count": "Removed",
+        "avg_length": "Average length",
+        "avg_weight": "Average weight",
+        "min_length": "Minimum length",
+        "max_length": "Maximum length",
+        "min_weight": "Minimum weight",
+        "max_weight": "Maximum weight",
+        "total_weight": "Total weight",
+        "min_storage_seconds": "Minimum storage time",
+        "max_storage_seconds": "Maximum storage time",
+        "median_length": "Median length",
+        "p90_length": "90th percentile length",
+        "median_weight": "Median weight",
+        "p90_weight": "90th percentile weight",
+        "median_storage_seconds": "Median storage time",
+        "p90_storage_seconds": "90th percentile storage time",
+    },
+}
+SERIES_STEPS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+# Пересчёты статистики, выполняемые в этом процессе, по ключу кэша.
+_inflight: dict[str, asyncio.Task] = {}
 
 
 class StatisticsService:
-    """Сервис для получения статистики по роллам с кэшем Redis."""
+    """
+    Сервис для получения статистики по роллам с кэшем Redis.
+
+    Ключи кэша содержат номер поколения (``stats:v{gen}:...``). Запись в
+    рулоны увеличивает поколение одним ``INCR``, старые ключи больше не
+    читаются и истекают по TTL.
+    """
 
     def __init__(self, session: AsyncSession):
         """Инициализация сервиса статистики."""
         self.db = session
 
     @staticmethod
-    def format_number(value, decimals=2):
-        """Форматирует число: округляет и добавляет пробелы."""
+    def format_number(value, decimals=2, language: Language = "ru"):
+        """Форматирует число: округляет и разделяет разряды."""
         if value is None:
-            return "Нет данных"
-        return f"{round(value, decimals):,}".replace(",", " ")
+            return NO_DATA[language]
+        text = f"{round(value, decimals):,}"
+        if language == "ru":
+            return text.replace(",", " ")
+        return text
 
     @staticmethod
-    def format_timedelta(value):
-        """Форматирует timedelta в удобный вид."""
+    def format_timedelta(value, language: Language = "ru"):
+        """Форматирует срок в секундах в удобный вид."""
         if not value:
-            return "Нет данных"
+            return NO_DATA[language]
 
-        total_seconds = value.total_seconds()
+        total_seconds = value
         days = int(total_seconds // 86400)
         hours = int((total_seconds % 86400) // 3600)
         minutes = int((total_seconds % 3600) // 60)
         seconds = int(total_seconds % 60)
 
+        units = TIME_UNITS[language]
         parts = []
         if days:
-            parts.append(f"{days} д.")
+            parts.append(f"{days} {units[0]}")
         if hours:
-            parts.append(f"{hours} ч.")
+            parts.append(f"{hours} {units[1]}")
         if minutes:
-            parts.append(f"{minutes} мин.")
+            parts.append(f"{minutes} {units[2]}")
         if seconds or not parts:
-            parts.append(f"{seconds} сек.")
+            parts.append(f"{seconds} {units[3]}")
 
         return " ".join(parts)
 
-    def _get_cache_key(self, start_date: date, end_date: date):
+    @classmethod
+    def localize(cls, stats: dict, language: Language = "ru") -> dict:
+        """
+        Статистика в виде подписанных строк на языке ``language``.
+
+        Слой представления поверх кэшированных чисел: форматирование не
+        обращается ни к базе, ни к кэшу.
+        """
+        result = {}
+        for field, label in LABELS[language].items():
+            value = stats[field]
+            if field.endswith("_storage_seconds"):
+                result[label] = cls.format_timedelta(value, language)
+            elif field.endswith("_count"):
+                result[label] = cls.format_number(value, 0, language)
+            else:
+                result[label] = cls.format_number(value, 2, language)
+        return result
+
+    def _get_cache_key(self, generation: int, name: str):
         """Формирует ключ кэша."""
-        return f"stats:{start_date}:{end_date}"
+        return f"stats:v{generation}:{name}"
 
-    async def get_statistics(
-        self,
-        start_date: Optional[date] = None,
-        end_date: Optional[date] = None,
-    ):
-        """Получает статистику, используя кэш Redis (10 мин)."""
-        if end_date is None:
-            end_date = date.today()
-        if start_date is None:
-            start_date = end_date - timedelta(days=7)
+    def _get_stale_key(self, name: str):
+        """Ключ последнего посчитанного значения (без поколения)."""
+        return f"stats:last:{name}"
 
-        cache_key = self._get_cache_key(start_date, end_date)
+    async def _get_generation(self) -> int:
+        """Текущее поколение кэша статистики."""
+        return int(await get_redis().get(CACHE_GENERATION_KEY) or 0)
 
-        cached_data = await redis.get(cache_key)
-        if cached_data:
-            return json.loads(cached_data)
+    @staticmethod
+    def _as_date(value: date) -> date:
+        """Приводит дату или дату-время к дате."""
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    @staticmethod
+    def rolls_query(start_date: date, end_date: date):
+        """
+        Запрос агрегатов по таблице rolls за период.
+
+        Оба конца периода попадают в WHERE (``added_at`` или
+        ``removed_at`` в периоде), поэтому читаются только строки окна
+        через индексы по этим колонкам, а не вся история.
+        """
+        lower = datetime.combine(start_date, time.min)
+        upper = datetime.combine(end_date + timedelta(days=1), time.min)
+        added = and_(Rolls.added_at >= lower, Rolls.added_at < upper)
+        removed = and_(Rolls.removed_at >= lower, Rolls.removed_at < upper)
+        storage = storage_seconds(Rolls.removed_at, Rolls.added_at)
+
+        def when_added(column):
+            return case((added, column))
+
+        def when_removed(column):
+            return case((removed, column))
+
+        return select(
+            func.count(when_added(Rolls.id)).label("added_count"),
+            func.count(when_removed(Rolls.id)).label("removed_count"),
+            func.avg(when_added(Rolls.length)).label("avg_length"),
+            func.avg(when_added(Rolls.weight)).label("avg_weight"),
+            func.min(when_added(Rolls.length)).label("min_length"),
+            func.max(when_added(Rolls.length)).label("max_length"),
+            func.min(when_added(Rolls.weight)).label("min_weight"),
+            func.max(when_added(Rolls.weight)).label("max_weight"),
+            func.sum(when_added(Rolls.weight)).label("total_weight"),
+            func.min(when_removed(storage)).label("min_storage_seconds"),
+            func.max(when_removed(storage)).label("max_storage_seconds"),
+        ).where(or_(added, removed))
 
+    async def _aggregate_rolls(self, start_date: date, end_date: date):
+        """Агрегаты по таблице rolls за период."""
+        stmt = self.rolls_query(start_date, end_date)
+        result_proxy = await self.db.execute(stmt)
+        return dict(result_proxy.one()._mapping)
+
+    async def _aggregate_daily(
+        self, start_date: date, end_date: date, table=RollsDailyStats.__table__
+    ):
+        """
+        Агрегаты за период из дневных строк.
+
+        ``table`` - rolls_daily_stats или материализованное представление
+        rolls_daily_stats_mv с теми же колонками.
+        """
+        daily = table.c
+        added_count = func.sum(daily.added_count)
         stmt = select(
-            func.count(case((Rolls.added_at >= start_date, Rolls.id))).label(
-                "added_count"
-            ),
-            func.count(case((Rolls.removed_at.isnot(None), Rolls.id))).label(
+            func.coalesce(added_count, 0).label("added_count"),
+            func.coalesce(func.sum(daily.removed_count), 0).label(
                 "removed_count"
             ),
-            func.avg(Rolls.length).label("avg_length"),
-            func.avg(Rolls.weight).label("avg_weight"),
-            func.min(Rolls.length).label("min_length"),
-            func.max(Rolls.length).label("max_length"),
-            func.min(Rolls.weight).label("min_weight"),
-            func.max(Rolls.weight).label("max_weight"),
-            func.sum(Rolls.weight).label("total_weight"),
-            func.min(Rolls.removed_at - Rolls.added_at).label(
-                "min_storage_time"
+            (func.sum(daily.length_sum) / func.nullif(added_count, 0)).label(
+                "avg_length"
             ),
-            func.max(Rolls.removed_at - Rolls.added_at).label(
-                "max_storage_time"
+            (func.sum(daily.weight_sum) / func.nullif(added_count, 0)).label(
+                "avg_weight"
             ),
-        )
+            func.min(daily.min_length).label("min_length"),
+            func.max(daily.max_length).label("max_length"),
+            func.min(daily.min_weight).label("min_weight"),
+            func.max(daily.max_weight).label("max_weight"),
+            func.sum(daily.weight_sum).label("total_weight"),
+            func.min(daily.min_storage_seconds).label("min_storage_seconds"),
+            func.max(daily.max_storage_seconds).label("max_storage_seconds"),
+        ).where(daily.day.between(start_date, end_date))
 
         result_proxy = await self.db.execute(stmt)
-        stats = result_proxy.one()
-
-        result = {
-            "Добавлено": self.format_number(stats.added_count, 0),
-            "Удалено": self.format_number(stats.removed_count, 0),
-            "Средняя длина": self.format_number(stats.avg_length),
-            "Средний вес": self.format_number(stats.avg_weight),
-            "Минимальная длина": self.format_number(stats.min_length),
-            "Максимальная длина": self.format_number(stats.max_length),
-            "Минимальный вес": self.format_number(stats.min_weight),
-            "Максимальный вес": self.format_number(stats.max_weight),
-            "Общий вес": self.format_number(stats.total_weight),
-            "Минимальный промежуток хранения": self.format_timedelta(
-                stats.min_storage_time
-            ),
-            "Максимальный промежуток хранения": self.format_timedelta(
-                stats.max_storage_time
+        return dict(result_proxy.one()._mapping)
+
+    async def aggregate(self, start_date: date, end_date: date) -> dict:
+        """
+        Агрегаты за период из источника ``STATISTICS_SOURCE``.
+
+        Материализованное представление используется, только пока его
+        снимок не старше ``STATISTICS_MATVIEW_MAX_STALENESS``, иначе
+        агрегаты читаются из rolls (rolls_daily_stats в этом режиме не
+        ведётся).
+        """
+        if settings.statistics_source == "matview":
+            if await self.matview_age() is not None:
+                return await self._aggregate_daily(
+                    start_date, end_date, rolls_daily_stats_mv
+                )
+            logging.warning(
+                "Снимок rolls_daily_stats_mv устарел или не обновлялся, "
+                "статистика читается из rolls"
+            )
+            return await self._aggregate_rolls(start_date, end_date)
+        if settings.statistics_source == "rollup":
+            return await self._aggregate_daily(start_date, end_date)
+        return await self._aggregate_rolls(start_date, end_date)
+
+    @staticmethod
+    async def snapshot_age() -> Optional[float]:
+        """
+        Возраст снимка rolls_daily_stats_mv в секундах.
+
+        None, если представление ещё не обновлялось приложением.
+        """
+        refreshed_at = await get_redis().get(MATVIEW_REFRESHED_KEY)
+        if refreshed_at is None:
+            return None
+        return max(datetime.now().timestamp() - float(refreshed_at), 0.0)
+
+    async def matview_age(self) -> Optional[float]:
+        """
+        Возраст снимка, если статистика читается из представления.
+
+        None - представление не используется: источник другой, БД не
+        PostgreSQL или снимок старше ``STATISTICS_MATVIEW_MAX_STALENESS``.
+        """
+        if (
+            settings.statistics_source != "matview"
+            or self.db.bind.dialect.name != "postgresql"
+        ):
+            return None
+        age = await self.snapshot_age()
+        if age is None or age > settings.statistics_matview_max_staleness:
+            return None
+        return age
+
+    @staticmethod
+    def _percentile_fields() -> list[str]:
+        """Имена полей квантилей в порядке метрик."""
+        return [
+            f"{name}_{field}"
+            for field in PERCENTILE_METRICS.values()
+            for name in PERCENTILES
+        ]
+
+    async def _exact_percentiles(self, start_date: date, end_date: date):
+        """Точные квантили по таблице rolls (``percentile_cont``)."""
+        lower = datetime.combine(start_date, time.min)
+        upper = datetime.combine(end_date + timedelta(days=1), time.min)
+        added = and_(Rolls.added_at >= lower, Rolls.added_at < upper)
+        removed = and_(Rolls.removed_at >= lower, Rolls.removed_at < upper)
+        values = {
+            "length": (Rolls.length, added),
+            "weight": (Rolls.weight, added),
+            "storage": (
+                storage_seconds(Rolls.removed_at, Rolls.added_at),
+                removed,
             ),
         }
+        stmt = select(
+            *(
+                func.percentile_cont(q)
+                .within_group(values[metric][0])
+                .filter(values[metric][1])
+                for metric in PERCENTILE_METRICS
+                for q in PERCENTILES.values()
+            )
+        ).where(or_(added, removed))
+        row = (await self.db.execute(stmt)).one()
+        return dict(zip(self._percentile_fields(), row))
+
+    def _sketch_quantiles(self, rows) -> dict:
+        """Квантили по строкам (метрика, корзина, количество)."""
+        buckets: dict = {metric: [] for metric in PERCENTILE_METRICS}
+        for metric, bucket, count in rows:
+            buckets[metric].append((bucket, count))
+        values = [
+            value
+            for metric in PERCENTILE_METRICS
+            for value in quantiles(buckets[metric], PERCENTILES.values())
+        ]
+        return dict(zip(self._percentile_fields(), values))
+
+    async def _sketch_percentiles(self, start_date: date, end_date: date):
+        """Квантили по объединённым дневным скетчам периода."""
+        sketch = RollsDailySketch
+        stmt = (
+            select(sketch.metric, sketch.bucket, func.sum(sketch.count))
+            .where(sketch.day.between(start_date, end_date))
+            .group_by(sketch.metric, sketch.bucket)
+            .order_by(sketch.metric, sketch.bucket)
+        )
+        return self._sketch_quantiles((await self.db.execute(stmt)).all())
+
+    async def _rolls_sketch_percentiles(
+        self, start_date: date, end_date: date
+    ):
+        """
+        Квантили по скетчу, построенному из строк rolls периода.
+
+        Для БД без ``percentile_cont`` (SQLite), когда дневные скетчи не
+        ведутся: корзины считаются ``GROUP BY`` по строкам окна.
+        """
+        lower = datetime.combine(start_date, time.min)
+        upper = datetime.combine(end_date + timedelta(days=1), time.min)
+        added = and_(Rolls.added_at >= lower, Rolls.added_at < upper)
+        removed = and_(Rolls.removed_at >= lower, Rolls.removed_at < upper)
+        sources = (
+            ("length", Rolls.length, added),
+            ("weight", Rolls.weight, added),
+            (
+                "storage",
+                storage_seconds(Rolls.removed_at, Rolls.added_at),
+                removed,
+            ),
+        )
+        selects = []
+        for metric, value, where in sources:
+            bucket = bucket_column(value)
+            selects.append(
+                select(literal(metric), bucket, func.count())
+                .where(where)
+                .group_by(bucket)
+            )
+        rows = (await self.db.execute(union_all(*selects))).all()
+        return self._sketch_quantiles(sorted(rows))
+
+    async def percentiles(self, start_date: date, end_date: date) -> dict:
+        """
+        Медианы и 90-е процентили длины, веса и срока хранения.
+
+        Периоды до ``STATISTICS_EXACT_PERCENTILE_DAYS`` дней в PostgreSQL
+        считаются точно по таблице rolls. Длинные периоды (и SQLite, где
+        нет ``percentile_cont``) - по дневным скетчам
+        ``rolls_daily_sketches`` с относительной погрешностью 1%.
+
+        Скетчи ведутся только при ``STATISTICS_SOURCE=rollup``. При других
+        источниках квантили в PostgreSQL всегда точные, а в SQLite
+        считаются по скетчу из строк rolls периода.
+        """
+        days = (end_date - start_date).days + 1
+        rollup = settings.statistics_source == "rollup"
+        if self.db.bind.dialect.name == "postgresql" and (
+            not rollup or days <= settings.statistics_exact_percentile_days
+        ):
+            return await self._exact_percentiles(start_date, end_date)
+        if rollup:
+            return await self._sketch_percentiles(start_date, end_date)
+        return await self._rolls_sketch_percentiles(start_date, end_date)
+
+    async def _compute(self, start_date: date, end_date: date) -> dict:
+        """Считает статистику за период в базе данных (числа и секунды)."""
+        stats = await self.aggregate(start_date, end_date)
+        stats.update(await self.percentiles(start_date, end_date))
+        return StatisticsTotals(**stats).model_dump()
+
+    def _get_lock_key(self, name: str):
+        """Ключ блокировки пересчёта значения."""
+        return f"stats:lock:{name}"
+
+    async def _wait_for(
+        self, name: str, generation: int, cache_key: str
+    ) -> Optional[dict]:
+        """
+        Ждёт, пока другой воркер запишет значение в кэш.
+
+        Ожидание прекращается (None), если блокировка снята без записи
+        значения или сменилось поколение кэша: тогда значение этого
+        поколения уже не появится.
+        """
+        lock_key = self._get_lock_key(name)
+        for _ in range(int(LOCK_TIMEOUT / LOCK_POLL_INTERVAL)):
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.get(cache_key)
+                pipe.exists(lock_key)
+                pipe.get(CACHE_GENERATION_KEY)
+                cached_data, locked, current = await pipe.execute()
+            if cached_data:
+                return json.loads(cached_data)
+            if not locked or int(current or 0) != generation:
+                return None
+        return None
+
+    async def _refresh(
+        self,
+        name: str,
+        generation: int,
+        stale_data: Optional[str],
+        compute: Callable[["StatisticsService"], Awaitable[dict]],
+        epoch: int,
+    ) -> dict:
+        """
+        Пересчитывает значение под блокировкой Redis.
+
+        Считает только воркер, взявший блокировку. Остальные отдают
+        предыдущее значение (stale-while-revalidate), а если его нет,
+        ждут, пока значение появится в кэше.
+
+        Пересчёт выполняется в собственной сессии: его ждут несколько
+        запросов, и сессия первого из них может закрыться раньше, чем
+        пересчёт завершится. Сессия всегда на основной БД: после записи
+        поколение кэша уже сменилось, и результат с отстающей реплики
+        сохранился бы в новом поколении до истечения ``CACHE_TTL``.
+
+        В локальный кэш результат попадает, только если с момента
+        ``epoch`` он не очищался.
+        """
+        cache_key = self._get_cache_key(generation, name)
+        lock = get_redis().lock(
+            self._get_lock_key(name),
+            timeout=LOCK_TIMEOUT,
+            blocking=False,
+        )
+        acquired = await lock.acquire()
+        if not acquired:
+            if stale_data:
+                return json.loads(stale_data)
+            cached = await self._wait_for(name, generation, cache_key)
+            if cached is not None:
+                return cached
 
         try:
-            await redis.set(
-                cache_key, json.dumps(result, ensure_ascii=False), ex=600
+            async with new_session() as session:
+                result = await compute(StatisticsService(session))
+            statistics_cache.set(name, result, epoch)
+            data = json.dumps(result, ensure_ascii=False)
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    pipe.set(cache_key, data, ex=CACHE_TTL)
+                    pipe.set(self._get_stale_key(name), data, ex=STALE_TTL)
+                    await pipe.execute()
+            except Exception as e:
+                logging.error(f"Ошибка при записи в Redis: {e}")
+            return result
+        finally:
+            if acquired:
+                with contextlib.suppress(LockError):
+                    await lock.release()
+
+    async def _cached(
+        self,
+        name: str,
+        compute: Callable[["StatisticsService"], Awaitable[dict]],
+    ) -> dict:
+        """
+        Значение ``name`` из кэша или результат ``compute``.
+
+        ``compute`` получает сервис с отдельной сессией пересчёта.
+
+        Перед Redis проверяется локальный LRU-кэш процесса. Одновременные
+        промахи по одному ключу внутри процесса ждут один общий пересчёт,
+        между воркерами пересчёт защищён блокировкой.
+
+        Локальный ключ не содержит поколения, поэтому значение, прочитанное
+        до инвалидации, в LRU не записывается (см. ``LRUCache.epoch``).
+        """
+        local = statistics_cache.get(name)
+        if local is not None:
+            return local
+        epoch = statistics_cache.epoch
+
+        generation = await self._get_generation()
+        cache_key = self._get_cache_key(generation, name)
+
+        cached_data, stale_data = await get_redis().mget(
+            cache_key, self._get_stale_key(name)
+        )
+        if cached_data:
+            result = json.loads(cached_data)
+            statistics_cache.set(name, result, epoch)
+            return result
+
+        task = _inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                self._refresh(name, generation, stale_data, compute, epoch)
             )
-        except Exception as e:
-            logging.error(f"Ошибка при записи в Redis: {e}")
+            _inflight[cache_key] = task
+            task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
 
-        return result
+    def _period(
+        self, start_date: Optional[date], end_date: Optional[date]
+    ) -> tuple[date, date]:
+        """Период по умолчанию - последние 7 дней."""
+        if end_date is None:
+            end_date = date.today()
+        if start_date is None:
+            start_date = end_date - timedelta(days=7)
+        return self._as_date(start_date), self._as_date(end_date)
+
+    async def get_statistics(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> dict:
+        """
+        Получает статистику, используя кэш Redis (10 мин).
+
+        Кэшируется одно значение в числах и секундах (схема
+        ``StatisticsTotals``) для всех клиентов; подписи на нужном языке
+        строит ``localize``.
+
+        Источник данных задаётся ``STATISTICS_SOURCE``: ``rollup`` читает
+        не больше одной строки на день периода из rolls_daily_stats,
+        ``rolls`` агрегирует таблицу рулонов напрямую.
+        """
+        start_date, end_date = self._period(start_date, end_date)
+        return await self._cached(
+            f"totals:{start_date}:{end_date}",
+            lambda service: service._compute(start_date, end_date),
+        )
+
+    @staticmethod
+    def series_bounds(
+        bucket: SeriesBucket, start_date: date, end_date: date
+    ) -> tuple[datetime, datetime]:
+        """
+        Начало первого интервала ряда и конец периода (не включительно).
+
+        Raises:
+            - ValueError: Граница периода выходит за диапазон дат.
+        """
+        start = datetime.combine(start_date, time.min)
+        try:
+            if bucket == "week":
+                start -= timedelta(days=start.weekday())
+            upper = datetime.combine(end_date + timedelta(days=1), time.min)
+        except OverflowError:
+            raise ValueError("Период выходит за допустимый диапазон дат")
+        return start, upper
+
+    @classmethod
+    def series_count(
+        cls, bucket: SeriesBucket, start_date: date, end_date: date
+    ) -> int:
+        """Число интервалов ряда (без построения самих интервалов)."""
+        start, upper = cls.series_bounds(bucket, start_date, end_date)
+        return math.ceil((upper - start) / SERIES_STEPS[bucket])
+
+    @classmethod
+    def series_buckets(
+        cls, bucket: SeriesBucket, start_date: date, end_date: date
+    ) -> list[datetime]:
+        """Начала интервалов ряда, покрывающих период."""
+        start, upper = cls.series_bounds(bucket, start_date, end_date)
+        step = SERIES_STEPS[bucket]
+        buckets = []
+        while start < upper:
+            buckets.append(start)
+            start += step
+        return buckets
+
+    @staticmethod
+    def series_query(bucket: SeriesBucket, start_date: date, end_date: date):
+        """
+        Запрос ряда статистики за период одним проходом GROUP BY.
+
+        Каждое поступление и списание в периоде - событие в интервале
+        ``date_trunc`` своей метки. Вес на складе до начала периода
+        добавляется событием в первый интервал, поэтому накопленная
+        сумма ``weight_delta`` даёт вес на складе на конец интервала.
+        """
+        lower = datetime.combine(start_date, time.min)
+        upper = datetime.combine(end_date + timedelta(days=1), time.min)
+        no_storage = cast(null(), Float)
+        one = literal_column("1", Integer)
+        zero = literal_column("0", Integer)
+
+        added = select(
+            date_trunc(bucket, Rolls.added_at).label("bucket"),
+            one.label("added"),
+            zero.label("removed"),
+            Rolls.weight.label("weight_delta"),
+            no_storage.label("storage"),
+        ).where(Rolls.added_at >= lower, Rolls.added_at < upper)
+        removed = select(
+            date_trunc(bucket, Rolls.removed_at),
+            zero,
+            one,
+            -Rolls.weight,
+            storage_seconds(Rolls.removed_at, Rolls.added_at),
+        ).where(Rolls.removed_at >= lower, Rolls.removed_at < upper)
+        opening = select(
+            date_trunc(bucket, literal(lower, DateTime)),
+            zero,
+            zero,
+            func.coalesce(func.sum(Rolls.weight), 0),
+            no_storage,
+        ).where(
+            Rolls.added_at < lower,
+            or_(Rolls.removed_at.is_(None), Rolls.removed_at >= lower),
+        )
+        events = union_all(added, removed, opening).subquery()
+
+        return (
+            select(
+                events.c.bucket,
+                func.sum(events.c.added).label("added_count"),
+                func.sum(events.c.removed).label("removed_count"),
+                func.sum(events.c.weight_delta).label("weight_delta"),
+                func.min(events.c.storage).label("min_storage_seconds"),
+                func.max(events.c.storage).label("max_storage_seconds"),
+            )
+            .group_by(events.c.bucket)
+            .order_by(events.c.bucket)
+        )
+
+    async def _compute_series(
+        self, bucket: SeriesBucket, start_date: date, end_date: date
+    ) -> dict:
+        """Считает ряд статистики; пустые интервалы заполняются нулями."""
+        stmt = self.series_query(bucket, start_date, end_date)
+        rows = {row.bucket: row for row in (await self.db.execute(stmt)).all()}
+        weight = 0.0
+        items = []
+        for start in self.series_buckets(bucket, start_date, end_date):
+            row = rows.get(start)
+            if row is None:
+                items.append(
+                    {
+                        "start": start.isoformat(),
+                        "added_count": 0,
+                        "removed_count": 0,
+                        "weight_in_stock": round(weight, 2),
+                        "min_storage_seconds": None,
+                        "max_storage_seconds": None,
+                    }
+                )
+                continue
+            weight += row.weight_delta or 0
+            items.append(
+                {
+                    "start": start.isoformat(),
+                    "added_count": int(row.added_count),
+                    "removed_count": int(row.removed_count),
+                    "weight_in_stock": round(weight, 2),
+                    "min_storage_seconds": row.min_storage_seconds,
+                    "max_storage_seconds": row.max_storage_seconds,
+                }
+            )
+        return {
+            "bucket": bucket,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "items": items,
+        }
+
+    async def get_series(
+        self,
+        bucket: SeriesBucket = "day",
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> dict:
+        """
+        Получает ряд статистики по интервалам ``bucket`` за период.
+
+        Весь ряд считается одним запросом к таблице rolls и кэшируется
+        одной записью (с тем же поколением, что и статистика).
+
+        Число интервалов проверяется до построения ряда.
+
+        Raises:
+            - ValueError: Интервалов больше
+              ``STATISTICS_SERIES_MAX_BUCKETS`` или период выходит за
+              диапазон дат.
+        """
+        start_date, end_date = self._period(start_date, end_date)
+        count = self.series_count(bucket, start_date, end_date)
+        if count > settings.statistics_series_max_buckets:
+            raise ValueError(
+                f"Слишком много интервалов: {count}, максимум "
+                f"{settings.statistics_series_max_buckets}"
+            )
+        return await self._cached(
+            f"series:{bucket}:{start_date}:{end_date}",
+            lambda service: service._compute_series(
+                bucket, start_date, end_date
+            ),
+        )
 
     async def invalidate_cache(self):
-        """Удаляет все кэши статистики."""
+        """
+        Делает недействительными все кэши статистики (O(1)).
+
+        Увеличивает поколение ключей Redis и рассылает воркерам сообщение
+        для очистки их локальных кэшей.
+        """
+        apply_invalidation("stats")
         try:
-            keys = await redis.keys("stats:*")
-            if keys:
-                await redis.delete(*keys)
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.incr(CACHE_GENERATION_KEY)
+                pipe.publish(INVALIDATION_CHANNEL, "stats")
+                await pipe.execute()
         except Exception as e:
             logging.error(f"Ошибка при очистке кэша: {e}")
@@ -0,0 +1,75 @@
+"""
+Общие фикстуры тестов.
+
+Приложение работает на временном SQLite-файле (aiosqlite) и fakeredis,
+как ``--stack stub`` в ``benchmarks.load``. Переменные окружения
+задаются до импорта модулей приложения, так как настройки читаются при
+первом обращении.
+"""
+
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(
+    tempfile.mkdtemp(), "test.db"
+)
+os.environ["DATABASE_REPLICA_URLS"] = "[]"
+os.environ["STATISTICS_SOURCE"] = "rollup"
+os.environ["PROFILING_ENABLED"] = "false"
+for name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("POSTGRES_HOST", "localhost")
+os.environ.setdefault("POSTGRES_PORT", "5432")
+os.environ.setdefault("REDIS_HOST", "localhost")
+os.environ.setdefault("REDIS_PORT", "6379")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import fakeredis  # noqa: E402
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.core import cache  # noqa: E402
+from app.core.base import Base  # noqa: E402
+from app.core.db import get_engine, new_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import health, matview, statistics  # noqa: E402
+
+REDIS_MODULES = (cache, health, matview, statistics)
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    """Отдельный fakeredis на каждый тест."""
+    fake = fakeredis.FakeAsyncRedis(decode_responses=True)
+    for module in REDIS_MODULES:
+        monkeypatch.setattr(module, "get_redis", lambda: fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+async def database():
+    """Пустые таблицы и локальные кэши на каждый тест."""
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    cache.statistics_cache.clear()
+    cache.rolls_cache.clear()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session():
+    """Сессия основной БД."""
+    async with new_session() as db_session:
+        yield db_session
+
+
+@pytest.fixture
+async def client():
+    """HTTP-клиент к приложению в процессе (без lifespan)."""
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as http_client:
+        yield http_client
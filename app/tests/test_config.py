@@ -0,0 +1,24 @@
+"""Тесты ленивой загрузки настроек."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_models_import_without_env(tmp_path):
+    """Модели и API импортируются без .env и переменных окружения."""
+    env = {"PATH": os.environ["PATH"], "PYTHONPATH": str(ROOT)}
+    code = "import app.core.base, app.api.endpoints.rolls, app.core.cache"
+
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        env=env,
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
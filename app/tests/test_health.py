@@ -0,0 +1,32 @@
+"""Тесты прогрева соединений."""
+
+import asyncio
+
+import pytest
+
+from app.services import health
+
+
+async def test_warm_up_engine_holds_connections(database):
+    """Прогреваются все запрошенные соединения (в пределах пула)."""
+    assert await health.warm_up_engine(database, 3) == 3
+
+
+async def test_warm_up_engine_fails_fast(database, monkeypatch):
+    """Ошибка одного соединения не оставляет остальные ждать на барьере."""
+    calls = 0
+    run_hot_statements = health.run_hot_statements
+
+    async def flaky(session):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("connection lost")
+        await run_hot_statements(session)
+
+    monkeypatch.setattr(health, "run_hot_statements", flaky)
+
+    with pytest.raises(ExceptionGroup):
+        async with asyncio.timeout(5):
+            await health.warm_up_engine(database, 3)
+    assert database.pool.checkedout() == 0
@@ -0,0 +1,205 @@
+"""Тесты профилирования: Server-Timing, /metrics и профиль по токену."""
+
+import importlib
+import re
+
+import fakeredis
+import httpx
+import pytest
+
+from app import main
+from app.core import cache, db
+from app.core.config import get_settings
+from app.core.profiling import Histogram
+from app.core.redis import InstrumentedRedis, get_redis
+from app.services import statistics
+
+TOKEN = "profile-token"
+METRIC_LINE = re.compile(
+    r"^(?P<name>[a-z_]+)(?:\{(?P<labels>[^}]*)\})? (?P<value>\S+)$"
+)
+
+
+class FakeInstrumentedRedis(InstrumentedRedis, fakeredis.FakeAsyncRedis):
+    """fakeredis с учётом времени команд, как у ``InstrumentedRedis``."""
+
+
+def clear_engines() -> None:
+    """Сбрасывает движки и фабрику сессий, созданные при обращении."""
+    db.get_engine.cache_clear()
+    db.get_replica_engines.cache_clear()
+    db.get_sessionmaker.cache_clear()
+
+
+@pytest.fixture
+async def profiled(database):
+    """Клиент приложения, собранного с ``PROFILING_ENABLED=true``."""
+    fake = FakeInstrumentedRedis(decode_responses=True)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(get_settings(), "profiling_enabled", True)
+        patch.setattr(get_settings(), "profiling_token", TOKEN)
+        for module in (cache, statistics):
+            patch.setattr(module, "get_redis", lambda: fake)
+        clear_engines()
+        app = importlib.reload(main).app
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://test",
+            ) as http_client:
+                yield http_client
+        finally:
+            await db.get_engine().dispose()
+    clear_engines()
+    importlib.reload(main)
+
+
+def server_timing(response: httpx.Response) -> dict[str, dict[str, str]]:
+    """Записи заголовка ``Server-Timing`` по именам."""
+    entries = {}
+    for entry in response.headers["Server-Timing"].split(","):
+        name, *params = entry.strip().split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+def parse_metrics(text: str) -> dict[str, list[tuple[str, float]]]:
+    """Строки значений ``/metrics``, сгруппированные по имени метрики."""
+    samples: dict[str, list[tuple[str, float]]] = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            assert re.match(r"^# (HELP|TYPE) [a-z_]+ .+$", line), line
+            continue
+        match = METRIC_LINE.match(line)
+        assert match, line
+        samples.setdefault(match["name"], []).append(
+            (match["labels"] or "", float(match["value"]))
+        )
+    return samples
+
+
+def request_count(text: str, route: str) -> float:
+    """Сумма ``http_request_duration_seconds_count`` по маршруту."""
+    samples = parse_metrics(text)["http_request_duration_seconds_count"]
+    return sum(
+        value for labels, value in samples if f'route="{route}"' in labels
+    )
+
+
+async def test_server_timing_entries(profiled):
+    """Server-Timing содержит db, redis, render и total запроса."""
+    response = await profiled.get("/statistics/", params={"format": "raw"})
+
+    entries = server_timing(response)
+    assert response.status_code == 200
+    assert {"db", "redis", "render", "app", "total"} <= entries.keys()
+    assert int(entries["db"]["desc"].strip('"').split()[0]) > 0
+    assert int(entries["redis"]["desc"].strip('"').split()[0]) > 0
+    total = float(entries["total"]["dur"])
+    parts = sum(
+        float(entries[name]["dur"]) for name in ("db", "redis", "render")
+    )
+    assert 0 < parts <= total
+
+
+async def test_metrics_histograms(profiled):
+    """``/metrics`` отдаёт корректные гистограммы Prometheus."""
+    await profiled.get("/statistics/", params={"format": "raw"})
+    before = (await profiled.get("/metrics")).text
+
+    await profiled.get("/statistics/", params={"format": "raw"})
+    response = await profiled.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = parse_metrics(response.text)
+    for name in (
+        "http_request_duration_seconds",
+        "http_request_db_queries",
+        "db_query_duration_seconds",
+        "redis_command_duration_seconds",
+        "response_render_duration_seconds",
+    ):
+        assert f"# TYPE {name} histogram" in response.text
+        series: dict[str, list[float]] = {}
+        for labels, value in samples[f"{name}_bucket"]:
+            key = re.sub(r',?le="[^"]*"', "", labels)
+            series.setdefault(key, []).append(value)
+        counts = dict(samples[f"{name}_count"])
+        for key, buckets in series.items():
+            assert buckets == sorted(buckets), (name, key)
+            assert buckets[-1] == counts[key], (name, key)
+    assert request_count(response.text, "/statistics/") == (
+        request_count(before, "/statistics/") + 1
+    )
+
+
+def test_histogram_cumulative_buckets():
+    """Корзины накопительные, +Inf равна числу наблюдений."""
+    histogram = Histogram("test_seconds", "Тест.", ("kind",), (0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, "a")
+
+    lines = list(histogram.render())
+
+    assert lines[2:] == [
+        'test_seconds_bucket{kind="a",le="0.1"} 1',
+        'test_seconds_bucket{kind="a",le="1.0"} 3',
+        'test_seconds_bucket{kind="a",le="+Inf"} 4',
+        'test_seconds_sum{kind="a"} 4.25',
+        'test_seconds_count{kind="a"} 4',
+    ]
+
+
+async def test_profile_with_token(profiled):
+    """С верным токеном вместо ответа отдаётся HTML-отчёт pyinstrument."""
+    pytest.importorskip("pyinstrument")
+
+    response = await profiled.get("/statistics/", headers={"X-Profile": TOKEN})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert "pyinstrument" in response.text.lower()
+
+
+@pytest.mark.parametrize("header", ["wrong-token", ""])
+async def test_profile_with_wrong_token(profiled, header):
+    """С неверным токеном запрос выполняется как обычно."""
+    response = await profiled.get(
+        "/statistics/",
+        params={"format": "raw"},
+        headers={"X-Profile": header},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "added_count" in response.json()
+    assert "total" in server_timing(response)
+
+
+async def test_profile_without_configured_token(profiled, monkeypatch):
+    """Без ``PROFILING_TOKEN`` заголовок не включает профиль."""
+    monkeypatch.setattr(get_settings(), "profiling_token", "")
+
+    response = await profiled.get(
+        "/statistics/", params={"format": "raw"}, headers={"X-Profile": ""}
+    )
+
+    assert response.headers["content-type"] == "application/json"
+
+
+async def test_disabled_profiling_not_instrumented(client):
+    """Без профилирования нет событий движка, метрик и заголовка."""
+    assert not get_settings().profiling_enabled
+    engine = db.create_engine(get_settings().database_url)
+    dispatch = engine.sync_engine.dispatch
+
+    response = await client.get("/statistics/", params={"format": "raw"})
+
+    assert len(dispatch.before_cursor_execute) == 0
+    assert len(dispatch.after_cursor_execute) == 0
+    assert len(db.get_engine().sync_engine.dispatch.before_cursor_execute) == 0
+    assert type(get_redis.__wrapped__()) is not InstrumentedRedis
+    assert "Server-Timing" not in response.headers
+    assert (await client.get("/metrics")).status_code == 404
+    await engine.dispose()
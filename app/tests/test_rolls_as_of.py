@@ -0,0 +1,85 @@
+"""Тесты остатков на момент времени (GET /rolls/as-of)."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.rolls import Rolls
+
+
+@pytest.fixture
+async def rolls(session):
+    """Рулоны с разными периодами хранения."""
+    await session.execute(
+        insert(Rolls),
+        [
+            # На складе с 1 по 10 января.
+            {
+                "length": 1,
+                "weight": 10,
+                "added_at": datetime(2024, 1, 1),
+                "removed_at": datetime(2024, 1, 10),
+            },
+            # На складе с 5 января до сих пор.
+            {"length": 2, "weight": 20, "added_at": datetime(2024, 1, 5)},
+            # Поступил 20 января.
+            {"length": 4, "weight": 40, "added_at": datetime(2024, 1, 20)},
+            # Дата удаления раньше даты поступления (старые данные).
+            {
+                "length": 8,
+                "weight": 80,
+                "added_at": datetime(2024, 1, 6),
+                "removed_at": datetime(2024, 1, 3),
+            },
+        ],
+    )
+    await session.commit()
+
+
+@pytest.mark.parametrize(
+    "ts, count, weight",
+    [
+        ("2023-12-31T00:00:00", 0, 0),
+        ("2024-01-01T00:00:00", 1, 10),
+        ("2024-01-07T00:00:00", 2, 30),
+        ("2024-01-10T00:00:00", 1, 20),
+        ("2024-01-25T00:00:00", 2, 60),
+    ],
+)
+async def test_totals_at_moment(client, rolls, ts, count, weight):
+    """Период хранения - полуинтервал ``[added_at, removed_at)``."""
+    response = await client.get("/rolls/as-of", params={"ts": ts})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["count"], body["total_weight"]) == (count, weight)
+    assert "items" not in body
+
+
+async def test_items_page(client, rolls):
+    """С ``items=true`` возвращается страница рулонов с курсором."""
+    params = {"ts": "2024-01-25T00:00:00", "items": "true", "limit": 1}
+
+    first = (await client.get("/rolls/as-of", params=params)).json()
+    second = (
+        await client.get(
+            "/rolls/as-of",
+            params={**params, "cursor": first["next_cursor"]},
+        )
+    ).json()
+
+    assert [roll["weight"] for roll in first["items"] + second["items"]] == [
+        20,
+        40,
+    ]
+    assert second["next_cursor"] is None
+
+
+async def test_present_at_filter(client, rolls):
+    """То же условие доступно в списке рулонов через ``present_at``."""
+    response = await client.get(
+        "/rolls/", params={"present_at": "2024-01-07T00:00:00"}
+    )
+
+    assert [roll["weight"] for roll in response.json()["items"]] == [10, 20]
@@ -0,0 +1,116 @@
+"""Тесты пакетных операций с рулонами."""
+
+
+async def create_rolls(client, count: int) -> list[int]:
+    """Создаёт ``count`` рулонов и возвращает их ID."""
+    response = await client.post(
+        "/rolls/bulk",
+        json=[{"length": 10 + i, "weight": 100 + i} for i in range(count)],
+    )
+    assert response.status_code == 200
+    return [roll["id"] for roll in response.json()]
+
+
+async def test_create_bulk_keeps_request_order(client):
+    """Рулоны создаются и возвращаются в порядке запроса."""
+    response = await client.post(
+        "/rolls/bulk",
+        json=[{"length": 3, "weight": 30}, {"length": 1, "weight": 10}],
+    )
+
+    assert response.status_code == 200
+    rolls = response.json()
+    assert [roll["length"] for roll in rolls] == [3, 1]
+    assert rolls[0]["id"] < rolls[1]["id"]
+
+
+async def test_create_bulk_rejects_empty_list(client):
+    """Пустая пачка отклоняется валидацией."""
+    response = await client.post("/rolls/bulk", json=[])
+
+    assert response.status_code == 422
+
+
+async def test_remove_bulk_reports_missing_and_already_removed(client):
+    """Незатронутые ID делятся на отсутствующие и уже удалённые."""
+    first, second = await create_rolls(client, 2)
+    await client.delete(f"/rolls/{second}")
+
+    response = await client.post(
+        "/rolls/bulk-remove", json={"ids": [first, second, 999_999]}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "ids": [first],
+        "missing": [999_999],
+        "already_removed": [second],
+    }
+    roll = (await client.get(f"/rolls/{first}")).json()
+    assert roll["removed_at"] is not None
+
+
+async def test_remove_bulk_when_nothing_matches(client):
+    """Удаление без затронутых рулонов не падает после коммита."""
+    (roll_id,) = await create_rolls(client, 1)
+    await client.delete(f"/rolls/{roll_id}")
+
+    response = await client.post(
+        "/rolls/bulk-remove", json={"ids": [roll_id, 999_999]}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "ids": [],
+        "missing": [999_999],
+        "already_removed": [roll_id],
+    }
+
+
+async def test_update_bulk_by_filter(client):
+    """Обновление по фильтру меняет только подходящие рулоны."""
+    ids = await create_rolls(client, 3)
+
+    response = await client.patch(
+        "/rolls/bulk",
+        json={"filters": {"min_weight": 101}, "values": {"weight": 500}},
+    )
+
+    assert response.status_code == 200
+    assert sorted(response.json()["ids"]) == ids[1:]
+    weights = [(await client.get(f"/rolls/{i}")).json()["weight"] for i in ids]
+    assert weights == [100, 500, 500]
+
+
+async def test_update_bulk_when_filter_matches_nothing(client):
+    """Фильтр без совпадений даёт пустой результат, а не 500."""
+    await create_rolls(client, 2)
+
+    response = await client.patch(
+        "/rolls/bulk",
+        json={"filters": {"min_weight": 10_000}, "values": {"weight": 1}},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"ids": [], "missing": [], "already_removed": []}
+
+
+async def test_update_bulk_requires_values(client):
+    """Обновление без полей отклоняется."""
+    (roll_id,) = await create_rolls(client, 1)
+
+    response = await client.patch(
+        "/rolls/bulk", json={"ids": [roll_id], "values": {}}
+    )
+
+    assert response.status_code == 400
+
+
+async def test_bulk_selector_requires_exactly_one_way(client):
+    """Нельзя задать одновременно ids и filters."""
+    response = await client.post(
+        "/rolls/bulk-remove",
+        json={"ids": [1], "filters": {"min_weight": 1}},
+    )
+
+    assert response.status_code == 422
@@ -0,0 +1,120 @@
+"""Тесты keyset-пагинации GET /rolls/."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import get_settings
+from app.models.rolls import Rolls
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+async def rolls(session):
+    """
+    Десять рулонов; у пар соседних рулонов одинаковый ``added_at``.
+
+    Порядок ``added_at`` обратен порядку ID, чтобы сортировки различались.
+    """
+    await session.execute(
+        insert(Rolls),
+        [
+            {
+                "length": i,
+                "weight": 100 + i,
+                "added_at": START + timedelta(hours=(10 - i) // 2),
+            }
+            for i in range(10)
+        ],
+    )
+    await session.commit()
+
+
+async def read_all(client, **params) -> tuple[list[dict], int]:
+    """Все страницы списка и число запросов."""
+    items, requests, cursor = [], 0, None
+    while True:
+        page_params = dict(params)
+        if cursor is not None:
+            page_params["cursor"] = cursor
+        response = await client.get("/rolls/", params=page_params)
+        assert response.status_code == 200
+        requests += 1
+        page = response.json()
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, requests
+
+
+async def test_pages_by_id(client, rolls):
+    """Страницы по ID идут без пропусков и повторов."""
+    items, requests = await read_all(client, limit=3)
+
+    assert [roll["id"] for roll in items] == list(range(1, 11))
+    assert requests == 4
+
+
+async def test_pages_by_added_at_with_ties(client, rolls):
+    """Одинаковый ``added_at`` не теряет строки на границе страниц."""
+    items, requests = await read_all(client, limit=3, order_by="added_at")
+
+    keys = [(roll["added_at"], roll["id"]) for roll in items]
+    assert keys == sorted(keys)
+    assert sorted(roll["id"] for roll in items) == list(range(1, 11))
+    assert requests == 4
+
+
+async def test_last_full_page_has_no_cursor(client, rolls):
+    """Если строк ровно на страницу, курсор следующей не выдаётся."""
+    response = await client.get("/rolls/", params={"limit": 10})
+
+    assert len(response.json()["items"]) == 10
+    assert response.json()["next_cursor"] is None
+
+
+async def test_filters_apply_to_every_page(client, rolls):
+    """Фильтр действует на все страницы, а не только на первую."""
+    items, _ = await read_all(client, limit=2, min_weight=104)
+
+    assert [roll["weight"] for roll in items] == [104, 105, 106, 107, 108, 109]
+
+
+async def test_invalid_cursor(client, rolls):
+    """Повреждённый курсор - 400, а не 500."""
+    response = await client.get("/rolls/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+async def test_cursor_for_other_order(client, rolls):
+    """Курсор другой сортировки отклоняется."""
+    page = (await client.get("/rolls/", params={"limit": 2})).json()
+
+    response = await client.get(
+        "/rolls/",
+        params={"cursor": page["next_cursor"], "order_by": "added_at"},
+    )
+
+    assert response.status_code == 400
+
+
+async def test_page_size_limit(client, rolls):
+    """Размер страницы ограничен ``ROLLS_MAX_PAGE_SIZE``."""
+    response = await client.get("/rolls/", params={"limit": 100_000})
+
+    assert response.status_code == 422
+
+
+async def test_page_size_limit_read_per_request(client, rolls, monkeypatch):
+    """Граница страницы и размер по умолчанию читаются при запросе."""
+    monkeypatch.setattr(get_settings(), "rolls_max_page_size", 2)
+    monkeypatch.setattr(get_settings(), "rolls_page_size", 1)
+
+    rejected = await client.get("/rolls/", params={"limit": 3})
+    default = await client.get("/rolls/")
+
+    assert rejected.status_code == 422
+    assert len(default.json()["items"]) == 1
@@ -0,0 +1,102 @@
+"""Тесты чтения с реплик и локального кэша рулонов."""
+
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import db
+from app.core.cache import rolls_cache
+from app.core.base import Base
+from app.core.config import settings
+
+STALE = {"id": 1, "length": 1.0, "weight": 1.0, "version": 1}
+
+
+@pytest.fixture
+async def roll_id(client):
+    """ID нового рулона."""
+    response = await client.post(
+        "/rolls/bulk", json=[{"length": 5, "weight": 50}]
+    )
+    rolls_cache.clear()
+    client.cookies.clear()
+    return response.json()[0]["id"]
+
+
+@pytest.fixture
+async def replica(monkeypatch):
+    """Реплика: отдельный движок на том же файле SQLite."""
+    engine = create_async_engine(settings.database_url)
+    monkeypatch.setattr(db, "get_replica_engines", lambda: (engine,))
+    yield engine
+    await engine.dispose()
+
+
+def sticky_cookies() -> dict:
+    """Cookie клиента, недавно записавшего в основную БД."""
+    return {db.STICKY_COOKIE: str(time.time() + 60)}
+
+
+async def test_write_marks_client_sticky(client, replica):
+    """После записи клиент получает cookie закрепления за основной БД."""
+    response = await client.post("/rolls/", json={"length": 5, "weight": 50})
+
+    assert db.STICKY_COOKIE in response.cookies
+
+
+async def test_replica_read_does_not_fill_cache(client, replica, roll_id):
+    """Строка, прочитанная с реплики, в локальный кэш не попадает."""
+    response = await client.get(f"/rolls/{roll_id}")
+
+    assert response.status_code == 200
+    assert rolls_cache.get(roll_id) is None
+
+
+async def test_sticky_read_skips_cache(client, replica, roll_id):
+    """Закреплённый клиент читает основную БД, а не локальный кэш."""
+    rolls_cache.set(roll_id, {**STALE, "id": roll_id})
+    client.cookies.update(sticky_cookies())
+
+    single = await client.get(f"/rolls/{roll_id}")
+    batch = await client.get("/rolls/batch", params={"ids": [roll_id]})
+
+    assert single.json()["weight"] == 50
+    assert batch.json()["items"][0]["weight"] == 50
+
+
+async def test_primary_read_fills_cache(client, replica, roll_id):
+    """Строка из основной БД кэшируется и отдаётся следующим чтениям."""
+    client.cookies.update(sticky_cookies())
+    await client.get("/rolls/batch", params={"ids": [roll_id]})
+    client.cookies.clear()
+
+    assert rolls_cache.get(roll_id)["weight"] == 50
+
+
+async def test_cache_without_replicas(client, roll_id):
+    """Без реплик все чтения идут в основную БД и используют кэш."""
+    await client.get(f"/rolls/{roll_id}")
+    rolls_cache.set(roll_id, {**STALE, "id": roll_id})
+
+    response = await client.get(f"/rolls/{roll_id}")
+
+    assert response.json()["weight"] == STALE["weight"]
+
+
+async def test_statistics_recomputed_on_primary(client, tmp_path, monkeypatch):
+    """Промах кэша статистики считается по основной БД, а не по реплике."""
+    lagging = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    )
+    async with lagging.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(db, "get_replica_engines", lambda: (lagging,))
+    await client.post("/rolls/bulk", json=[{"length": 5, "weight": 50}])
+    client.cookies.clear()
+
+    response = await client.get("/statistics/", params={"format": "raw"})
+    await lagging.dispose()
+
+    assert response.status_code == 200
+    assert response.json()["added_count"] == 1
@@ -0,0 +1,113 @@
+"""Тесты версий рулонов: ETag, If-Match и 412."""
+
+import pytest
+
+
+@pytest.fixture
+async def roll_id(client):
+    """ID нового рулона (версия 1)."""
+    response = await client.post("/rolls/", json={"length": 5, "weight": 50})
+    assert response.status_code == 200
+    return (await client.get("/rolls/", params={"limit": 1})).json()["items"][
+        0
+    ]["id"]
+
+
+async def test_get_returns_etag(client, roll_id):
+    """GET отдаёт версию рулона в ETag."""
+    response = await client.get(f"/rolls/{roll_id}")
+
+    assert response.headers["ETag"] == '"1"'
+    assert response.json()["version"] == 1
+
+
+async def test_update_with_matching_version(client, roll_id):
+    """Совпавший If-Match обновляет рулон и увеличивает версию."""
+    response = await client.patch(
+        f"/rolls/{roll_id}", json={"weight": 60}, headers={"If-Match": '"1"'}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+    assert (await client.get(f"/rolls/{roll_id}")).json()["weight"] == 60
+
+
+async def test_update_with_stale_version(client, roll_id):
+    """Устаревший If-Match - 412, чужая правка не затирается."""
+    await client.patch(f"/rolls/{roll_id}", json={"weight": 60})
+
+    response = await client.patch(
+        f"/rolls/{roll_id}", json={"weight": 70}, headers={"If-Match": '"1"'}
+    )
+
+    assert response.status_code == 412
+    roll = (await client.get(f"/rolls/{roll_id}")).json()
+    assert (roll["weight"], roll["version"]) == (60, 2)
+
+
+@pytest.mark.parametrize("if_match", ["*", 'W/"1"'])
+async def test_update_with_wildcard_or_weak_tag(client, roll_id, if_match):
+    """``*`` и слабый тег с той же версией допускают запись."""
+    response = await client.patch(
+        f"/rolls/{roll_id}", json={"length": 7}, headers={"If-Match": if_match}
+    )
+
+    assert response.status_code == 200
+
+
+async def test_update_with_invalid_tag(client, roll_id):
+    """Нераспознанный тег не совпадает ни с одной версией."""
+    response = await client.patch(
+        f"/rolls/{roll_id}", json={"length": 7}, headers={"If-Match": "abc"}
+    )
+
+    assert response.status_code == 412
+
+
+async def test_update_missing_roll(client):
+    """Несуществующий рулон - 404, а не 412."""
+    response = await client.patch(
+        "/rolls/999999", json={"length": 7}, headers={"If-Match": '"1"'}
+    )
+
+    assert response.status_code == 404
+
+
+async def test_empty_update_keeps_version(client, roll_id):
+    """Пустой PATCH ничего не записывает и не меняет версию."""
+    response = await client.patch(f"/rolls/{roll_id}", json={})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1"'
+    assert (await client.get(f"/rolls/{roll_id}")).json()["version"] == 1
+
+
+async def test_empty_update_checks_version(client, roll_id):
+    """Пустой PATCH с устаревшим If-Match тоже получает 412."""
+    response = await client.patch(
+        f"/rolls/{roll_id}", json={}, headers={"If-Match": '"5"'}
+    )
+
+    assert response.status_code == 412
+
+
+async def test_delete_with_stale_version(client, roll_id):
+    """Удаление с устаревшим If-Match - 412, рулон остаётся на складе."""
+    response = await client.delete(
+        f"/rolls/{roll_id}", headers={"If-Match": '"2"'}
+    )
+
+    assert response.status_code == 412
+    assert (await client.get(f"/rolls/{roll_id}")).json().get(
+        "removed_at"
+    ) is None
+
+
+async def test_repeated_delete_keeps_removed_at(client, roll_id):
+    """Повторное удаление не меняет дату удаления и версию."""
+    first = await client.delete(f"/rolls/{roll_id}")
+    second = await client.delete(f"/rolls/{roll_id}")
+
+    assert second.status_code == 200
+    assert second.json()["removed_at"] == first.json()["removed_at"]
+    assert second.headers["ETag"] == first.headers["ETag"] == '"2"'
@@ -0,0 +1,70 @@
+"""Тесты инкрементальных дневных агрегатов."""
+
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import insert, select
+
+from app.models.rolls import Rolls
+from app.services.rollup import RollupService
+from app.services.statistics import StatisticsService
+
+START = date(2024, 3, 1)
+
+
+async def add_rolls(session, days: list[int]) -> None:
+    """Рулоны, добавленные в дни ``START + days`` и учтённые в агрегатах."""
+    rolls = [
+        {
+            "length": 10 + day,
+            "weight": 100 + day,
+            "added_at": datetime.combine(START, datetime.min.time())
+            + timedelta(days=day, hours=12),
+        }
+        for day in days
+    ]
+    await session.execute(insert(Rolls), rolls)
+    await RollupService(session).added(
+        [SimpleNamespace(**roll) for roll in rolls]
+    )
+    await session.commit()
+
+
+async def test_changed_rebuilds_only_affected_days(session, monkeypatch):
+    """Пересчитываются только дни изменённых рулонов, а не весь диапазон."""
+    service = RollupService(session)
+    rebuilt = []
+
+    async def rebuild(start, end):
+        rebuilt.append((start, end))
+
+    monkeypatch.setattr(service, "rebuild", rebuild)
+    rolls = [
+        SimpleNamespace(added_at=datetime(2024, 3, day, 12))
+        for day in (1, 2, 2, 3, 20, 31)
+    ]
+
+    await service.changed(rolls)
+
+    assert rebuilt == [
+        (date(2024, 3, 1), date(2024, 3, 3)),
+        (date(2024, 3, 20), date(2024, 3, 20)),
+        (date(2024, 3, 31), date(2024, 3, 31)),
+    ]
+
+
+async def test_changed_keeps_rollup_in_sync(client, session):
+    """После правки веса агрегаты rollup совпадают с таблицей rolls."""
+    await add_rolls(session, [0, 0, 5, 30])
+    ids = (await session.execute(select(Rolls.id))).scalars().all()
+
+    response = await client.patch(
+        "/rolls/bulk", json={"ids": [ids[0], ids[3]], "values": {"weight": 1}}
+    )
+
+    assert response.status_code == 200
+    service = StatisticsService(session)
+    end = START + timedelta(days=30)
+    assert await service._aggregate_daily(
+        START, end
+    ) == await service._aggregate_rolls(START, end)
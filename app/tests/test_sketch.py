@@ -0,0 +1,134 @@
+"""Тесты скетчей квантилей и их поддержки в дневных агрегатах."""
+
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.models.rolls import Rolls
+from app.models.rolls_daily_sketch import RollsDailySketch
+from app.services.rollup import RollupService
+from app.services.sketch import (
+    RELATIVE_ACCURACY,
+    ZERO_BUCKET,
+    bucket_index,
+    bucket_value,
+    quantiles,
+)
+from app.services.statistics import StatisticsService
+from benchmarks.datagen import generate
+
+
+def nearest_rank(values: list[float], q: float) -> float:
+    """Квантиль с тем же рангом, что и в ``quantiles``."""
+    ordered = sorted(values)
+    rank = q * (len(ordered) - 1)
+    return ordered[int(rank)]
+
+
+async def sketch_rows(session) -> list[tuple]:
+    """Все счётчики скетчей, упорядоченные по ключу."""
+    sketch = RollsDailySketch
+    result = await session.execute(
+        select(sketch.day, sketch.metric, sketch.bucket, sketch.count)
+        .where(sketch.count > 0)
+        .order_by(sketch.day, sketch.metric, sketch.bucket)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+def test_bucket_value_within_relative_accuracy():
+    """Оценка корзины отличается от значения не больше чем на α."""
+    rng = random.Random(23)
+    for _ in range(10_000):
+        value = rng.uniform(0.01, 1e7)
+
+        estimate = bucket_value(bucket_index(value))
+
+        assert abs(estimate - value) <= RELATIVE_ACCURACY * value
+
+
+def test_small_values_share_zero_bucket():
+    """Нулевые и отрицательные значения попадают в нулевую корзину."""
+    assert bucket_index(0) == bucket_index(-5) == ZERO_BUCKET
+    assert bucket_value(ZERO_BUCKET) == 0.0
+
+
+def test_quantiles_of_empty_sketch():
+    """Пустой скетч даёт None для каждого квантиля."""
+    assert quantiles([(10, 0)], [0.5, 0.9]) == [None, None]
+
+
+def test_quantiles_match_exact_values():
+    """Квантили по корзинам совпадают с точными с погрешностью α."""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(5, 1.5) for _ in range(5000)]
+    counts: dict = {}
+    for value in values:
+        counts[bucket_index(value)] = counts.get(bucket_index(value), 0) + 1
+
+    estimates = quantiles(sorted(counts.items()), [0.1, 0.5, 0.9, 0.99])
+
+    for q, estimate in zip([0.1, 0.5, 0.9, 0.99], estimates):
+        exact = nearest_rank(values, q)
+        assert estimate == pytest.approx(exact, rel=RELATIVE_ACCURACY)
+
+
+async def test_incremental_sketches_match_rebuild(session):
+    """Скетчи, накопленные при записи, совпадают с пересчитанными."""
+    start = datetime(2024, 3, 1, 12)
+    rolls = [
+        SimpleNamespace(
+            length=1 + i,
+            weight=50 + i * 7,
+            added_at=start + timedelta(days=i % 5, minutes=i),
+            removed_at=start + timedelta(days=i % 5 + i % 3, hours=i),
+        )
+        for i in range(40)
+    ]
+    await session.execute(insert(Rolls), [dict(vars(roll)) for roll in rolls])
+    service = RollupService(session)
+    await service.added(rolls)
+    await service.removed(rolls)
+    incremental = await sketch_rows(session)
+
+    await service.rebuild(start.date(), start.date() + timedelta(days=10))
+
+    assert incremental
+    assert await sketch_rows(session) == incremental
+
+
+async def test_sketch_percentiles_match_rolls(database, session):
+    """Квантили по дневным скетчам близки к квантилям по рулонам."""
+    await generate(database, 3000, years=0.5, seed=23)
+    rolls = (await session.execute(select(Rolls))).scalars().all()
+    end_date = max(roll.added_at for roll in rolls).date()
+    start_date = end_date - timedelta(days=90)
+    lower = datetime.combine(start_date, datetime.min.time())
+    upper = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    added = [roll for roll in rolls if lower <= roll.added_at < upper]
+    removed = [
+        roll
+        for roll in rolls
+        if roll.removed_at is not None and lower <= roll.removed_at < upper
+    ]
+    samples = {
+        "length": [roll.length for roll in added],
+        "weight": [roll.weight for roll in added],
+        "storage_seconds": [
+            (roll.removed_at - roll.added_at).total_seconds()
+            for roll in removed
+        ],
+    }
+
+    actual = await StatisticsService(session)._sketch_percentiles(
+        start_date, end_date
+    )
+
+    for metric, values in samples.items():
+        for name, q in (("median", 0.5), ("p90", 0.9)):
+            assert actual[f"{name}_{metric}"] == pytest.approx(
+                nearest_rank(values, q), rel=2 * RELATIVE_ACCURACY
+            ), (name, metric)
@@ -0,0 +1,168 @@
+"""Тесты кэша статистики и объединения одновременных пересчётов."""
+
+import asyncio
+import json
+import time
+from datetime import date
+
+from app.core.cache import apply_invalidation
+from app.core.db import new_session
+from app.services import statistics
+from app.services.statistics import StatisticsService
+
+PERIOD = (date(2024, 1, 1), date(2024, 1, 7))
+
+
+async def test_concurrent_misses_share_one_computation(monkeypatch):
+    """Одновременные промахи ждут один пересчёт в его собственной сессии."""
+    sessions = []
+
+    async def compute(self, start_date, end_date):
+        sessions.append(self.db)
+        await asyncio.sleep(0.05)
+        return {"added_count": len(sessions)}
+
+    monkeypatch.setattr(StatisticsService, "_compute", compute)
+    requests = [new_session() for _ in range(5)]
+
+    results = await asyncio.gather(
+        *(
+            StatisticsService(session).get_statistics(*PERIOD)
+            for session in requests
+        )
+    )
+
+    assert results == [{"added_count": 1}] * 5
+    assert len(sessions) == 1
+    assert sessions[0] not in requests
+    for session in requests:
+        await session.close()
+
+
+async def test_computation_outlives_first_request(monkeypatch):
+    """Пересчёт не использует сессию запроса, который его начал."""
+    started = asyncio.Event()
+
+    async def compute(self, start_date, end_date):
+        started.set()
+        await asyncio.sleep(0.05)
+        return await self.aggregate(start_date, end_date)
+
+    monkeypatch.setattr(StatisticsService, "_compute", compute)
+    first = new_session()
+    first_request = asyncio.create_task(
+        StatisticsService(first).get_statistics(*PERIOD)
+    )
+    await started.wait()
+    first_request.cancel()
+    await first.close()
+
+    async with new_session() as session:
+        result = await StatisticsService(session).get_statistics(*PERIOD)
+
+    assert result["added_count"] == 0
+
+
+async def test_wait_stops_when_lock_released(redis, session):
+    """Ожидание прекращается, если блокировку сняли без записи значения."""
+    service = StatisticsService(session)
+    started = time.perf_counter()
+
+    cached = await service._wait_for("totals", 0, "stats:v0:totals")
+
+    assert cached is None
+    assert time.perf_counter() - started < 1
+
+
+async def test_wait_stops_when_generation_changes(redis, session):
+    """Ожидание прекращается, если поколение кэша сменилось."""
+    service = StatisticsService(session)
+    await redis.set("stats:lock:totals", "worker", ex=30)
+    await redis.set(statistics.CACHE_GENERATION_KEY, 1)
+
+    cached = await asyncio.wait_for(
+        service._wait_for("totals", 0, "stats:v0:totals"), 1
+    )
+
+    assert cached is None
+
+
+async def test_wait_returns_value_written_by_other_worker(redis, session):
+    """Значение, записанное держателем блокировки, возвращается."""
+    service = StatisticsService(session)
+    await redis.set("stats:lock:totals", "worker", ex=30)
+
+    async def write_later():
+        await asyncio.sleep(0.1)
+        await redis.set("stats:v0:totals", json.dumps({"added_count": 3}))
+
+    writer = asyncio.create_task(write_later())
+    cached = await service._wait_for("totals", 0, "stats:v0:totals")
+    await writer
+
+    assert cached == {"added_count": 3}
+
+
+async def test_invalidate_cache_bumps_generation(redis, session):
+    """Запись в рулоны делает недействительными все ключи статистики."""
+    service = StatisticsService(session)
+    statistics.statistics_cache.set("totals", {"added_count": 1})
+
+    await service.invalidate_cache()
+
+    assert await redis.get(statistics.CACHE_GENERATION_KEY) == "1"
+    assert statistics.statistics_cache.get("totals") is None
+
+
+async def test_invalidation_during_compute_skips_local_cache(monkeypatch):
+    """Результат, посчитанный до инвалидации, не попадает в LRU."""
+
+    async def compute(self, start_date, end_date):
+        apply_invalidation("stats")
+        return {"added_count": 1}
+
+    monkeypatch.setattr(StatisticsService, "_compute", compute)
+
+    async with new_session() as session:
+        result = await StatisticsService(session).get_statistics(*PERIOD)
+
+    assert result == {"added_count": 1}
+    assert len(statistics.statistics_cache) == 0
+
+
+async def test_invalidation_during_redis_read_skips_local_cache(
+    redis, session, monkeypatch
+):
+    """Значение из Redis, прочитанное до инвалидации, не попадает в LRU."""
+    service = StatisticsService(session)
+    name = f"totals:{PERIOD[0]}:{PERIOD[1]}"
+    await redis.set(service._get_cache_key(0, name), '{"added_count": 1}')
+    mget = redis.mget
+
+    async def mget_then_invalidate(*keys):
+        values = await mget(*keys)
+        apply_invalidation("stats")
+        return values
+
+    monkeypatch.setattr(redis, "mget", mget_then_invalidate)
+
+    assert await service.get_statistics(*PERIOD) == {"added_count": 1}
+    assert len(statistics.statistics_cache) == 0
+
+
+async def test_format_parameter_selects_language(client):
+    """Параметр ``format`` важнее Accept-Language, ``raw`` отдаёт числа."""
+    headers = {"Accept-Language": "ru"}
+
+    localized = await client.get(
+        "/statistics/", params={"format": "en"}, headers=headers
+    )
+    raw = await client.get(
+        "/statistics/", params={"format": "raw"}, headers=headers
+    )
+    default = await client.get("/statistics/", headers=headers)
+
+    assert localized.headers["Content-Language"] == "en"
+    assert default.headers["Content-Language"] == "ru"
+    assert "Content-Language" not in raw.headers
+    assert raw.json()["added_count"] == 0
@@ -0,0 +1,84 @@
+"""Тесты ряда статистики по интервалам."""
+
+from datetime import date
+
+import pytest
+
+from app.services.statistics import StatisticsService
+
+
+@pytest.fixture
+def no_buckets(monkeypatch):
+    """Запрещает строить список интервалов."""
+
+    def series_buckets(*args):
+        raise AssertionError("интервалы построены до проверки")
+
+    monkeypatch.setattr(
+        StatisticsService, "series_buckets", staticmethod(series_buckets)
+    )
+
+
+@pytest.mark.parametrize(
+    "bucket, start_date, end_date",
+    [
+        ("day", date(2024, 1, 1), date(2024, 1, 1)),
+        ("day", date(2024, 1, 1), date(2024, 1, 31)),
+        ("hour", date(2024, 3, 30), date(2024, 4, 1)),
+        ("week", date(2024, 1, 3), date(2024, 2, 29)),
+        ("week", date(2024, 1, 1), date(2024, 1, 7)),
+    ],
+)
+def test_series_count_matches_buckets(bucket, start_date, end_date):
+    """Число интервалов совпадает с длиной построенного ряда."""
+    buckets = StatisticsService.series_buckets(bucket, start_date, end_date)
+
+    count = StatisticsService.series_count(bucket, start_date, end_date)
+
+    assert count == len(buckets)
+
+
+async def test_series_returns_every_bucket(client):
+    """Ряд содержит все интервалы периода, включая пустые."""
+    response = await client.get(
+        "/statistics/series",
+        params={
+            "bucket": "day",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-10",
+        },
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 10
+
+
+async def test_series_rejects_too_many_buckets(client, no_buckets):
+    """Слишком длинный ряд отклоняется до построения интервалов."""
+    for start_date in ("1900-01-01", "0001-01-01"):
+        response = await client.get(
+            "/statistics/series",
+            params={
+                "bucket": "hour",
+                "start_date": start_date,
+                "end_date": "2025-12-31",
+            },
+        )
+
+        assert response.status_code == 400
+        assert "интервалов" in response.json()["detail"]
+
+
+async def test_series_rejects_end_of_date_range(client, no_buckets):
+    """Конец периода в последний допустимый день даёт 400, а не 500."""
+    response = await client.get(
+        "/statistics/series",
+        params={
+            "bucket": "day",
+            "start_date": "9999-12-30",
+            "end_date": "9999-12-31",
+        },
+    )
+
+    assert response.status_code == 400
+    assert "диапазон" in response.json()["detail"]
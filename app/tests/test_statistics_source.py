@@ -0,0 +1,69 @@
+"""Тесты источников статистики без дневных агрегатов (rolls, matview)."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import get_settings
+from app.models.rolls_daily_sketch import RollsDailySketch
+from app.models.rolls_daily_stats import RollsDailyStats
+from app.services.sketch import RELATIVE_ACCURACY
+from app.services.statistics import StatisticsService
+
+
+@pytest.fixture(params=["rolls", "matview"])
+def source(request, monkeypatch):
+    """Источник статистики, при котором rollup не ведётся."""
+    monkeypatch.setattr(get_settings(), "statistics_source", request.param)
+    return request.param
+
+
+async def create_rolls(client) -> list[int]:
+    """Создаёт рулоны и списывает каждый третий."""
+    response = await client.post(
+        "/rolls/bulk",
+        json=[{"length": 1 + i, "weight": 50 + i * 7} for i in range(30)],
+    )
+    ids = [roll["id"] for roll in response.json()]
+    await client.post("/rolls/bulk-remove", json={"ids": ids[::3]})
+    return ids
+
+
+async def test_writes_skip_rollup(source, client, session):
+    """Записи не обновляют дневные агрегаты и скетчи."""
+    ids = await create_rolls(client)
+    await client.patch(f"/rolls/{ids[1]}", json={"weight": 1})
+
+    for table in (RollsDailyStats, RollsDailySketch):
+        count = await session.scalar(select(func.count()).select_from(table))
+        assert count == 0, table
+
+
+async def test_aggregate_reads_rolls(source, client, session):
+    """Без свежего снимка агрегаты читаются из rolls."""
+    await create_rolls(client)
+    service = StatisticsService(session)
+    today = date.today()
+
+    actual = await service.aggregate(today - timedelta(days=1), today)
+
+    assert actual["added_count"] == 30
+    assert actual["removed_count"] == 10
+    assert actual == await service._aggregate_rolls(
+        today - timedelta(days=1), today
+    )
+
+
+async def test_percentiles_read_rolls(source, client, session):
+    """Процентили считаются по rolls, а не по пустым дневным скетчам."""
+    await create_rolls(client)
+    today = date.today()
+
+    actual = await StatisticsService(session).percentiles(today, today)
+
+    assert actual["median_length"] == pytest.approx(15, rel=RELATIVE_ACCURACY)
+    assert actual["p90_weight"] == pytest.approx(
+        50 + 26 * 7, rel=RELATIVE_ACCURACY
+    )
+    assert actual["median_storage_seconds"] is not None
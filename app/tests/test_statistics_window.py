@@ -0,0 +1,112 @@
+"""Тесты окна статистики: фильтр периода в SQL против фильтра в Python."""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.rolls import Rolls
+from app.services.statistics import StatisticsService
+from benchmarks.datagen import generate
+
+ROWS = 3000
+WINDOWS = (1, 7, 30, 90, 365)
+
+
+def window_stats(rolls: list, start_date: date, end_date: date) -> dict:
+    """
+    Агрегаты периода, посчитанные перебором всех рулонов в Python.
+
+    Поступления считаются по ``added_at`` в периоде, списания и сроки
+    хранения - по ``removed_at`` в периоде.
+    """
+    lower = datetime.combine(start_date, time.min)
+    upper = datetime.combine(end_date + timedelta(days=1), time.min)
+    added = [roll for roll in rolls if lower <= roll.added_at < upper]
+    removed = [
+        roll
+        for roll in rolls
+        if roll.removed_at is not None and lower <= roll.removed_at < upper
+    ]
+    lengths = [roll.length for roll in added]
+    weights = [roll.weight for roll in added]
+    storage = [
+        (roll.removed_at - roll.added_at).total_seconds() for roll in removed
+    ]
+    return {
+        "added_count": len(added),
+        "removed_count": len(removed),
+        "avg_length": sum(lengths) / len(lengths) if lengths else None,
+        "avg_weight": sum(weights) / len(weights) if weights else None,
+        "min_length": min(lengths, default=None),
+        "max_length": max(lengths, default=None),
+        "min_weight": min(weights, default=None),
+        "max_weight": max(weights, default=None),
+        "total_weight": sum(weights) if weights else None,
+        "min_storage_seconds": min(storage, default=None),
+        "max_storage_seconds": max(storage, default=None),
+    }
+
+
+@pytest.fixture
+async def rolls(database, session):
+    """Сгенерированные рулоны за полгода (агрегаты rollup пересчитаны)."""
+    await generate(database, ROWS, years=0.5, seed=8)
+    return (await session.execute(select(Rolls))).scalars().all()
+
+
+@pytest.fixture
+async def last_day(rolls, session):
+    """День последнего поступления в сгенерированных данных."""
+    return (await session.execute(select(func.max(Rolls.added_at)))).scalar()
+
+
+def periods(last_day: datetime):
+    """Окна разной длины, заканчивающиеся в последний день и раньше."""
+    end_date = last_day.date()
+    for days in WINDOWS:
+        yield end_date - timedelta(days=days - 1), end_date
+    yield end_date - timedelta(days=60), end_date - timedelta(days=30)
+    yield end_date + timedelta(days=1), end_date + timedelta(days=7)
+
+
+async def test_rolls_query_matches_python_filter(rolls, last_day, session):
+    """Агрегаты из rolls совпадают с перебором строк периода."""
+    service = StatisticsService(session)
+    for start_date, end_date in periods(last_day):
+        expected = window_stats(rolls, start_date, end_date)
+
+        actual = await service._aggregate_rolls(start_date, end_date)
+
+        assert actual == pytest.approx(expected, abs=1e-3), (
+            start_date,
+            end_date,
+        )
+
+
+async def test_rollup_matches_python_filter(rolls, last_day, session):
+    """Агрегаты из rolls_daily_stats совпадают с перебором строк периода."""
+    service = StatisticsService(session)
+    for start_date, end_date in periods(last_day):
+        expected = window_stats(rolls, start_date, end_date)
+
+        actual = await service._aggregate_daily(start_date, end_date)
+
+        assert actual == pytest.approx(expected, abs=1e-3), (
+            start_date,
+            end_date,
+        )
+
+
+async def test_rolls_query_reads_only_window(rolls, last_day, session):
+    """WHERE запроса отбирает только рулоны, затронутые периодом."""
+    start_date = last_day.date() - timedelta(days=6)
+    stmt = StatisticsService.rolls_query(start_date, last_day.date())
+    expected = window_stats(rolls, start_date, last_day.date())
+
+    matched = (
+        await session.execute(select(func.count()).where(stmt.whereclause))
+    ).scalar()
+
+    assert 0 < matched < len(rolls)
+    assert matched <= expected["added_count"] + expected["removed_count"]
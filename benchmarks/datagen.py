@@ -0,0 +1,186 @@
+r"""
+Генератор данных для нагрузочных тестов.
+
+Дозаполняет таблицу ``rolls`` до ``--rows`` строк с реалистичным
+распределением: поступления равномерно за ``--years`` лет, ID растут
+вместе с ``added_at``, около 90% рулонов уже списаны через 0-120 дней
+после поступления. После вставки агрегаты ``rolls_daily_stats``
+пересчитываются за весь период, чтобы статистика из rollup совпадала
+с таблицей.
+
+На PostgreSQL строки генерирует сервер (``generate_series``), на
+SQLite - Python пачками по ``--batch-size``. Для SQLite схема
+создаётся по моделям.
+
+Запуск (DATABASE_URL берётся из .env или ``--database-url``)::
+
+    python -m benchmarks.datagen --rows 5000000
+    python -m benchmarks.datagen --rows 100000 \
+        --database-url sqlite+aiosqlite:///./bench.db
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+
+from app.core.base import Base
+from app.core.config import settings
+from app.models.rolls import Rolls
+from app.services.rollup import RollupService
+
+REMOVED_SHARE = 0.9
+MAX_STORAGE = timedelta(days=120)
+
+GENERATE_SQL = """
+INSERT INTO rolls (length, weight, added_at, removed_at)
+SELECT
+    length,
+    weight,
+    added_at,
+    CASE WHEN random() < CAST(:removed_share AS float)
+        AND added_at + storage < now()::timestamp
+        THEN added_at + storage
+    END
+FROM (
+    SELECT
+        round((1 + random() * 49)::numeric, 2) AS length,
+        round((50 + random() * 950)::numeric, 2) AS weight,
+        CAST(:start AS timestamp)
+            + ((g - 1) / CAST(:total AS float)) * CAST(:span AS interval)
+            + random() * interval '1 hour' AS added_at,
+        random() * CAST(:max_storage AS interval) AS storage
+    FROM generate_series(CAST(:first AS int), CAST(:last AS int)) AS g
+) AS s
+"""
+
+
+def generate_batch(
+    rng: random.Random,
+    first: int,
+    last: int,
+    total: int,
+    start: datetime,
+    span: timedelta,
+    now: datetime,
+) -> list[dict]:
+    """Строки с номерами ``first..last`` из ``total``."""
+    rows = []
+    for number in range(first, last + 1):
+        added_at = start + span * ((number - 1) / total)
+        added_at += timedelta(seconds=rng.random() * 3600)
+        removed_at = None
+        if rng.random() < REMOVED_SHARE:
+            removed_at = added_at + MAX_STORAGE * rng.random()
+            if removed_at >= now:
+                removed_at = None
+        rows.append(
+            {
+                "length": round(1 + rng.random() * 49, 2),
+                "weight": round(50 + rng.random() * 950, 2),
+                "added_at": added_at,
+                "removed_at": removed_at,
+            }
+        )
+    return rows
+
+
+async def generate(
+    engine: AsyncEngine,
+    rows: int,
+    years: float = 3,
+    batch_size: int = 100_000,
+    seed: Optional[int] = None,
+) -> int:
+    """
+    Дозаполняет ``rolls`` до ``rows`` строк и пересчитывает агрегаты.
+
+    Returns:
+        - int: Число вставленных строк.
+    """
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        existing = (
+            await conn.execute(select(func.count(Rolls.id)))
+        ).scalar_one()
+    missing = rows - existing
+    if missing <= 0:
+        return 0
+
+    now = datetime.utcnow()
+    span = timedelta(days=365 * years)
+    start = now - span - timedelta(hours=1)
+    rng = random.Random(seed)
+    postgres = engine.dialect.name == "postgresql"
+
+    for first in range(1, missing + 1, batch_size):
+        last = min(first + batch_size - 1, missing)
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            if postgres:
+                await conn.execute(
+                    text(GENERATE_SQL),
+                    {
+                        "removed_share": REMOVED_SHARE,
+                        "start": start,
+                        "span": span,
+                        "total": missing,
+                        "max_storage": MAX_STORAGE,
+                        "first": first,
+                        "last": last,
+                    },
+                )
+            else:
+                await conn.execute(
+                    insert(Rolls),
+                    generate_batch(
+                        rng, first, last, missing, start, span, now
+                    ),
+                )
+        print(
+            f"rolls: {existing + last:,} / {rows:,}"
+            f" ({time.perf_counter() - started:.1f}s)"
+        )
+
+    async with AsyncSession(engine) as session:
+        await RollupService(session).rebuild(start.date(), now.date())
+        await session.commit()
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+    return missing
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Заполнение базы из командной строки."""
+    engine = create_async_engine(args.database_url or settings.database_url)
+    started = time.perf_counter()
+    inserted = await generate(
+        engine, args.rows, args.years, args.batch_size, args.seed
+    )
+    await engine.dispose()
+    print(
+        f"inserted {inserted:,} rows in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--database-url", default=None)
+    asyncio.run(main(parser.parse_args()))
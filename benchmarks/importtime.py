@@ -0,0 +1,102 @@
+"""
+Время импорта модулей приложения и бюджет запуска.
+
+Каждый модуль из ``BUDGETS`` импортируется в отдельном процессе
+``python -X importtime`` ``--repeat`` раз. Выводятся лучшее время
+импорта (сумма собственного времени всех модулей) и самые тяжёлые
+корневые пакеты. Если время импорта модуля превышает его бюджет,
+скрипт завершается с кодом 1.
+
+``app.core.base`` (модели, нужен Alembic и тестам) импортируется без
+переменных окружения: для него не должны создаваться настройки,
+движок БД и клиент Redis.
+
+Запуск::
+
+    python -m benchmarks.importtime --repeat 5 --top 10
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Optional
+
+# Модуль -> бюджет импорта, мс.
+BUDGETS = {
+    "app.core.base": 800,
+    "app.main": 1500,
+}
+# Модули, которые должны импортироваться без .env.
+WITHOUT_ENV = {"app.core.base"}
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \| *(\S+)")
+
+
+def import_profile(
+    module: str, env: dict, cwd: Optional[str] = None
+) -> dict[str, int]:
+    """Собственное время импорта (мкс) по корневым пакетам."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1]
+        raise RuntimeError(f"import {module} failed: {error}")
+    packages: dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            root = match.group(2).split(".")[0]
+            packages[root] += int(match.group(1))
+    return packages
+
+
+def clean_env() -> dict:
+    """Окружение без настроек приложения и без .env в рабочей папке."""
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key in {"PATH", "HOME", "LANG", "PYTHONPATH", "VIRTUAL_ENV"}
+    }
+
+
+def main(repeat: int, top: int) -> int:
+    """Замер модулей и проверка бюджетов."""
+    failed = False
+    for module, budget in BUDGETS.items():
+        env = dict(os.environ)
+        cwd = None
+        if module in WITHOUT_ENV:
+            env = clean_env()
+            env["PYTHONPATH"] = os.getcwd()
+            cwd = "/"
+        try:
+            runs = [import_profile(module, env, cwd) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"\n{module}: {e}")
+            failed = True
+            continue
+        best = min(runs, key=lambda packages: sum(packages.values()))
+        total = sum(best.values()) / 1000
+        status = "ok" if total <= budget else "OVER BUDGET"
+        failed = failed or total > budget
+        print(f"\n{module}: {total:.0f} ms (budget {budget} ms) {status}")
+        heaviest = sorted(best.items(), key=lambda item: -item[1])[:top]
+        for package, micros in heaviest:
+            print(f"  {package:<40} {micros / 1000:>8.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(main(args.repeat, args.top))
@@ -0,0 +1,408 @@
+r"""
+Нагрузочные сценарии для API склада.
+
+Сценарии:
+
+- ``intake`` - поток поступлений: одиночные ``POST /rolls/`` и пачки
+  ``POST /rolls/bulk``;
+- ``listing`` - фильтрованные списки ``GET /rolls/`` с переходом по
+  курсору;
+- ``stats`` - опрос ``GET /statistics/`` по популярным окнам;
+- ``mixed`` - чтение и запись вперемешку.
+
+Для каждого запроса сценария выводятся число запросов, ошибки, RPS и
+задержки p50/p95/p99 (мс). Результаты можно сохранить как базовые
+(``--save-baseline``) и сравнивать с ними (``--compare``): при росте
+p95 или падении RPS больше ``--tolerance`` скрипт завершается с кодом 1.
+
+Окружения:
+
+- ``--stack local`` - приложение в процессе, PostgreSQL и Redis из .env;
+- ``--stack stub`` - приложение в процессе, SQLite-файл и fakeredis;
+- ``--url`` - уже запущенный сервер (данные готовятся
+  ``benchmarks.datagen``).
+
+Запуск::
+
+    python -m benchmarks.load --stack stub --rows 100000 --scenario all \
+        --compare benchmarks/baseline.json
+    python -m benchmarks.load --stack local --rows 5000000 --scenario mixed
+    python -m benchmarks.load --url http://localhost:8000 --scenario listing
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+PAGES_PER_LISTING = 3
+BULK_SIZE = 100
+STATS_WINDOWS = (1, 7, 30, 90)
+METRICS = ("rps", "p50", "p95", "p99")
+
+
+class Recorder:
+    """Задержки и ошибки по именам запросов."""
+
+    def __init__(self):
+        """Инициализация пустых замеров."""
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.enabled = True
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kw
+    ) -> Optional[httpx.Response]:
+        """Выполняет запрос и записывает его задержку под ``name``."""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kw)
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - started
+        if not self.enabled:
+            return response
+        if response is None or response.status_code >= 400:
+            self.errors[name] += 1
+        else:
+            self.latencies[name].append(elapsed)
+        return response
+
+
+class Context:
+    """Общее состояние воркеров: известные ID рулонов."""
+
+    def __init__(self, rng: random.Random):
+        """Инициализация контекста."""
+        self.rng = rng
+        self.ids: list[int] = []
+
+    def random_roll(self) -> dict:
+        """Данные нового рулона."""
+        return {
+            "length": round(1 + self.rng.random() * 49, 2),
+            "weight": round(50 + self.rng.random() * 950, 2),
+        }
+
+    def random_filter(self) -> dict:
+        """Фильтр списка: окно поступлений и иногда диапазон веса."""
+        days = self.rng.choice(STATS_WINDOWS)
+        params: dict = {
+            "added_after": str(date.today() - timedelta(days=days))
+        }
+        if self.rng.random() < 0.5:
+            low = self.rng.randint(50, 900)
+            params.update(min_weight=low, max_weight=low + 100)
+        return params
+
+
+Operation = Callable[[httpx.AsyncClient, Recorder, Context], Awaitable[None]]
+
+
+async def create_one(client, recorder, ctx):
+    """Поступление одного рулона."""
+    await recorder.request(
+        client, "POST /rolls/", "POST", "/rolls/", json=ctx.random_roll()
+    )
+
+
+async def create_bulk(client, recorder, ctx):
+    """Поступление пачки рулонов."""
+    response = await recorder.request(
+        client,
+        "POST /rolls/bulk",
+        "POST",
+        "/rolls/bulk",
+        json=[ctx.random_roll() for _ in range(BULK_SIZE)],
+    )
+    if response is not None and response.status_code == 200:
+        ctx.ids.extend(roll["id"] for roll in response.json())
+
+
+async def list_filtered(client, recorder, ctx):
+    """Фильтрованный список с переходом на следующие страницы."""
+    params = ctx.random_filter()
+    for _ in range(PAGES_PER_LISTING):
+        response = await recorder.request(
+            client, "GET /rolls/", "GET", "/rolls/", params=params
+        )
+        if response is None or response.status_code != 200:
+            return
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return
+        params = {**params, "cursor": cursor}
+
+
+async def get_one(client, recorder, ctx):
+    """Рулон по ID."""
+    if ctx.ids:
+        roll_id = ctx.rng.choice(ctx.ids)
+        await recorder.request(
+            client, "GET /rolls/{id}", "GET", f"/rolls/{roll_id}"
+        )
+
+
+async def poll_statistics(client, recorder, ctx):
+    """Статистика за одно из популярных окон."""
+    end = date.today()
+    start = end - timedelta(days=ctx.rng.choice(STATS_WINDOWS))
+    await recorder.request(
+        client,
+        "GET /statistics/",
+        "GET",
+        "/statistics/",
+        params={"start_date": str(start), "end_date": str(end)},
+    )
+
+
+async def remove_one(client, recorder, ctx):
+    """Списание рулона по ID."""
+    if ctx.ids:
+        roll_id = ctx.ids.pop(ctx.rng.randrange(len(ctx.ids)))
+        await recorder.request(
+            client, "DELETE /rolls/{id}", "DELETE", f"/rolls/{roll_id}"
+        )
+
+
+SCENARIOS: dict[str, list[tuple[int, Operation]]] = {
+    "intake": [(8, create_one), (2, create_bulk)],
+    "listing": [(1, list_filtered)],
+    "stats": [(1, poll_statistics)],
+    "mixed": [
+        (45, list_filtered),
+        (20, get_one),
+        (15, poll_statistics),
+        (10, create_one),
+        (5, create_bulk),
+        (5, remove_one),
+    ],
+}
+
+
+async def seed_ids(client: httpx.AsyncClient, ctx: Context) -> None:
+    """Набирает ID существующих рулонов для запросов по ID."""
+    response = await client.get("/rolls/", params={"limit": 1000})
+    response.raise_for_status()
+    ctx.ids.extend(roll["id"] for roll in response.json()["items"])
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    duration: float,
+    warmup: float,
+    concurrency: int,
+    ctx: Context,
+) -> dict:
+    """Прогоняет сценарий и возвращает отчёт по запросам."""
+    weights, operations = zip(*SCENARIOS[name])
+    recorder = Recorder()
+
+    async def worker(deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            operation = ctx.rng.choices(operations, weights)[0]
+            await operation(client, recorder, ctx)
+
+    if warmup > 0:
+        recorder.enabled = False
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+        recorder.enabled = True
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+    return build_report(recorder, time.perf_counter() - started)
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """RPS и перцентили задержек (мс) для одного набора замеров."""
+    result: dict = {"count": len(latencies), "errors": errors}
+    result["rps"] = round(len(latencies) / elapsed, 1)
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    for key, value in (("p50", p50), ("p95", p95), ("p99", p99)):
+        result[key] = round(value * 1000, 2)
+    result["max"] = round(max(latencies, default=0.0) * 1000, 2)
+    return result
+
+
+def build_report(recorder: Recorder, elapsed: float) -> dict:
+    """Отчёт по каждому запросу и суммарно."""
+    names = sorted(set(recorder.latencies) | set(recorder.errors))
+    report = {
+        name: summarize(
+            recorder.latencies[name], recorder.errors[name], elapsed
+        )
+        for name in names
+    }
+    report["total"] = summarize(
+        [value for name in names for value in recorder.latencies[name]],
+        sum(recorder.errors.values()),
+        elapsed,
+    )
+    return report
+
+
+def print_report(
+    name: str, report: dict, baseline: Optional[dict], tolerance: float
+) -> bool:
+    """Печатает отчёт сценария; возвращает True при регрессии."""
+    regressed = False
+    print(f"\n== {name}")
+    header = f"{'request':<20} {'count':>7} {'errors':>6}"
+    header += "".join(f" {metric:>9}" for metric in METRICS)
+    print(header + (" vs baseline" if baseline else ""))
+    for request, row in report.items():
+        line = f"{request:<20} {row['count']:>7} {row['errors']:>6}"
+        line += "".join(f" {row[metric]:>9}" for metric in METRICS)
+        base = (baseline or {}).get(request)
+        if base:
+            notes = compare(row, base, tolerance)
+            regressed = regressed or any(
+                note.startswith("!") for note in notes
+            )
+            line += " " + " ".join(notes)
+        print(line)
+    return regressed
+
+
+def compare(row: dict, base: dict, tolerance: float) -> list[str]:
+    """Изменения ошибок, RPS и p95 относительно базовых; "!" - регрессия."""
+    notes = []
+    if row["errors"] and not base["errors"]:
+        notes.append(f"!errors {row['errors']}")
+    if base["rps"]:
+        change = row["rps"] / base["rps"] - 1
+        mark = "!" if change < -tolerance else ""
+        notes.append(f"{mark}rps {change:+.0%}")
+    if base["p95"]:
+        change = row["p95"] / base["p95"] - 1
+        mark = "!" if change > tolerance else ""
+        notes.append(f"{mark}p95 {change:+.0%}")
+    return notes
+
+
+def configure_stub(path: str) -> None:
+    """Переменные окружения для SQLite до импорта настроек приложения."""
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ["DATABASE_REPLICA_URLS"] = "[]"
+    for name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+        os.environ.setdefault(name, "stub")
+    os.environ.setdefault("POSTGRES_HOST", "localhost")
+    os.environ.setdefault("POSTGRES_PORT", "5432")
+    os.environ.setdefault("REDIS_HOST", "localhost")
+    os.environ.setdefault("REDIS_PORT", "6379")
+
+
+def use_fakeredis() -> None:
+    """Подменяет клиент Redis приложения на fakeredis."""
+    import fakeredis
+
+    from app.core import cache
+    from app.services import health, matview, statistics as statistics_service
+
+    fake = fakeredis.FakeAsyncRedis(decode_responses=True)
+    for module in (cache, health, matview, statistics_service):
+        setattr(module, "get_redis", lambda: fake)
+
+
+async def open_client(args: argparse.Namespace) -> httpx.AsyncClient:
+    """Клиент к серверу по ``--url`` или к приложению в процессе."""
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.url:
+        return httpx.AsyncClient(
+            base_url=args.url, limits=limits, timeout=args.timeout
+        )
+
+    if args.stack == "stub":
+        configure_stub(args.sqlite_path)
+        use_fakeredis()
+
+    from app.core.db import get_engine
+    from app.main import app
+    from benchmarks.datagen import generate
+
+    inserted = await generate(get_engine(), args.rows, seed=args.seed)
+    if inserted:
+        print(f"generated {inserted:,} rolls")
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=args.timeout
+    )
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Прогон выбранных сценариев, сравнение и сохранение отчёта."""
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    baseline = {}
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["scenarios"]
+
+    ctx = Context(random.Random(args.seed))
+    results = {}
+    regressed = False
+    async with await open_client(args) as client:
+        await seed_ids(client, ctx)
+        for name in names:
+            report = await run_scenario(
+                client,
+                name,
+                args.duration,
+                args.warmup,
+                args.concurrency,
+                ctx,
+            )
+            results[name] = report
+            regressed |= print_report(
+                name, report, baseline.get(name), args.tolerance
+            )
+
+    if args.save_baseline:
+        path = Path(args.save_baseline)
+        data = json.loads(path.read_text()) if path.exists() else {}
+        data["meta"] = {
+            "stack": "url" if args.url else args.stack,
+            "rows": args.rows,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "python": sys.version.split()[0],
+        }
+        data.setdefault("scenarios", {}).update(results)
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+        print(f"\nbaseline saved to {path}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenario", choices=[*SCENARIOS, "all"], default="mixed"
+    )
+    parser.add_argument("--stack", choices=["local", "stub"], default="local")
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--sqlite-path", default="bench.db")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--save-baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    sys.exit(asyncio.run(main(parser.parse_args())))
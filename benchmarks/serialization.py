@@ -0,0 +1,100 @@
+"""
+Сравнение пути чтения рулонов: ORM + pydantic против колонок + orjson.
+
+Для каждой страницы измеряется полный путь от запроса до JSON-байт:
+
+- ``orm`` — прежний путь: ``select(Rolls)`` с созданием ORM-объектов,
+  ``RollsResponse`` через ``from_attributes``, ``jsonable_encoder`` и
+  ``json.dumps`` (то, что делает FastAPI с ``response_model``);
+- ``core`` — быстрый путь: ``select`` колонок, словари из строк и
+  ``orjson.dumps`` (то, что делает ``ORJSONResponse``).
+
+Результат выводится в строках в секунду.
+
+Запуск (DATABASE_URL берётся из .env)::
+
+    python -m benchmarks.serialization --rows 100000 --page 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.endpoints.rolls import ROLL_COLUMNS, _roll_payload
+from app.core.config import settings
+from app.models.rolls import Rolls
+from app.schemas.rolls import RollsResponse
+from benchmarks.indexes import GENERATE_SQL
+
+
+async def orm_page(session: AsyncSession, limit: int) -> bytes:
+    """Страница через ORM-объекты и повторную валидацию."""
+    result = await session.execute(
+        select(Rolls).order_by(Rolls.id).limit(limit)
+    )
+    items = [
+        RollsResponse.model_validate(roll, from_attributes=True)
+        for roll in result.scalars().all()
+    ]
+    content = jsonable_encoder(
+        {"items": items, "next_cursor": None}, exclude_none=True
+    )
+    return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+async def core_page(session: AsyncSession, limit: int) -> bytes:
+    """Страница через колонки и orjson."""
+    result = await session.execute(
+        select(*(getattr(Rolls, name) for name in ROLL_COLUMNS))
+        .order_by(Rolls.id)
+        .limit(limit)
+    )
+    items = [_roll_payload(row) for row in result.all()]
+    return orjson.dumps({"items": items, "next_cursor": None})
+
+
+async def measure(session: AsyncSession, page, limit: int, repeat: int):
+    """Лучшее время из ``repeat`` прогонов в строках в секунду."""
+    await page(session, limit)
+    best = float("inf")
+    for _ in range(repeat):
+        session.expunge_all()
+        started = time.perf_counter()
+        await page(session, limit)
+        best = min(best, time.perf_counter() - started)
+    return limit / best
+
+
+async def main(rows: int, page: int, repeat: int) -> None:
+    """Прогон обоих путей и вывод сравнения."""
+    engine = create_async_engine(settings.database_url)
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        total = (await conn.execute(select(func.count(Rolls.id)))).scalar_one()
+        if total < rows and engine.dialect.name == "postgresql":
+            await conn.execute(text(GENERATE_SQL), {"rows": rows - total})
+
+    async with AsyncSession(engine) as session:
+        before = await measure(session, orm_page, page, repeat)
+        after = await measure(session, core_page, page, repeat)
+    await engine.dispose()
+
+    print(f"{'path':<6} {'rows/s':>12}")
+    print(f"{'orm':<6} {before:>12,.0f}")
+    print(f"{'core':<6} {after:>12,.0f}")
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page, args.repeat))
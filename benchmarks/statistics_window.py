@@ -0,0 +1,111 @@
+"""
+Проверка, что статистика по rolls читает только строки своего окна.
+
+Для окон разной длины строится запрос ``StatisticsService.rolls_query``,
+выполняется EXPLAIN ANALYZE и сравнивается число прочитанных строк
+(найденные плюс отброшенные фильтром) с числом строк, попавших в окно.
+Если для узкого окна (меньше ``--selective`` доли таблицы) план читает
+заметно больше строк, чем попадает в окно (например, Seq Scan по всей
+истории), скрипт завершается с кодом 1. Для широких окон полный проход
+может быть дешевле и только выводится.
+
+Недостающие строки вставляются в таблицу, поэтому, как и
+``benchmarks.indexes``, скрипт работает только с отдельной БД из
+``--database-url``.
+
+Запуск (только PostgreSQL)::
+
+    python -m benchmarks.statistics_window --database-url URL --rows 1000000
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models.rolls import Rolls
+from app.services.statistics import StatisticsService
+from benchmarks.indexes import GENERATE_SQL, compile_sql, scratch_database_url
+
+WINDOWS = (1, 7, 30, 90, 365)
+TABLE_SCANS = {"Seq Scan", "Index Scan", "Bitmap Heap Scan"}
+
+
+def scanned_rows(plan: dict) -> int:
+    """Строки, прочитанные узлами сканирования таблицы."""
+    scanned = 0
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if node["Node Type"] in TABLE_SCANS:
+            scanned += (
+                node["Actual Rows"] + node.get("Rows Removed by Filter", 0)
+            ) * node.get("Actual Loops", 1)
+        stack.extend(node.get("Plans", []))
+    return scanned
+
+
+async def main(
+    database_url: str, rows: int, tolerance: float, selective: float
+) -> int:
+    """Прогон окон и проверка доли прочитанных строк."""
+    engine = create_async_engine(database_url)
+    today = date.today()
+    failed = False
+
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        total = (await conn.execute(select(func.count(Rolls.id)))).scalar_one()
+        if total < rows:
+            await conn.execute(text(GENERATE_SQL), {"rows": rows - total})
+            total = rows
+        await conn.execute(text("ANALYZE rolls"))
+
+        print(f"rows in table: {total}")
+        print(f"{'days':>6} {'matched':>10} {'scanned':>10} {'ms':>10}")
+        for days in WINDOWS:
+            stmt = StatisticsService.rolls_query(
+                today - timedelta(days=days - 1), today
+            )
+            matched = (
+                await conn.execute(
+                    select(func.count()).where(stmt.whereclause)
+                )
+            ).scalar_one()
+            result = await conn.execute(
+                text(f"EXPLAIN (ANALYZE, FORMAT JSON) {compile_sql(stmt)}")
+            )
+            payload = result.scalar_one()[0]
+            scanned = scanned_rows(payload["Plan"])
+            print(
+                f"{days:>6} {matched:>10} {scanned:>10}"
+                f" {payload['Execution Time']:>10.2f}"
+            )
+            if (
+                matched < total * selective
+                and scanned > matched * tolerance + 100
+            ):
+                print(f"    читается больше строк, чем в окне: {scanned}")
+                failed = True
+
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--database-url", required=True, type=scratch_database_url
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tolerance", type=float, default=1.1)
+    parser.add_argument("--selective", type=float, default=0.1)
+    args = parser.parse_args()
+    sys.exit(
+        asyncio.run(
+            main(args.database_url, args.rows, args.tolerance, args.selective)
+        )
+    )
@@ -0,0 +1,146 @@
+"""
+Масштабирование пропускной способности по числу воркеров.
+
+Для каждого числа воркеров из ``--workers`` (и цикла событий из
+``--loops``) запускается ``python -m app.server`` на отдельном порту,
+после чего сценарий ``benchmarks.load`` выполняется в ``--clients``
+параллельных процессах нагрузки (один процесс Python не нагружает
+несколько ядер). Выводится суммарный RPS, задержки и ускорение
+относительно первой конфигурации. Данные готовятся заранее
+(``benchmarks.datagen``), настройки БД и Redis берутся из .env.
+
+Запуск::
+
+    python -m benchmarks.workers --workers 1 2 4 8 --scenario listing
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    """Ждёт, пока сервер начнёт отвечать."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("сервер завершился при запуске")
+        try:
+            httpx.get(f"{url}/rolls/", params={"limit": 1}, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise TimeoutError(f"сервер не ответил за {timeout} с")
+
+
+def run_load(url: str, args: argparse.Namespace) -> dict:
+    """Параллельные процессы нагрузки и суммарный отчёт."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp, f"client{i}.json") for i in range(args.clients)]
+        clients = [
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.load",
+                    "--url",
+                    url,
+                    "--scenario",
+                    args.scenario,
+                    "--duration",
+                    str(args.duration),
+                    "--warmup",
+                    str(args.warmup),
+                    "--concurrency",
+                    str(args.concurrency),
+                    "--save-baseline",
+                    str(path),
+                ],
+                stdout=subprocess.DEVNULL,
+            )
+            for path in paths
+        ]
+        for client in clients:
+            client.wait()
+        totals = [
+            json.loads(path.read_text())["scenarios"][args.scenario]["total"]
+            for path in paths
+        ]
+    return {
+        "rps": sum(total["rps"] for total in totals),
+        "errors": sum(total["errors"] for total in totals),
+        "p50": max(total["p50"] for total in totals),
+        "p95": max(total["p95"] for total in totals),
+        "p99": max(total["p99"] for total in totals),
+    }
+
+
+def measure(workers: int, loop: str, args: argparse.Namespace) -> dict:
+    """Запускает сервер с ``workers`` воркерами и измеряет его."""
+    env = {
+        **os.environ,
+        "SERVER_WORKERS": str(workers),
+        "SERVER_LOOP": loop,
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(args.port),
+        "DEBUG": "false",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_ready(url, server, args.startup_timeout)
+        return run_load(url, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args: argparse.Namespace) -> None:
+    """Прогон конфигураций и вывод таблицы масштабирования."""
+    print(f"cpu: {os.cpu_count()}, scenario: {args.scenario}")
+    print(
+        f"{'workers':>7} {'loop':>8} {'rps':>9} {'errors':>6}"
+        f" {'p50':>8} {'p95':>8} {'p99':>8} {'speedup':>8}"
+    )
+    first = None
+    for loop in args.loops:
+        for workers in args.workers:
+            result = measure(workers, loop, args)
+            first = first or result["rps"]
+            print(
+                f"{workers:>7} {loop:>8} {result['rps']:>9.1f}"
+                f" {result['errors']:>6} {result['p50']:>8}"
+                f" {result['p95']:>8} {result['p99']:>8}"
+                f" {result['rps'] / first:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--loops",
+        nargs="+",
+        choices=["auto", "uvloop", "asyncio"],
+        default=["uvloop"],
+    )
+    parser.add_argument("--scenario", default="listing")
+    parser.add_argument("--clients", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=30)
+    main(parser.parse_args())